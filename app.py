@@ -1,28 +1,84 @@
 # app.py
+import atexit
 from flask import Flask
 from dotenv import load_dotenv  
-from config import Config
-from extensions import db, cache
+from config import get_config
+from extensions import db, cache, init_sqlite_pragmas
 from models import Review, Translation
 from routes.anime_routes import anime_bp
+from routes.metrics_routes import metrics_bp
+from services.translation_cache import translation_cache
+from services.title_index import korean_title_index
+from services.gemini_client import gemini_client
+from services.model_router import model_router
+from services.anilist_client import anilist_client
+from services.translation_worker import translation_worker
+from services.verification_stats import verification_stats
+from services.recommendation_pool import recommendation_pool
+from services.catalog_mirror import catalog_mirror
+from services.detail_prefetch import detail_prefetcher
+from services.background_loop import background_loop
+from services.upstream_governor import anilist_governor, gemini_governor
+from services.metrics import metrics
+from services.http_cache import http_cache
+from commands import warmup_command, sync_catalog_command, migrate_command
+from migrations import run_migrations, pending_migrations
 
 load_dotenv()
 
-def create_app():
-    app = Flask(__name__)
-    app.config.from_object(Config)
+def create_app(app_class=Flask, config_class=None):
+    # ASGI 서버로 실행할 때는 asgi.py에서 AsyncFlask를 넘김
+    app = app_class(__name__)
+    # 설정 프로필은 APP_CONFIG 환경 변수로 선택 (default / multiworker)
+    app.config.from_object(config_class or get_config())
+    # 실행 방식에 따라 앱 클래스가 덮어쓰는 설정 (예: ASGI 모드의 커넥션 풀)
+    configure = getattr(app, 'configure', None)
+    if configure:
+        configure()
 
     # 확장 기능 초기화 (Init)
     db.init_app(app)
+    init_sqlite_pragmas(app)
     cache.init_app(app)
+    translation_cache.init_app(app)
+    korean_title_index.init_app(app)
+    anilist_governor.init_app(app)
+    gemini_governor.init_app(app)
+    gemini_client.init_app(app)
+    model_router.init_app(app)
+    anilist_client.init_app(app)
+    translation_worker.init_app(app)
+    verification_stats.init_app(app)
+    recommendation_pool.init_app(app)
+    catalog_mirror.init_app(app)
+    detail_prefetcher.init_app(app)
+    metrics.init_app(app)
+    http_cache.init_app(app)  # metrics 다음 (after_request는 나중에 등록한 것부터 실행)
 
-    # DB 테이블 생성
+    # 공유 클라이언트/이벤트 루프는 프로세스 종료 시 정리
+    atexit.register(background_loop.shutdown)
+
+    # 스키마 버전만 확인 (쓰기 잠금/create_all 없이 바로 시작)
+    # 낮으면 AUTO_MIGRATE일 때만 여기서 적용하고, 아니면 경고만 (flask migrate로 따로 적용)
     with app.app_context():
         #db.drop_all()
-        db.create_all()
+        pending = pending_migrations()
+        if pending and app.config.get('AUTO_MIGRATE', False):
+            for version, description in run_migrations():
+                print(f"DB 마이그레이션 v{version} 적용: {description}")
+        elif pending:
+            print(f"경고: DB 스키마가 최신이 아닙니다 (미적용: v{', v'.join(str(v) for v, _ in pending)}). "
+                  f"flask migrate를 실행하세요.")
 
     # 블루프린트(라우트) 등록
     app.register_blueprint(anime_bp)
+    if app.config.get('METRICS_ENABLED', True):
+        app.register_blueprint(metrics_bp)
+
+    # CLI 명령어 등록 (flask migrate, flask warmup, flask sync-catalog)
+    app.cli.add_command(migrate_command)
+    app.cli.add_command(warmup_command)
+    app.cli.add_command(sync_catalog_command)
 
     return app
 
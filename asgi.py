@@ -0,0 +1,227 @@
+# asgi.py
+# ASGI 실행 모드 (Hypercorn)
+#   hypercorn asgi:app --bind 0.0.0.0:5000
+#   python asgi.py
+#
+# Flask 기본(WSGI) 실행은 async 뷰마다 새 이벤트 루프를 만들고 워커 스레드 하나를 붙잡지만,
+# 여기서는 async 뷰를 서버 이벤트 루프에서 바로 await 하므로 워커 1개가
+# 수백 개의 AniList/Gemini 대기를 동시에 처리할 수 있다.
+# 공유 클라이언트(httpx/genai)도 lifespan 동안 서버 루프에 붙어서 스레드 간 이동이 없다.
+
+import io
+import sys
+import asyncio
+import inspect
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, request, request_started
+from sqlalchemy.pool import NullPool
+from app import create_app
+from services.background_loop import background_loop
+
+
+class AsyncFlask(Flask):
+    """ASGI 어댑터가 async 뷰를 서버 루프에서 직접 실행하는 Flask"""
+
+    def configure(self):
+        # create_app에서 설정 로드 직후 호출됨
+        # 한 루프에서 요청 수백 개가 각자 세션(커넥션)을 잡고 await 하므로
+        # 커넥션 풀 대기가 서버 루프를 막지 않도록 SQLite 커넥션은 풀 없이 매번 연다
+        options = dict(self.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        for key in ('pool_size', 'max_overflow', 'pool_timeout'):
+            options.pop(key, None)
+        options['poolclass'] = NullPool
+        self.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    def async_to_sync(self, func):
+        # 동기 뷰(스레드)에서 async 함수를 부르면 새 루프 대신 서버 루프에 맡김
+        # (@cache.cached로 감싼 async 뷰가 여기로 들어옴)
+        if not background_loop.attached:
+            return super().async_to_sync(func)
+        loop = background_loop.loop
+
+        def wrapper(*args, **kwargs):
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is loop:
+                raise RuntimeError('서버 이벤트 루프 안에서는 async 함수를 동기로 호출할 수 없습니다.')
+            return asyncio.run_coroutine_threadsafe(func(*args, **kwargs), loop).result()
+
+        return wrapper
+
+    # 아래 두 메서드는 Flask 3.1의 dispatch_request/full_dispatch_request를 옮긴 것
+    # (Flask를 올릴 때는 원본과 비교 후 requirements.txt와 tests/test_asgi.py의 버전을 함께 수정)
+    async def dispatch_request_async(self):
+        """Flask.dispatch_request와 같지만 async 뷰는 await, 동기 뷰는 스레드에서 실행"""
+        if request.routing_exception is not None:
+            self.raise_routing_exception(request)
+        rule = request.url_rule
+        if getattr(rule, 'provide_automatic_options', False) and request.method == 'OPTIONS':
+            return self.make_default_options_response()
+        view = self.view_functions[rule.endpoint]
+        if inspect.iscoroutinefunction(view):
+            return await view(**request.view_args)
+        # DB 조회 등 동기 코드가 서버 루프를 막지 않도록 (컨텍스트는 그대로 복사됨)
+        return await asyncio.to_thread(view, **request.view_args)
+
+    async def full_dispatch_request_async(self):
+        try:
+            request_started.send(self, _async_wrapper=self.ensure_sync)
+            rv = self.preprocess_request()
+            if rv is None:
+                rv = await self.dispatch_request_async()
+        except Exception as e:
+            rv = self.handle_user_exception(e)
+        return self.finalize_request(rv)
+
+    async def handle_asgi_request(self, environ):
+        # Flask.wsgi_app과 같은 순서 (컨텍스트 push → 디스패치 → 에러 처리 → pop)
+        ctx = self.request_context(environ)
+        error = None
+        try:
+            try:
+                ctx.push()
+                return await self.full_dispatch_request_async()
+            except Exception as e:
+                error = e
+                return self.handle_exception(e)
+            except:  # noqa: E722
+                error = sys.exc_info()[1]
+                raise
+        finally:
+            if error is not None and self.should_ignore_error(error):
+                error = None
+            ctx.pop(error)
+
+
+def _build_environ(scope, body):
+    """ASGI scope + 요청 본문 → WSGI environ"""
+    script_name = scope.get('root_path', '').encode('utf8').decode('latin1')
+    path_info = scope['path'].encode('utf8').decode('latin1')
+    if path_info.startswith(script_name):
+        path_info = path_info[len(script_name):]
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': script_name,
+        'PATH_INFO': path_info,
+        'QUERY_STRING': scope['query_string'].decode('ascii'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin1')
+        if name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        elif name == 'content-type':
+            key = 'CONTENT_TYPE'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        value = value.decode('latin1')
+        environ[key] = environ[key] + ',' + value if key in environ else value
+    return environ
+
+
+class AsgiAdapter:
+    """Flask 앱을 ASGI 앱으로 노출 (http + lifespan)"""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.sync_threads = flask_app.config.get('ASGI_SYNC_THREADS', 64)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"지원하지 않는 ASGI scope: {scope['type']}")
+
+    async def _lifespan(self, receive, send):
+        # 시작: 서버 루프를 공유 루프로 사용 / 종료: 공유 클라이언트·워커 정리
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    loop = asyncio.get_running_loop()
+                    # 동기 뷰와 스트리밍 응답이 쓰는 스레드 풀 (대기 중인 요청 수만큼 필요)
+                    loop.set_default_executor(ThreadPoolExecutor(self.sync_threads, thread_name_prefix='asgi-sync'))
+                    background_loop.attach(loop)
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await background_loop.ashutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body.extend(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+
+        environ = _build_environ(scope, bytes(body))
+        response = await self.flask_app.handle_asgi_request(environ)
+
+        headers = response.get_wsgi_headers(environ)
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [(k.lower().encode('latin1'), v.encode('latin1')) for k, v in headers.to_wsgi_list()],
+        })
+        app_iter = response.get_app_iter(environ)
+        # 스트리밍 제너레이터(stream_with_context)는 스레드에서 한 조각씩 꺼냄
+        # 컨텍스트 push/pop이 같은 Context에서 일어나도록 응답 하나에 Context 하나를 계속 사용
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        try:
+            if response.is_sequence:
+                for chunk in app_iter:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            else:
+                iterator = iter(app_iter)
+                while True:
+                    chunk = await loop.run_in_executor(None, context.run, next, iterator, None)
+                    if chunk is None:
+                        break
+                    if chunk:
+                        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        finally:
+            close = getattr(app_iter, 'close', None)
+            if close is not None:
+                await loop.run_in_executor(None, context.run, close)
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+
+def create_asgi_app():
+    return AsgiAdapter(create_app(AsyncFlask))
+
+
+app = create_asgi_app()
+
+
+if __name__ == '__main__':
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config as HypercornConfig
+
+    config = HypercornConfig()
+    config.bind = ['0.0.0.0:5000']
+    asyncio.run(serve(app, config))
@@ -0,0 +1,75 @@
+# bench/compare.py
+# bench/run.py(또는 load.py) 결과 JSON 두 개를 엔드포인트별로 비교
+#
+#   python bench/compare.py before.json after.json
+
+import sys
+import json
+import argparse
+
+METRICS = ['throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms', 'errors']
+
+
+def _load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _delta(before, after):
+    if before in (None, 0) or after is None:
+        return ''
+    return f'{(after - before) / before * 100:+.0f}%'
+
+
+def _upstream_total(result, source):
+    return result.get('upstream', {}).get(source, {}).get('requests', 0)
+
+
+def compare(before, after):
+    lines = []
+    b_meta, a_meta = before['meta'], after['meta']
+    lines.append(f"이전: {b_meta.get('commit', '?')} {b_meta.get('subject', '')}")
+    lines.append(f"이후: {a_meta.get('commit', '?')} {a_meta.get('subject', '')}")
+    for key in ('mix', 'concurrency', 'duration_s', 'requests', 'server', 'workers', 'rate_limits', 'upstream'):
+        if b_meta.get(key) != a_meta.get(key):
+            lines.append(f'주의: 실행 조건이 다름 ({key}: {b_meta.get(key)} → {a_meta.get(key)})')
+
+    header = f"{'endpoint':<16}{'metric':<16}{'before':>10}{'after':>10}{'delta':>9}"
+    lines += ['', header, '-' * len(header)]
+    names = sorted(set(before['endpoints']) | set(after['endpoints']))
+    for name, b, a in [(n, before['endpoints'].get(n, {}), after['endpoints'].get(n, {})) for n in names] + \
+            [('TOTAL', before['total'], after['total'])]:
+        for i, metric in enumerate(METRICS):
+            bv, av = b.get(metric), a.get(metric)
+            lines.append(f"{name if i == 0 else '':<16}{metric:<16}{_fmt(bv):>10}{_fmt(av):>10}{_delta(bv, av):>9}")
+
+    lines += ['', f"{'upstream':<32}{'before':>10}{'after':>10}{'delta':>9}"]
+    for source in ('anilist', 'gemini'):
+        counters = sorted(set(before.get('upstream', {}).get(source, {})) | set(after.get('upstream', {}).get(source, {})))
+        for counter in counters:
+            bv = before.get('upstream', {}).get(source, {}).get(counter, 0)
+            av = after.get('upstream', {}).get(source, {}).get(counter, 0)
+            lines.append(f"{source + '.' + counter:<32}{bv:>10}{av:>10}{_delta(bv, av):>9}")
+    # 요청 1000건당 업스트림 호출 수 (실행 시간이 달라도 비교 가능)
+    for source in ('anilist', 'gemini'):
+        per_k = [_upstream_total(r, source) * 1000 / max(1, r['total']['requests']) for r in (before, after)]
+        lines.append(f"{source + ' calls / 1k req':<32}{per_k[0]:>10.1f}{per_k[1]:>10.1f}{_delta(*per_k):>9}")
+    return '\n'.join(lines)
+
+
+def _fmt(value):
+    if value is None:
+        return '-'
+    return f'{value:.1f}' if isinstance(value, float) else str(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='벤치마크 결과 비교')
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args(argv)
+    print(compare(_load(args.before), _load(args.after)))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
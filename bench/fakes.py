@@ -0,0 +1,322 @@
+# bench/fakes.py
+# 벤치마크용 가짜 AniList GraphQL / Gemini 서버 (실제 API 한도를 쓰지 않고 부하 테스트)
+#
+#   python bench/fakes.py anilist --port 5101 --latency 0.15 --jitter 0.05 --error-rate 0.01
+#   python bench/fakes.py gemini --port 5102 --latency 0.4 --per-kchar 0.5 --disagree-rate 0.1
+#
+# 앱은 ANILIST_API_URL=http://127.0.0.1:5101/ , GEMINI_BASE_URL=http://127.0.0.1:5102 로 연결한다.
+# GET /__stats : 받은 요청 수 (종류별), POST /__reset : 카운터 초기화
+
+import re
+import sys
+import json
+import random
+import asyncio
+import argparse
+import threading
+from collections import Counter
+
+GENRES = ['Action', 'Adventure', 'Comedy', 'Drama', 'Fantasy', 'Romance', 'Sci-Fi', 'Slice of Life', 'Sports', 'Mystery']
+WORDS = ['Blue', 'Spring', 'Sword', 'Star', 'Night', 'Dragon', 'Summer', 'Ghost', 'Academy', 'Railgun',
+         'Garden', 'Moon', 'Hero', 'Shadow', 'Sky', 'Tale', 'Witch', 'Island', 'Steel', 'Song']
+ROLES = ['Director', 'Original Creator', 'Character Design', 'Music', 'Series Composition']
+
+# 가짜 번역 결과 접두어 (부하 도구의 한국어 검색어도 이 형식이라 검색어 변환이 원래 제목으로 돌아감)
+KOREAN_PREFIX = '한글 '
+
+
+def build_catalog(size, seed=0):
+    """id 1..size의 결정적인 가짜 작품 목록 (같은 seed면 커밋이 달라도 같은 데이터)"""
+    rng = random.Random(seed)
+    catalog = {}
+    for media_id in range(1, size + 1):
+        words = rng.sample(WORDS, 3)
+        romaji = f'{words[0]} no {words[1]} {media_id}'
+        english = f'{words[1]} {words[2]} {media_id}' if rng.random() < 0.8 else None
+        paragraphs = [
+            ' '.join(f'{rng.choice(WORDS)} {rng.choice(WORDS).lower()} sentence {i}.' for i in range(rng.randint(3, 8)))
+            for _ in range(rng.randint(1, 4))
+        ]
+        year = rng.randint(1995, 2025)
+        catalog[media_id] = {
+            'id': media_id,
+            'title': {'romaji': romaji, 'english': english, 'native': f'ネイティブ {media_id}'},
+            'genres': rng.sample(GENRES, rng.randint(1, 3)),
+            'episodes': rng.choice([1, 12, 13, 24, 25, 48]),
+            'averageScore': rng.randint(55, 92),
+            'popularity': rng.randint(1000, 500000),
+            'trending': rng.randint(0, 300),
+            'favourites': rng.randint(0, 50000),
+            'updatedAt': 1700000000 + rng.randint(0, 10000000),
+            # 실제 AniList처럼 일부 작품은 출처 표기가 붙음 (rng를 쓰지 않아 다른 필드는 그대로)
+            'description': '<br><br>'.join(paragraphs) + ('<br><br>(Source: Crunchyroll)' if media_id % 3 == 0 else ''),
+            'coverImage': {'extraLarge': f'https://img.example/{media_id}.jpg'},
+            'startDate': {'year': year, 'month': rng.randint(1, 12), 'day': rng.randint(1, 28)},
+            'endDate': {'year': year, 'month': rng.randint(1, 12), 'day': rng.randint(1, 28)},
+            'characters': {'edges': [{'node': {'name': {'full': f'Character {media_id}-{i}'}}} for i in range(5)]},
+            'staff': {'edges': [{'node': {'name': {'full': f'Staff {media_id}-{i}'}}, 'role': role}
+                                for i, role in enumerate(rng.sample(ROLES, 3))]},
+            'studios': {'nodes': [{'name': f'Studio {media_id % 17}'}]},
+        }
+    return catalog
+
+
+class FakeServer:
+    """지연/에러 비율을 조절할 수 있는 ASGI 앱 공통 부분"""
+
+    def __init__(self, latency=0.1, jitter=0.0, error_rate=0.0, seed=0, tail_rate=0.0, tail_latency=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.tail_rate = tail_rate        # 이 비율의 요청은 tail_latency만큼 더 느림 (꼬리 지연 재현)
+        self.tail_latency = tail_latency
+        self.rng = random.Random(seed)
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def count(self, key, value=1):
+        with self._lock:
+            self.stats[key] += value
+
+    def delay(self, extra=0.0):
+        # tail_rate가 0이면 rng를 쓰지 않음 (기존 결과와 같은 난수 순서 유지)
+        if self.tail_rate and self.rng.random() < self.tail_rate:
+            self.count('tail_delays')
+            extra += self.tail_latency
+        return max(0.0, self.rng.gauss(self.latency, self.jitter) + extra) if self.jitter else self.latency + extra
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        if scope['type'] != 'http':
+            return
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            body.extend(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+
+        if scope['path'] == '/__stats':
+            with self._lock:
+                stats = dict(self.stats)
+            return await self._send(send, 200, stats)
+        if scope['path'] == '/__reset':
+            with self._lock:
+                self.stats.clear()
+            return await self._send(send, 200, {})
+
+        self.count('requests')
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            return await self._send(send, 400, {'error': 'invalid json'})
+        status, response, extra_delay = self.handle(scope['path'], payload)
+        await asyncio.sleep(self.delay(extra_delay))
+        if self.rng.random() < self.error_rate:
+            self.count('injected_errors')
+            status, response = self.error_response()
+        if status >= 400:
+            self.count(f'status_{status}')
+        await self._send(send, status, response)
+
+    async def _send(self, send, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    def handle(self, path, payload):
+        raise NotImplementedError
+
+    def error_response(self):
+        raise NotImplementedError
+
+
+class FakeAniList(FakeServer):
+    """Media(id) 상세 / Page 목록 쿼리만 흉내내는 AniList GraphQL (선택 필드와 상관없이 전체 필드 반환)"""
+
+    def __init__(self, catalog_size=1000, **kwargs):
+        super().__init__(**kwargs)
+        self.catalog = build_catalog(catalog_size)
+        media = list(self.catalog.values())
+        self.sorted = {
+            'ID': media,
+            'POPULARITY_DESC': sorted(media, key=lambda m: -m['popularity']),
+            'SCORE_DESC': sorted(media, key=lambda m: -m['averageScore']),
+            'TRENDING_DESC': sorted(media, key=lambda m: -m['trending']),
+            'FAVOURITES_DESC': sorted(media, key=lambda m: -m['favourites']),
+            'UPDATED_AT_DESC': sorted(media, key=lambda m: -m['updatedAt']),
+            'START_DATE_DESC': sorted(media, key=lambda m: tuple(-m['startDate'][k] for k in ('year', 'month', 'day'))),
+        }
+
+    def handle(self, path, payload):
+        query = payload.get('query') or ''
+        variables = payload.get('variables') or {}
+
+        if 'Page' in query:
+            self.count('op_page')
+            return 200, {'data': {'Page': self._page(query, variables)}}, 0.0
+
+        aliases = re.findall(r'(\w+)\s*:\s*Media\s*\(\s*id:\s*(\d+)\s*\)', query)
+        if aliases:
+            # 별칭 배치 조회: 없는 작품은 null + 404 (AniList와 같음)
+            self.count('op_detail_batch')
+            self.count('op_detail_batch_items', len(aliases))
+            data = {alias: self.catalog.get(int(media_id)) for alias, media_id in aliases}
+            if all(data.values()):
+                return 200, {'data': data}, 0.0
+            return 404, {'data': data, 'errors': [{'message': 'Not Found.', 'status': 404}]}, 0.0
+
+        match = re.search(r'Media\s*\(\s*id:\s*(\$id|\d+)', query)
+        if match:
+            self.count('op_detail')
+            media_id = variables.get('id') if match.group(1) == '$id' else int(match.group(1))
+            media = self.catalog.get(media_id)
+            if media is None:
+                return 404, {'data': {'Media': None}, 'errors': [{'message': 'Not Found.', 'status': 404}]}, 0.0
+            return 200, {'data': {'Media': media}}, 0.0
+
+        self.count('op_unknown')
+        return 400, {'data': None, 'errors': [{'message': 'unsupported query', 'status': 400}]}, 0.0
+
+    def _page(self, query, variables):
+        match = re.search(r'Page\s*\(\s*page:\s*(\$page|\d+)\s*,\s*perPage:\s*(\$perPage|\d+)', query)
+        page, per_page = 1, 10
+        if match:
+            page = variables.get('page', 1) if match.group(1) == '$page' else int(match.group(1))
+            per_page = variables.get('perPage', 10) if match.group(2) == '$perPage' else int(match.group(2))
+
+        sort = re.search(r'sort:\s*\[\s*(\w+)', query)
+        media = self.sorted.get(sort.group(1) if sort else 'POPULARITY_DESC', self.sorted['POPULARITY_DESC'])
+        genre = re.search(r'genre:\s*"([^"]+)"', query)
+        if genre:
+            media = [m for m in media if genre.group(1) in m['genres']]
+        if 'episodes_greater: 1' in query:
+            media = [m for m in media if m['episodes'] > 1]
+        score = re.search(r'averageScore_greater:\s*(\d+)', query)
+        if score:
+            media = [m for m in media if m['averageScore'] > int(score.group(1))]
+        search = variables.get('search')
+        if 'search:' in query and search:
+            needle = search.lower()
+            media = [m for m in media
+                     if needle in m['title']['romaji'].lower() or needle in (m['title']['english'] or '').lower()]
+
+        start = (page - 1) * per_page
+        return {
+            'pageInfo': {'currentPage': page, 'total': len(media), 'hasNextPage': start + per_page < len(media)},
+            'media': media[start:start + per_page],
+        }
+
+    def error_response(self):
+        return 500, {'data': None, 'errors': [{'message': 'Internal Server Error', 'status': 500}]}
+
+
+class FakeGemini(FakeServer):
+    """generateContent만 흉내내는 Gemini (프롬프트 형태로 제목/배치/줄거리/심판/검색어 요청을 구분)"""
+
+    def __init__(self, per_kchar=0.5, disagree_rate=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.per_kchar = per_kchar            # 출력 1000자당 추가 지연 (초)
+        self.disagree_rate = disagree_rate    # 후보 2개가 서로 다를 확률 (심판 호출 유도)
+
+    def handle(self, path, payload):
+        match = re.match(r'^/[^/]+/models/([^/:]+):generateContent$', path)
+        if not match:
+            return 404, {'error': {'code': 404, 'message': f'unknown path {path}', 'status': 'NOT_FOUND'}}, 0.0
+        model = match.group(1)
+        self.count(f'model_{model}')
+
+        prompt = '\n'.join(
+            part.get('text') or ''
+            for content in payload.get('contents') or []
+            for part in content.get('parts') or []
+        )
+        config = payload.get('generationConfig') or {}
+        kind, text = self._answer(prompt, config)
+        self.count(f'kind_{kind}')
+
+        texts = [text]
+        for _ in range(1, config.get('candidateCount') or 1):
+            texts.append(text + ' 2기' if self.rng.random() < self.disagree_rate else text)
+        response = {
+            'candidates': [
+                {'content': {'parts': [{'text': t}], 'role': 'model'}, 'finishReason': 'STOP', 'index': i}
+                for i, t in enumerate(texts)
+            ],
+            'modelVersion': model,
+        }
+        return 200, response, len(text) / 1000 * self.per_kchar
+
+    @staticmethod
+    def _answer(prompt, config):
+        if config.get('responseMimeType') == 'application/json':
+            titles = [line[2:] for line in prompt.split('\n') if line.startswith('- ')]
+            return 'batch', json.dumps([{'original': t, 'korean': KOREAN_PREFIX + t} for t in titles], ensure_ascii=False)
+        match = re.search(r'후보1: (.*)', prompt)
+        if match:
+            return 'judge', match.group(1)
+        match = re.search(r"애니메이션 제목 '(.*)'을\(를\)", prompt)
+        if match:
+            return 'title', KOREAN_PREFIX + match.group(1)
+        match = re.search(r'원문: (.*?)\n규칙 1', prompt, re.S)
+        if match:
+            return 'description', '[번역] ' + match.group(1)
+        match = re.search(r'AniList 검색용[^:]*: (.*)', prompt)
+        if match:
+            query = match.group(1).strip()
+            return 'search_query', query[len(KOREAN_PREFIX):] if query.startswith(KOREAN_PREFIX) else query
+        return 'other', KOREAN_PREFIX + prompt.strip().split('\n')[-1]
+
+    def error_response(self):
+        return 503, {'error': {'code': 503, 'message': 'The model is overloaded.', 'status': 'UNAVAILABLE'}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='벤치마크용 가짜 업스트림 서버')
+    parser.add_argument('kind', choices=['anilist', 'gemini'])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, required=True)
+    parser.add_argument('--latency', type=float, default=None, help='평균 응답 지연 (초)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='지연 표준편차 (초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='5xx로 응답할 비율 (0~1)')
+    parser.add_argument('--tail-rate', type=float, default=0.0, help='느린 응답 비율 (0~1)')
+    parser.add_argument('--tail-latency', type=float, default=0.0, help='느린 응답에 더할 지연 (초)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--catalog-size', type=int, default=1000, help='AniList 작품 수')
+    parser.add_argument('--per-kchar', type=float, default=0.5, help='Gemini 출력 1000자당 추가 지연 (초)')
+    parser.add_argument('--disagree-rate', type=float, default=0.1, help='Gemini 후보 불일치 비율')
+    args = parser.parse_args(argv)
+
+    common = {'jitter': args.jitter, 'error_rate': args.error_rate, 'seed': args.seed,
+              'tail_rate': args.tail_rate, 'tail_latency': args.tail_latency}
+    if args.kind == 'anilist':
+        app = FakeAniList(catalog_size=args.catalog_size, latency=0.15 if args.latency is None else args.latency, **common)
+    else:
+        app = FakeGemini(per_kchar=args.per_kchar, disagree_rate=args.disagree_rate,
+                         latency=0.4 if args.latency is None else args.latency, **common)
+
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config as HypercornConfig
+
+    config = HypercornConfig()
+    config.bind = [f'{args.host}:{args.port}']
+    config.accesslog = None
+    config.errorlog = '-'
+    config.loglevel = 'WARNING'
+    asyncio.run(serve(app, config))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
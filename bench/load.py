@@ -0,0 +1,344 @@
+# bench/load.py
+# 실행 중인 앱에 검색/인기/추천/상세/리뷰 요청을 섞어서 보내고 지연/처리량/업스트림 호출 수를 측정
+#
+#   python bench/load.py --url http://127.0.0.1:5000 --mix browse --concurrency 20 --duration 30 \
+#       --anilist-stats http://127.0.0.1:5101 --gemini-stats http://127.0.0.1:5102 --output result.json
+#
+# 보통은 bench/run.py가 가짜 업스트림 + 앱을 띄운 뒤 이 모듈을 사용한다.
+# --isolate를 주면 엔드포인트를 하나씩 따로 돌려서 업스트림 호출 수를 엔드포인트별로 나눠 센다.
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+from collections import Counter, defaultdict
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fakes import KOREAN_PREFIX, build_catalog  # noqa: E402
+
+# 이름 -> 엔드포인트별 가중치 (--mix search=3,detail=5 처럼 직접 지정도 가능)
+MIXES = {
+    'browse': {'popular': 15, 'recommendations': 20, 'search': 15, 'search_ko': 5, 'detail': 25,
+               'detail_stream': 5, 'reviews': 10, 'review_post': 5},
+    'detail': {'detail': 70, 'detail_stream': 10, 'reviews': 20},
+    'search': {'search': 60, 'search_ko': 30, 'popular': 10},
+    'write': {'reviews': 50, 'review_post': 50},
+}
+LIST_ENDPOINTS = ('popular', 'recommendations', 'search', 'search_ko')
+SORTS = ['POPULARITY_DESC', 'SCORE_DESC', 'TRENDING_DESC']
+GENRES = ['Action', 'Comedy', 'Drama', 'Fantasy', 'Romance']
+
+
+class Scenario:
+    """엔드포인트 이름 → (메서드, 경로, 본문) 생성 (seed가 같으면 같은 요청 순서)"""
+
+    def __init__(self, catalog_size=1000, hot_ids=200):
+        catalog = build_catalog(catalog_size)
+        self.ids = list(catalog)
+        self.hot_ids = self.ids[:hot_ids]
+        self.titles = [m['title']['english'] or m['title']['romaji'] for m in catalog.values()]
+
+    def _anime_id(self, rng):
+        # 상세 페이지는 인기 작품에 몰림 (80%는 상위 hot_ids 안에서)
+        return rng.choice(self.hot_ids) if rng.random() < 0.8 else rng.choice(self.ids)
+
+    def request(self, name, rng):
+        if name == 'popular':
+            return 'GET', '/api/popular_anime', None
+        if name == 'recommendations':
+            params = f'sort={rng.choice(SORTS)}'
+            if rng.random() < 0.5:
+                params += f'&genre={rng.choice(GENRES)}'
+            return 'GET', f'/api/recommendations?{params}', None
+        if name == 'search':
+            # 제목 일부(단어 하나)로 검색
+            word = rng.choice(rng.choice(self.titles).split())
+            return 'GET', f'/api/search_anime?query={word}', None
+        if name == 'search_ko':
+            # 한국어 검색어 → Gemini 검색어 변환을 거침
+            return 'GET', f'/api/search_anime?query={KOREAN_PREFIX}{rng.choice(self.titles)}', None
+        if name == 'detail':
+            return 'GET', f'/api/anime_detail/{self._anime_id(rng)}', None
+        if name == 'detail_stream':
+            return 'GET', f'/api/anime_detail/{self._anime_id(rng)}/stream', None
+        if name == 'reviews':
+            return 'GET', f'/api/reviews/{self._anime_id(rng)}', None
+        if name == 'review_post':
+            return 'POST', '/api/review', {
+                'animeId': self._anime_id(rng),
+                'rating': rng.randint(0, 100),
+                'text': f'bench review {rng.random():.6f}',
+                'username': 'bench',
+            }
+        raise ValueError(f'알 수 없는 엔드포인트: {name}')
+
+
+def parse_mix(value):
+    if value in MIXES:
+        return dict(MIXES[value])
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, p):
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def parse_server_timing(header):
+    stages = {}
+    for item in (header or '').split(','):
+        name, _, rest = item.strip().partition(';dur=')
+        if name and rest:
+            try:
+                stages[name] = float(rest)
+            except ValueError:
+                pass
+    return stages
+
+
+async def _request(client, method, path, body):
+    started = time.perf_counter()
+    response, status, stages = None, 0, {}
+    try:
+        response = await client.request(method, path, json=body)
+        await response.aread()  # 스트리밍 응답은 마지막 줄까지 받은 시간으로 측정
+        status = response.status_code
+        stages = parse_server_timing(response.headers.get('Server-Timing'))
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    return response, status, time.perf_counter() - started, stages
+
+
+async def _worker(client, scenario, mix, rng, deadline, remaining, samples, warmup, prefetch=False):
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    while time.monotonic() < deadline:
+        if remaining is not None:
+            if remaining[0] <= 0:
+                return
+            remaining[0] -= 1
+        name = rng.choices(names, weights)[0]
+        method, path, body = scenario.request(name, rng)
+        response, status, elapsed, stages = await _request(client, method, path, body)
+        if time.monotonic() >= warmup:
+            samples.append((name, status, elapsed, stages))
+
+        # 브라우저처럼 목록을 받은 뒤 카드 상세 프리페치 요청 (--prefetch)
+        if prefetch and name in LIST_ENDPOINTS and status == 200:
+            ids = [anime['id'] for anime in response.json().get('data') or []]
+            if ids:
+                _, status, elapsed, stages = await _request(client, 'POST', '/api/anime_detail/prefetch', {'ids': ids})
+                if time.monotonic() >= warmup:
+                    samples.append(('prefetch', status, elapsed, stages))
+
+
+async def fetch_json(url):
+    async with httpx.AsyncClient(timeout=10) as client:
+        response = await client.get(url)
+        response.raise_for_status()
+        return response.json()
+
+
+async def fetch_app_counters(base_url):
+    """앱 /metrics에서 업스트림 호출 카운터만 읽음 (없으면 빈 dict)"""
+    try:
+        async with httpx.AsyncClient(timeout=10) as client:
+            response = await client.get(base_url.rstrip('/') + '/metrics')
+        if response.status_code != 200:
+            return {}
+    except httpx.HTTPError:
+        return {}
+    counters = Counter()
+    pattern = re.compile(r'^(anilist_requests_total|anilist_cache_total|gemini_calls_total|translation_lookups_total|cache_lookups_total)(\{[^}]*\})? ([0-9.e+-]+)$')
+    for line in response.text.splitlines():
+        match = pattern.match(line)
+        if match:
+            counters[match.group(1) + (match.group(2) or '')] += float(match.group(3))
+    return counters
+
+
+async def upstream_snapshot(args):
+    snapshot = {'app': await fetch_app_counters(args.url)}
+    for name in ('anilist', 'gemini'):
+        url = getattr(args, f'{name}_stats')
+        snapshot[name] = Counter(await fetch_json(url.rstrip('/') + '/__stats')) if url else Counter()
+    return snapshot
+
+
+def diff_snapshot(before, after):
+    result = {}
+    for key in after:
+        delta = {k: v - before[key].get(k, 0) for k, v in after[key].items()}
+        result[key] = {k: (int(v) if float(v).is_integer() else v) for k, v in sorted(delta.items()) if v}
+    return result
+
+
+def summarize(samples, elapsed):
+    by_endpoint = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample[0]].append(sample)
+
+    def stats(rows):
+        latencies = sorted(r[2] * 1000 for r in rows)
+        statuses = Counter(str(r[1]) for r in rows)
+        errors = sum(n for s, n in statuses.items() if not s.isdigit() or int(s) >= 500)
+        stage_totals = defaultdict(float)
+        for row in rows:
+            for stage, ms in row[3].items():
+                if stage != 'total':
+                    stage_totals[stage] += ms
+        return {
+            'requests': len(rows),
+            'throughput_rps': round(len(rows) / elapsed, 2) if elapsed else None,
+            'errors': errors,
+            'statuses': dict(sorted(statuses.items())),
+            'p50_ms': _round(percentile(latencies, 50)),
+            'p95_ms': _round(percentile(latencies, 95)),
+            'p99_ms': _round(percentile(latencies, 99)),
+            'mean_ms': _round(sum(latencies) / len(latencies)) if latencies else None,
+            'max_ms': _round(latencies[-1]) if latencies else None,
+            # Server-Timing 헤더 기준 요청당 평균 단계 시간
+            'stages_mean_ms': {s: _round(t / len(rows)) for s, t in sorted(stage_totals.items())},
+        }
+
+    return {
+        'total': stats(samples),
+        'endpoints': {name: stats(rows) for name, rows in sorted(by_endpoint.items())},
+    }
+
+
+def _round(value):
+    return None if value is None else round(value, 1)
+
+
+async def run_load(args, mix, duration, requests=None):
+    """mix 비율로 duration초(또는 requests개) 동안 부하를 주고 (요약, 업스트림 증가량) 반환"""
+    scenario = Scenario(args.catalog_size)
+    samples = []
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        before = await upstream_snapshot(args)
+        started = time.monotonic()
+        warmup = started + args.warmup
+        deadline = warmup + duration
+        remaining = [requests] if requests else None
+        await asyncio.gather(*(
+            _worker(client, scenario, mix, random.Random(args.seed * 1000 + i), deadline, remaining, samples, warmup,
+                    args.prefetch)
+            for i in range(args.concurrency)
+        ))
+        elapsed = time.monotonic() - max(warmup, started)
+        after = await upstream_snapshot(args)
+    summary = summarize(samples, elapsed)
+    summary['elapsed_s'] = round(elapsed, 2)
+    summary['upstream'] = diff_snapshot(before, after)
+    return summary
+
+
+def git_revision():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=root, text=True).strip()
+        dirty = bool(subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root, text=True).strip())
+        subject = subprocess.check_output(['git', 'log', '-1', '--format=%s'], cwd=root, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+    return {'commit': commit, 'dirty': dirty, 'subject': subject}
+
+
+async def run(args):
+    mix = parse_mix(args.mix)
+    result = {
+        'meta': {
+            **git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'mix': mix,
+            'concurrency': args.concurrency,
+            'duration_s': args.duration,
+            'requests': args.requests,
+            'seed': args.seed,
+            'prefetch': args.prefetch,
+            **(args.extra_meta or {}),
+        },
+    }
+    result.update(await run_load(args, mix, args.duration, args.requests))
+
+    if args.isolate:
+        # 엔드포인트별로 따로 돌려서 업스트림 호출 수를 나눠 봄 (캐시 상태는 앞 단계에서 이어짐)
+        result['isolated'] = {}
+        for name in mix:
+            summary = await run_load(args, {name: 1}, args.isolate)
+            result['isolated'][name] = {**summary['endpoints'].get(name, {}), 'upstream': summary['upstream']}
+    return result
+
+
+def print_report(result):
+    meta = result['meta']
+    print(f"커밋 {meta.get('commit', '?')}{' (수정됨)' if meta.get('dirty') else ''}  "
+          f"동시 {meta['concurrency']}  {result['elapsed_s']}초")
+    header = f"{'endpoint':<16}{'req':>7}{'rps':>8}{'err':>6}{'p50':>9}{'p95':>9}{'p99':>9}"
+    print(header)
+    print('-' * len(header))
+    rows = list(result['endpoints'].items()) + [('TOTAL', result['total'])]
+    for name, s in rows:
+        print(f"{name:<16}{s['requests']:>7}{s['throughput_rps'] or 0:>8.1f}{s['errors']:>6}"
+              f"{s['p50_ms'] or 0:>9.1f}{s['p95_ms'] or 0:>9.1f}{s['p99_ms'] or 0:>9.1f}")
+    for source, counters in result['upstream'].items():
+        if counters and source != 'app':
+            print(f"{source}: " + ', '.join(f'{k}={v}' for k, v in counters.items()))
+    for name, s in (result.get('isolated') or {}).items():
+        upstream = {src: c.get('requests', 0) for src, c in s['upstream'].items() if src != 'app'}
+        print(f"[단독] {name:<16} p50 {s.get('p50_ms')}ms  p95 {s.get('p95_ms')}ms  업스트림 {upstream}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='앱 부하 테스트')
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--mix', default='browse', help=f"{', '.join(MIXES)} 또는 name=weight,...")
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=30.0, help='측정 시간 (초)')
+    parser.add_argument('--requests', type=int, default=None, help='요청 수를 고정 (duration보다 먼저 끝나면 종료)')
+    parser.add_argument('--warmup', type=float, default=0.0, help='측정에서 뺄 앞부분 시간 (초)')
+    parser.add_argument('--isolate', type=float, default=0.0, help='엔드포인트별 단독 실행 시간 (초, 0이면 생략)')
+    parser.add_argument('--prefetch', action='store_true', help='목록 응답 뒤 상세 프리페치 요청도 보냄 (프론트엔드와 같음)')
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--catalog-size', type=int, default=1000)
+    parser.add_argument('--anilist-stats', default=None, help='가짜 AniList 서버 주소 (호출 수 집계용)')
+    parser.add_argument('--gemini-stats', default=None, help='가짜 Gemini 서버 주소 (호출 수 집계용)')
+    parser.add_argument('--output', default=None, help='결과 JSON 파일')
+    parser.set_defaults(extra_meta=None)
+    return parser
+
+
+def save_result(result, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f'결과 저장: {path}')
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    result = asyncio.run(run(args))
+    print_report(result)
+    if args.output:
+        save_result(result, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+# bench/multiprocess_writes.py
+# 멀티 워커 배포 프로필(APP_CONFIG=multiworker) 점검: 여러 프로세스가 동시에
+# 리뷰 작성 / 번역 저장 / 공유 캐시 쓰기를 했을 때 잠금 에러나 유실이 없는지 확인
+#
+#   python bench/multiprocess_writes.py --processes 4 --reviews 50
+#
+# 임시 디렉터리의 DB/캐시를 사용하므로 instance/reviews.db는 건드리지 않는다.
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ANIME_IDS = [1, 2, 3]
+SHARED_TITLES = [f'Shared Title {i}' for i in range(30)]
+
+
+def _worker(index, reviews, start_event, results):
+    from app import create_app
+    from extensions import cache
+    from services.gemini_service import _bulk_store_translations, _store_translation
+    from services.translation_worker import translation_worker
+
+    app = create_app()
+    translation_worker.enabled = False  # write-behind 없이 바로 DB에 저장
+    client = app.test_client()
+    errors = []
+    start_event.wait()
+
+    started = time.perf_counter()
+    for i in range(reviews):
+        response = client.post('/api/review', json={
+            'animeId': ANIME_IDS[i % len(ANIME_IDS)],
+            'rating': (index * 7 + i * 13) % 101,
+            'text': f'process {index} review {i}',
+            'username': f'p{index}',
+        })
+        if response.status_code != 201:
+            errors.append(f'review {i}: HTTP {response.status_code} {response.get_json()}')
+
+        with app.app_context():
+            # 모든 프로세스가 같은 제목을 저장 (ON CONFLICT로 한 줄만 남아야 함)
+            title = SHARED_TITLES[i % len(SHARED_TITLES)]
+            _bulk_store_translations({title: f'공유 제목 {i % len(SHARED_TITLES)}'}, 'title')
+            _store_translation(f'process {index} text {i}', f'프로세스 {index} 텍스트 {i}', 'general')
+            cache.set(f'bench:process:{index}', i)
+    elapsed = time.perf_counter() - started
+
+    # 다른 프로세스가 쓴 캐시 값이 보이는지 (SimpleCache면 안 보임)
+    with app.app_context():
+        time.sleep(0.5)
+        visible = sum(1 for other in range(results['processes']) if cache.get(f'bench:process:{other}') is not None)
+    results[index] = {'elapsed': elapsed, 'errors': errors, 'visible_caches': visible}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='멀티 워커 동시 쓰기 점검')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--reviews', type=int, default=50, help='프로세스당 리뷰 수')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-multiworker-')
+    os.environ['APP_CONFIG'] = 'multiworker'
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'reviews.db')
+    os.environ['CACHE_DIR'] = os.path.join(workdir, 'cache')
+
+    # 배포처럼 워커를 띄우기 전에 스키마를 한 번 적용 (flask migrate와 같음)
+    from app import create_app
+    from migrations import run_migrations
+    with create_app().app_context():
+        run_migrations()
+
+    ctx = multiprocessing.get_context('spawn')
+    manager = ctx.Manager()
+    results = manager.dict(processes=args.processes)
+    start_event = ctx.Event()
+    processes = [
+        ctx.Process(target=_worker, args=(i, args.reviews, start_event, results))
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    time.sleep(3)  # 앱 생성이 끝날 때까지 대기 후 동시에 시작
+    start_event.set()
+    for process in processes:
+        process.join()
+
+    from sqlalchemy import func
+    from extensions import db
+    from models import Review, ReviewStats, Translation
+
+    app = create_app()
+    with app.app_context():
+        review_count = Review.query.count()
+        stats_count = db.session.query(func.sum(ReviewStats.count)).scalar() or 0
+        stats_sum = db.session.query(func.sum(ReviewStats.rating_sum)).scalar() or 0
+        rating_sum = db.session.query(func.sum(Review.rating)).scalar() or 0
+        titles = Translation.query.filter_by(type='title').count()
+        generals = Translation.query.filter_by(type='general').count()
+        journal_mode = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+
+    expected_reviews = args.processes * args.reviews
+    problems = []
+    for i in range(args.processes):
+        result = results.get(i)
+        if result is None:
+            problems.append(f'프로세스 {i} 결과 없음 (비정상 종료)')
+            continue
+        print(f"프로세스 {i}: {result['elapsed']:.2f}초, 에러 {len(result['errors'])}개, "
+              f"보이는 캐시 {result['visible_caches']}/{args.processes}")
+        problems += result['errors'][:3]
+        if result['visible_caches'] != args.processes:
+            problems.append(f'프로세스 {i}: 다른 프로세스 캐시가 보이지 않음')
+    if review_count != expected_reviews:
+        problems.append(f'리뷰 {review_count}개 (기대 {expected_reviews})')
+    if (stats_count, stats_sum) != (review_count, rating_sum):
+        problems.append(f'집계 불일치: count {stats_count}/{review_count}, sum {stats_sum}/{rating_sum}')
+    if titles != len(SHARED_TITLES[:args.reviews]):
+        problems.append(f'공유 제목 {titles}줄 (기대 {len(SHARED_TITLES[:args.reviews])})')
+    if generals != expected_reviews:
+        problems.append(f'일반 번역 {generals}줄 (기대 {expected_reviews})')
+
+    print(f'journal_mode={journal_mode}, 리뷰 {review_count}, 제목 {titles}, 일반 번역 {generals}')
+    print(f'작업 디렉터리: {workdir}')
+    if problems:
+        print('실패:')
+        for problem in problems:
+            print(f'  - {problem}')
+        sys.exit(1)
+    print('통과')
+
+
+if __name__ == '__main__':
+    main()
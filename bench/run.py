@@ -0,0 +1,157 @@
+# bench/run.py
+# 가짜 AniList/Gemini 서버 + 앱(임시 DB/캐시)을 띄우고 부하 테스트 후 결과 JSON 저장
+#
+#   python bench/run.py --mix browse --concurrency 20 --duration 30
+#   python bench/run.py --server wsgi --anilist-latency 0.3 --gemini-error-rate 0.05
+#   python bench/compare.py bench/results/<이전>.json bench/results/<지금>.json
+#
+# 부하 옵션(--mix, --concurrency, --duration, --isolate ...)은 bench/load.py와 같다.
+# 실제 AniList/Gemini에는 요청을 보내지 않는다.
+
+import os
+import sys
+import time
+import socket
+import asyncio
+import tempfile
+import subprocess
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+import load  # noqa: E402
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url, process, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'프로세스가 시작 중 종료됨: {" ".join(process.args)}')
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f'{url} 응답 없음 ({timeout}초)')
+
+
+def _start(command, env=None, log=None):
+    return subprocess.Popen(command, cwd=ROOT_DIR, env=env, stdout=log, stderr=subprocess.STDOUT if log else None)
+
+
+def main(argv=None):
+    parser = load.build_parser()
+    parser.description = '가짜 업스트림 + 앱을 띄워서 부하 테스트'
+    parser.add_argument('--server', choices=['asgi', 'wsgi'], default='asgi',
+                        help='asgi: hypercorn asgi:app / wsgi: flask 개발 서버 (스레드)')
+    parser.add_argument('--workers', type=int, default=1, help='hypercorn 워커 수 (2 이상이면 APP_CONFIG=multiworker)')
+    parser.add_argument('--anilist-latency', type=float, default=0.15)
+    parser.add_argument('--anilist-jitter', type=float, default=0.05)
+    parser.add_argument('--anilist-error-rate', type=float, default=0.0)
+    parser.add_argument('--gemini-latency', type=float, default=0.4)
+    parser.add_argument('--gemini-jitter', type=float, default=0.1)
+    parser.add_argument('--gemini-error-rate', type=float, default=0.0)
+    parser.add_argument('--gemini-per-kchar', type=float, default=0.5)
+    parser.add_argument('--gemini-disagree-rate', type=float, default=0.1)
+    parser.add_argument('--gemini-tail-rate', type=float, default=0.0, help='Gemini 느린 응답 비율 (헤징 확인용)')
+    parser.add_argument('--gemini-tail-latency', type=float, default=5.0, help='Gemini 느린 응답에 더할 지연 (초)')
+    parser.add_argument('--anilist-rate-limit', type=int, default=None, help='앱의 AniList 분당 한도 (기본: config 값)')
+    parser.add_argument('--gemini-rate-limit', type=int, default=None, help='앱의 Gemini 분당 한도 (기본: config 값)')
+    parser.add_argument('--app-log', default=None, help='앱 출력 파일 (기본: 작업 디렉터리/app.log)')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='bench-run-')
+    anilist_port, gemini_port, app_port = _free_port(), _free_port(), _free_port()
+    args.anilist_stats = f'http://127.0.0.1:{anilist_port}'
+    args.gemini_stats = f'http://127.0.0.1:{gemini_port}'
+    args.url = f'http://127.0.0.1:{app_port}'
+
+    env = dict(os.environ)
+    env.update({
+        'ANILIST_API_URL': f'http://127.0.0.1:{anilist_port}/',
+        'GEMINI_BASE_URL': f'http://127.0.0.1:{gemini_port}',
+        'GEMINI_API_KEY': 'bench',
+        'DATABASE_URL': 'sqlite:///' + os.path.join(workdir, 'reviews.db'),
+        'CACHE_DIR': os.path.join(workdir, 'cache'),
+        'APP_CONFIG': 'multiworker' if args.workers > 1 else env.get('APP_CONFIG', 'default'),
+    })
+    if args.anilist_rate_limit:
+        env['ANILIST_RATE_LIMIT'] = str(args.anilist_rate_limit)
+    if args.gemini_rate_limit:
+        env['GEMINI_RATE_LIMIT'] = str(args.gemini_rate_limit)
+
+    fakes = os.path.join(BENCH_DIR, 'fakes.py')
+    if args.server == 'asgi':
+        app_command = [sys.executable, '-m', 'hypercorn', 'asgi:app', '--bind', f'127.0.0.1:{app_port}',
+                       '--workers', str(args.workers)]
+    else:
+        app_command = [sys.executable, '-m', 'flask', '--app', 'app:create_app()', 'run',
+                       '--port', str(app_port), '--with-threads']
+
+    app_log = open(args.app_log or os.path.join(workdir, 'app.log'), 'w')
+    processes = []
+    try:
+        processes.append(_start([sys.executable, fakes, 'anilist', '--port', str(anilist_port),
+                                 '--latency', str(args.anilist_latency), '--jitter', str(args.anilist_jitter),
+                                 '--error-rate', str(args.anilist_error_rate), '--seed', str(args.seed),
+                                 '--catalog-size', str(args.catalog_size)]))
+        processes.append(_start([sys.executable, fakes, 'gemini', '--port', str(gemini_port),
+                                 '--latency', str(args.gemini_latency), '--jitter', str(args.gemini_jitter),
+                                 '--error-rate', str(args.gemini_error_rate), '--seed', str(args.seed),
+                                 '--per-kchar', str(args.gemini_per_kchar),
+                                 '--disagree-rate', str(args.gemini_disagree_rate),
+                                 '--tail-rate', str(args.gemini_tail_rate),
+                                 '--tail-latency', str(args.gemini_tail_latency)]))
+        _wait_ready(args.anilist_stats + '/__stats', processes[0])
+        _wait_ready(args.gemini_stats + '/__stats', processes[1])
+        # 배포처럼 스키마는 앱을 띄우기 전에 따로 적용 (multiworker 프로필은 시작 시 적용하지 않음)
+        subprocess.run([sys.executable, '-m', 'flask', '--app', 'app:create_app()', 'migrate'], cwd=ROOT_DIR, env=env,
+                       check=True, stdout=app_log, stderr=subprocess.STDOUT)
+        processes.append(_start(app_command, env=env, log=app_log))
+        _wait_ready(args.url + '/', processes[2], timeout=60.0)
+
+        args.extra_meta = {
+            'server': args.server,
+            'workers': args.workers,
+            'rate_limits': {'anilist': args.anilist_rate_limit, 'gemini': args.gemini_rate_limit},
+            'upstream': {
+                'anilist': {'latency': args.anilist_latency, 'jitter': args.anilist_jitter,
+                            'error_rate': args.anilist_error_rate},
+                'gemini': {'latency': args.gemini_latency, 'jitter': args.gemini_jitter,
+                           'error_rate': args.gemini_error_rate, 'per_kchar': args.gemini_per_kchar,
+                           'disagree_rate': args.gemini_disagree_rate, 'tail_rate': args.gemini_tail_rate,
+                           'tail_latency': args.gemini_tail_latency},
+            },
+        }
+        result = asyncio.run(load.run(args))
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        app_log.close()
+
+    load.print_report(result)
+    output = args.output
+    if output is None:
+        results_dir = os.path.join(BENCH_DIR, 'results')
+        os.makedirs(results_dir, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{result['meta'].get('commit', 'nogit')}-{args.mix.replace(',', '_').replace('=', '')}.json"
+        output = os.path.join(results_dir, name)
+    load.save_result(result, output)
+    print(f'작업 디렉터리 (DB/앱 로그): {workdir}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+# bench/startup.py
+# 워커 시작 비용 측정: import 시간, create_app 시간, 프로세스 시작 → 첫 응답까지 시간
+#
+#   python bench/startup.py --repeat 5
+#   python bench/startup.py --server wsgi --max-first-request-ms 1500 --output startup.json
+#
+# 업스트림 요청은 보내지 않는다 (첫 요청은 리뷰 조회 = DB만 사용).
+# 시작할 때 불러오면 안 되는 무거운 모듈(google.genai 등)이 import되면 실패로 표시한다.
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from collections import Counter
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+from run import _free_port  # noqa: E402
+from load import git_revision  # noqa: E402
+
+# 첫 번역 때 불러와야 하는 모듈 (앱 import에 끼어들면 회귀)
+LAZY_MODULES = ['google.genai', 'pydantic']
+FIRST_REQUEST_PATH = '/api/reviews/1'
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+CREATE_APP_SNIPPET = '''
+import time, json
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+print(json.dumps({"import_ms": (imported - started) * 1000, "create_app_ms": (time.perf_counter() - imported) * 1000}))
+'''
+
+
+def _env(workdir, app_config):
+    env = dict(os.environ)
+    env.update({
+        'DATABASE_URL': 'sqlite:///' + os.path.join(workdir, 'reviews.db'),
+        'CACHE_DIR': os.path.join(workdir, 'cache'),
+        'APP_CONFIG': app_config,
+        # 업스트림으로 나가지 않도록 닫힌 포트를 지정
+        'ANILIST_API_URL': 'http://127.0.0.1:9/',
+        'GEMINI_BASE_URL': 'http://127.0.0.1:9',
+    })
+    return env
+
+
+def measure_imports(env):
+    """python -X importtime -c 'import app' → (전체 ms, 최상위 패키지별 누적 ms, 불러온 모듈 목록)"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=ROOT_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    by_package = Counter()
+    modules = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+        modules.append(module)
+        by_package[module.split('.')[0]] += self_us
+        if len(indent) == 1:  # 최상위 import (하위 import는 들여쓰기가 더 깊음)
+            total_us += cumulative_us
+    return total_us / 1000, {k: v / 1000 for k, v in by_package.most_common()}, modules
+
+
+def measure_create_app(env):
+    result = subprocess.run([sys.executable, '-c', CREATE_APP_SNIPPET], cwd=ROOT_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_first_request(env, server, timeout=60.0):
+    """서버 프로세스 시작부터 FIRST_REQUEST_PATH가 200을 돌려줄 때까지 ms"""
+    port = _free_port()
+    if server == 'asgi':
+        command = [sys.executable, '-m', 'hypercorn', 'asgi:app', '--bind', f'127.0.0.1:{port}']
+    else:
+        command = [sys.executable, '-m', 'flask', '--app', 'app:create_app()', 'run', '--port', str(port),
+                   '--with-threads']
+    url = f'http://127.0.0.1:{port}{FIRST_REQUEST_PATH}'
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f'서버가 시작 중 종료됨: {" ".join(command)}')
+            try:
+                if httpx.get(url, timeout=1.0).status_code == 200:
+                    return (time.perf_counter() - started) * 1000
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f'{url} 응답 없음 ({timeout}초)')
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def _stats(values):
+    return {'median': round(statistics.median(values), 1), 'min': round(min(values), 1),
+            'max': round(max(values), 1)}
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix='bench-startup-')
+    env = _env(workdir, args.app_config)
+
+    # 스키마는 배포 때처럼 미리 적용 (측정에서 제외, 시간만 따로 기록)
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app:create_app()', 'migrate'], cwd=ROOT_DIR, env=env,
+                   check=True, stdout=subprocess.DEVNULL)
+    migrate_ms = (time.perf_counter() - started) * 1000
+
+    imports, create_app, first_request = [], [], []
+    packages, modules = {}, []
+    for _ in range(args.repeat):
+        total, packages, modules = measure_imports(env)
+        imports.append(total)
+        create_app.append(measure_create_app(env)['create_app_ms'])
+        first_request.append(measure_first_request(env, args.server))
+
+    loaded = set(modules)
+    eager = [m for m in LAZY_MODULES if m in loaded]
+    return {
+        'meta': {**git_revision(), 'python': sys.version.split()[0], 'server': args.server,
+                 'app_config': args.app_config, 'repeat': args.repeat},
+        'migrate_ms': round(migrate_ms, 1),
+        'import_ms': _stats(imports),
+        'create_app_ms': _stats(create_app),
+        'first_request_ms': _stats(first_request),
+        'top_packages_ms': {k: round(v, 1) for k, v in list(packages.items())[:args.top]},
+        'module_count': len(modules),
+        'eager_lazy_modules': eager,
+    }
+
+
+def print_report(result):
+    meta = result['meta']
+    print(f"커밋 {meta.get('commit', '-')} / Python {meta['python']} / {meta['server']} / {meta['app_config']} / {meta['repeat']}회")
+    print(f"{'':<18}{'median':>10}{'min':>10}{'max':>10}")
+    for key, label in (('import_ms', 'import app'), ('create_app_ms', 'create_app()'),
+                       ('first_request_ms', '시작→첫 응답')):
+        s = result[key]
+        print(f"{label:<18}{s['median']:>10.1f}{s['min']:>10.1f}{s['max']:>10.1f}")
+    print(f"flask migrate: {result['migrate_ms']:.1f}ms, 모듈 {result['module_count']}개")
+    print('import 시간 상위 패키지 (self ms):')
+    for name, ms in result['top_packages_ms'].items():
+        print(f"  {name:<24}{ms:>8.1f}")
+    if result['eager_lazy_modules']:
+        print(f"경고: 시작 시 불러오면 안 되는 모듈이 import됨: {', '.join(result['eager_lazy_modules'])}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='워커 시작 시간 측정 (import / create_app / 첫 응답)')
+    parser.add_argument('--server', choices=['asgi', 'wsgi'], default='asgi')
+    parser.add_argument('--app-config', default='multiworker', help='APP_CONFIG 프로필 (기본: 배포와 같은 multiworker)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help='출력할 import 상위 패키지 수')
+    parser.add_argument('--max-import-ms', type=float, default=None, help='import 중앙값이 넘으면 종료 코드 1')
+    parser.add_argument('--max-first-request-ms', type=float, default=None, help='첫 응답 중앙값이 넘으면 종료 코드 1')
+    parser.add_argument('--output', default=None, help='결과 JSON 경로')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    result = run(args)
+    print_report(result)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    failed = bool(result['eager_lazy_modules'])
+    if args.max_import_ms and result['import_ms']['median'] > args.max_import_ms:
+        print(f"실패: import {result['import_ms']['median']}ms > {args.max_import_ms}ms")
+        failed = True
+    if args.max_first_request_ms and result['first_request_ms']['median'] > args.max_first_request_ms:
+        print(f"실패: 첫 응답 {result['first_request_ms']['median']}ms > {args.max_first_request_ms}ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
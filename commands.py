@@ -0,0 +1,224 @@
+# commands.py
+# Flask CLI 명령어 (create_app에서 등록)
+
+import os
+import json
+import math
+import asyncio
+from datetime import date
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from services.anilist_client import anilist_client, AniListError
+from services.catalog_mirror import catalog_mirror
+from services.anilist_queries import build_media_page_query, recommendation_page_range, RECOMMENDATION_PER_PAGE
+from services.gemini_service import translate_titles_to_korean_official, translate_general_text, description_chunks
+from services.translation_cache import translation_cache
+from services.translation_worker import translation_worker
+from migrations import run_migrations, pending_migrations, SCHEMA_VERSION
+from utils import get_english_title
+
+WARMUP_PER_PAGE = 50
+SEASON_MAX_PAGES = 10
+# index.html 장르 선택 목록과 동일
+GENRES = [
+    "Action", "Adventure", "Comedy", "Drama", "Fantasy", "Romance", "Sci-Fi", "Slice of Life",
+    "Sports", "Horror", "Mystery", "Thriller", "Psychological", "Mecha", "Mahou Shoujo", "Music",
+]
+
+
+def _current_season(today=None):
+    """AniList 기준 현재 시즌 (12월은 다음 해 WINTER)"""
+    today = today or date.today()
+    if today.month == 12:
+        return 'WINTER', today.year + 1
+    season = {1: 'WINTER', 2: 'WINTER', 3: 'SPRING', 4: 'SPRING', 5: 'SPRING',
+              6: 'SUMMER', 7: 'SUMMER', 8: 'SUMMER'}.get(today.month, 'FALL')
+    return season, today.year
+
+
+def _plan_jobs(sorts, genres, with_season):
+    # 추천 API가 랜덤으로 고르는 페이지 범위(perPage 5)를 perPage 50 기준으로 환산
+    jobs = []
+    for sort_option in sorts:
+        for genre in [None, *genres]:
+            items = recommendation_page_range(genre, sort_option) * RECOMMENDATION_PER_PAGE
+            jobs.append({'sort': sort_option, 'genre': genre, 'season': None, 'year': None,
+                         'pages': math.ceil(items / WARMUP_PER_PAGE)})
+    if with_season:
+        season, year = _current_season()
+        jobs.append({'sort': 'POPULARITY_DESC', 'genre': None, 'season': season, 'year': year,
+                     'pages': SEASON_MAX_PAGES})
+    return jobs
+
+
+def _page_key(job, page):
+    return '|'.join(str(v or '-') for v in (job['sort'], job['genre'], job['season'], job['year'], page))
+
+
+class _Checkpoint:
+    """완료한 페이지 목록을 JSON 파일로 저장 (중단 후 이어서 실행)"""
+
+    def __init__(self, path, reset=False):
+        self.path = path
+        self.done = set()
+        if reset and os.path.exists(path):
+            os.remove(path)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.done = set(json.load(f).get('done', []))
+
+    def mark(self, key):
+        self.done.add(key)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'done': sorted(self.done)}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+async def _warm_page(job, page, with_descriptions):
+    query = build_media_page_query(
+        job['sort'], job['genre'], per_page=WARMUP_PER_PAGE,
+        season=job['season'], season_year=job['year'], with_description=with_descriptions,
+    )
+    data = await anilist_client.query(query, {'page': page})
+    page_data = data.get('Page', {})
+    media = page_data.get('media', [])
+
+    titles = [get_english_title(m) for m in media]
+    descriptions = [m['description'] for m in media if with_descriptions and m.get('description')]
+    await translate_titles_to_korean_official(titles)
+    await asyncio.gather(*[translate_general_text(d) for d in descriptions])
+    return len(media), page_data.get('pageInfo', {}).get('hasNextPage', False), _count_untranslated(titles, descriptions)
+
+
+def _count_untranslated(titles, descriptions):
+    # Gemini 에러/서킷/마감 시간 초과면 번역 함수가 원문을 돌려주고 저장하지 않음 → 저장 여부로 판단
+    stored_titles = translation_cache.get_many(titles, 'title')
+    untranslated = sum(1 for t in dict.fromkeys(titles) if t and t not in stored_titles)
+    for description in descriptions:
+        chunks = description_chunks(description)
+        stored = translation_cache.get_many([description] + chunks, 'general')
+        if description not in stored and any(c not in stored for c in chunks):
+            untranslated += 1
+    return untranslated
+
+
+async def _run_warmup(jobs, checkpoint, concurrency, with_descriptions):
+    semaphore = asyncio.Semaphore(concurrency)
+    exhausted = set()  # 마지막 페이지를 지난 작업
+    totals = {'pages': 0, 'media': 0, 'skipped': 0, 'failed': 0}
+
+    async def run_page(job_index, job, page):
+        key = _page_key(job, page)
+        if key in checkpoint.done:
+            totals['skipped'] += 1
+            return
+        async with semaphore:
+            if job_index in exhausted:
+                return
+            try:
+                count, has_next, untranslated = await _warm_page(job, page, with_descriptions)
+            except AniListError as e:
+                totals['failed'] += 1
+                click.echo(f"  실패 {key}: {e}", err=True)
+                return
+        if not has_next:
+            exhausted.add(job_index)
+        if untranslated:
+            # 원문으로 남은 항목이 있으면 체크포인트에 넣지 않음 (다음 실행 때 다시 시도)
+            totals['failed'] += 1
+            click.echo(f"  실패 {key}: 번역 안 된 항목 {untranslated}개", err=True)
+            return
+        checkpoint.mark(key)
+        totals['pages'] += 1
+        totals['media'] += count
+        click.echo(f"  완료 {key} ({count}개)")
+
+    await asyncio.gather(*[
+        run_page(job_index, job, page)
+        for job_index, job in enumerate(jobs)
+        for page in range(1, job['pages'] + 1)
+    ])
+    return totals
+
+
+@click.command('migrate')
+@click.option('--check', is_flag=True, help='적용하지 않고 미적용 버전이 있으면 종료 코드 1')
+@with_appcontext
+def migrate_command(check):
+    """DB 스키마 마이그레이션 적용 (배포 시 워커를 띄우기 전에 한 번 실행)"""
+    pending = pending_migrations()
+    if check:
+        for version, description in pending:
+            click.echo(f"미적용: v{version} {description}")
+        if pending:
+            raise SystemExit(1)
+        click.echo(f"스키마 최신 (v{SCHEMA_VERSION})")
+        return
+    # 여러 프로세스가 동시에 실행해도 쓰기 잠금으로 한 번만 적용됨
+    for version, description in run_migrations():
+        click.echo(f"DB 마이그레이션 v{version} 적용: {description}")
+    click.echo(f"스키마 최신 (v{SCHEMA_VERSION})")
+
+
+@click.command('warmup')
+@click.option('--sort', 'sorts', multiple=True, default=('POPULARITY_DESC', 'SCORE_DESC'), show_default=True,
+              help='워밍업할 정렬 기준 (여러 번 지정 가능)')
+@click.option('--genre', 'genres', multiple=True, help='워밍업할 장르 (여러 번 지정 가능)')
+@click.option('--all-genres', is_flag=True, help='장르 선택 목록 전체 워밍업')
+@click.option('--season/--no-season', default=True, show_default=True, help='현재 시즌 작품 포함')
+@click.option('--descriptions/--no-descriptions', default=True, show_default=True, help='줄거리도 번역')
+@click.option('--concurrency', default=4, show_default=True, help='동시에 처리할 페이지 수')
+@click.option('--checkpoint', default=None, help='체크포인트 파일 경로 (기본: instance/warmup_checkpoint.json)')
+@click.option('--reset', is_flag=True, help='체크포인트를 지우고 처음부터 실행')
+@with_appcontext
+def warmup_command(sorts, genres, all_genres, season, descriptions, concurrency, checkpoint, reset):
+    """인기/추천/시즌 카탈로그 제목·줄거리를 미리 번역해 Translation 테이블 채우기"""
+    if all_genres:
+        genres = GENRES
+    os.makedirs(current_app.instance_path, exist_ok=True)
+    checkpoint = _Checkpoint(checkpoint or os.path.join(current_app.instance_path, 'warmup_checkpoint.json'), reset)
+
+    # CLI에서는 write-behind 없이 바로 DB에 저장
+    translation_worker.enabled = False
+
+    jobs = _plan_jobs(sorts, genres, season)
+    click.echo(f"워밍업 시작: 작업 {len(jobs)}개, 최대 {sum(j['pages'] for j in jobs)}페이지 (완료 {len(checkpoint.done)}페이지 건너뜀)")
+    totals = asyncio.run(_run_warmup(jobs, checkpoint, concurrency, descriptions))
+    click.echo(f"워밍업 완료: {totals['pages']}페이지 / {totals['media']}개 작품, 건너뜀 {totals['skipped']}, 실패 {totals['failed']}")
+
+
+def _echo_sync_totals(totals):
+    click.echo(f"동기화 완료 ({'전체' if totals['full'] else '증분'}): {totals['pages']}페이지, "
+               f"저장 {totals['upserted']}, 삭제 {totals['deleted']}, 트렌딩 {totals['trending']}")
+
+
+async def _watch_catalog(full):
+    # 주기가 된 동기화만 실행 (증분은 CATALOG_SYNC_INTERVAL, 전체는 CATALOG_FULL_SYNC_INTERVAL마다)
+    while True:
+        try:
+            totals = await catalog_mirror.sync(full=full, only_if_due=not full)
+            full = False
+            if totals is not None:
+                _echo_sync_totals(totals)
+        except Exception as e:
+            click.echo(f"카탈로그 동기화 에러: {e}", err=True)
+        await asyncio.sleep(min(catalog_mirror.sync_interval, 300))
+
+
+@click.command('sync-catalog')
+@click.option('--full', is_flag=True, help='전체 동기화 (기본: 지난 동기화 이후 바뀐 작품만)')
+@click.option('--watch', is_flag=True, help='끝나지 않고 주기마다 동기화 (웹 워커와 따로 띄우는 프로세스용)')
+@with_appcontext
+def sync_catalog_command(full, watch):
+    """AniList 카탈로그(JP, 성인물 제외, 평점 60 초과)를 로컬 media 테이블로 동기화"""
+    if watch:
+        # 웹 워커의 AniList 요청 한도와 따로 움직이므로 필요하면 ANILIST_RATE_LIMIT을 낮춰서 실행
+        asyncio.run(_watch_catalog(full))
+        return
+    totals = asyncio.run(catalog_mirror.sync(full=full, progress=click.echo))
+    if totals is None:
+        click.echo("다른 프로세스가 동기화 중입니다.", err=True)
+        return
+    _echo_sync_totals(totals)
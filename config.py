@@ -1,17 +1,162 @@
 # config.py
 import os
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 class Config:
     # 보안 키 등은 실제 배포 시 환경 변수로 관리하는 것이 좋습니다.
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev_secret_key'
     
     # DB 설정
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///reviews.db'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///reviews.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # SQLite 튜닝 (WAL: 읽기와 쓰기가 서로 막지 않음 / busy_timeout: 쓰기 잠금 대기 ms)
+    SQLITE_PRAGMAS = {
+        'busy_timeout': 5000,
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',  # WAL에서는 NORMAL도 커밋 손상 없음 (전원 장애 시 마지막 커밋만 유실 가능)
+    }
     
+    # ASGI 실행(asgi.py)에서 동기 뷰/스트리밍 응답이 쓰는 스레드 수
+    ASGI_SYNC_THREADS = 64
+
     # 캐시 설정
     CACHE_TYPE = 'SimpleCache'
     CACHE_DEFAULT_TIMEOUT = 3600
+
+    # 번역 메모리 캐시 (Translation 테이블 앞단 LRU/TTL)
+    TRANSLATION_CACHE_SIZE = 5000
+    TRANSLATION_CACHE_TTL = 3600
+    # 백그라운드 번역 워커 (리스트 응답은 Gemini를 기다리지 않음, DB 쓰기는 모아서 처리)
+    TRANSLATION_WORKER_ENABLED = True
+    TRANSLATION_WORKER_BATCH_SIZE = 20
+    TRANSLATION_WORKER_FLUSH_INTERVAL = 0.5
+    TRANSLATION_WORKER_RATE = 2.0  # 초당 Gemini 호출 수
+    # 제목 정밀 검증: 후보 일치율이 이 값 이상이면 안정적인 제목으로 보고 재검증 생략
+    VERIFY_STABLE_RATE = 0.8
+    VERIFY_MAX_SAMPLES = 3  # 제목당 최대 검증 횟수
+    # 추천 후보 풀: (장르, 정렬)마다 미리 받아 번역해 둔 작품에서 뽑음
+    RECOMMENDATION_POOL_MAX_ITEMS = 300  # 풀당 최대 작품 수 (AniList 페이지 6개)
+    RECOMMENDATION_POOL_LOW_WATER = 20   # 세션이 아직 안 본 후보가 이보다 적으면 백그라운드 보충
+    RECOMMENDATION_POOL_TTL = 3600       # 풀을 새로 만드는 주기 (초)
+    RECOMMENDATION_SEEN_LIMIT = 200      # 세션에 기억하는 최근 추천 수 (중복 방지)
+    # AniList 카탈로그 로컬 사본 (장르 둘러보기/정렬/추천을 SQLite에서 조회)
+    # 동기화는 flask sync-catalog 또는 웹 워커와 따로 띄운 flask sync-catalog --watch 프로세스에서만
+    CATALOG_MIRROR_ENABLED = True
+    CATALOG_SYNC_INTERVAL = 3600          # 증분 동기화 주기 (초)
+    CATALOG_FULL_SYNC_INTERVAL = 24 * 3600  # 전체 동기화 주기 (범위에서 빠진 작품 정리, 인기도 갱신)
+    CATALOG_SYNC_PAGE_DELAY = 2.0         # 동기화 페이지 간 간격 (사용자 요청이 쓸 AniList 한도 남겨두기)
+    CATALOG_SYNC_MAX_PAGES = 200
+    CATALOG_INCREMENTAL_MAX_PAGES = 20
+    CATALOG_TRENDING_PAGES = 4            # 트렌딩 상위 몇 페이지만 갱신
+    # 목록 카드 상세 정보 프리페치 (AniList 별칭 배치 쿼리 1회 + 번역 예산)
+    PREFETCH_MAX_IDS = 12                   # 요청 1번에 받는 최대 작품 수
+    PREFETCH_DESCRIPTION_BUDGET = 6         # 요청 1번에 미리 번역할 줄거리 수
+    PREFETCH_MAX_PENDING_TRANSLATIONS = 40  # 번역 워커 대기가 이보다 많으면 번역은 건너뜀
+    # HTTP 캐시 헤더 / ETag(304) / 압축 (엔드포인트 이름 -> Cache-Control)
+    HTTP_CACHE_ENABLED = True
+    HTTP_CACHE_CONTROL = {
+        'anime.home': 'no-cache',  # 배포 후 바로 새 화면이 보이도록 항상 ETag로 재검증
+        'anime.get_anime_detail': 'public, max-age=86400, stale-while-revalidate=604800',
+        # 화면이 실제로 쓰는 스트리밍 상세 (번역이 모두 저장돼 있을 때만, 아니면 부분 번역 정책)
+        'anime.stream_anime_detail': 'public, max-age=86400, stale-while-revalidate=604800',
+        'anime.get_popular_anime': 'public, max-age=60, stale-while-revalidate=600',
+        'anime.search_anime': 'public, max-age=300',
+        'anime.get_reviews': 'no-cache',  # 새 리뷰가 바로 보이도록 매번 재검증 (안 바뀌었으면 304)
+        'anime.get_recommendations': 'no-store',  # 세션마다 다른 랜덤 결과
+    }
+    HTTP_CACHE_PARTIAL_POLICY = 'no-cache'  # 번역 대기 중인 제목이 섞인 응답
+    HTTP_COMPRESS_MIN_SIZE = 1024           # 이보다 작은 응답은 압축하지 않음 (바이트)
+    HTTP_COMPRESS_LEVEL = 6
+    # 스키마는 `flask migrate`로 따로 적용 (시작할 때는 버전만 확인하고 낮으면 경고)
+    # AUTO_MIGRATE=1이면 시작할 때 바로 적용 (워커 1개로 띄우는 로컬 개발용)
+    AUTO_MIGRATE = os.environ.get('AUTO_MIGRATE', '0') == '1'
+    # 줄거리 번역 조각 최대 길이 (문단 단위, 이보다 긴 문단은 문장 단위로 나눠 동시에 번역)
+    DESCRIPTION_CHUNK_MAX_CHARS = 800
+    # 검색어 변환 결과 캐시 (모델 재호출 방지)
+    SEARCH_QUERY_CACHE_TTL = 7 * 24 * 3600
+    # 한국어 제목 역색인(프로세스별)이 다른 워커가 저장한 제목을 읽어 오는 주기 (초)
+    TITLE_INDEX_REFRESH_INTERVAL = 60
+    
+    # 요청 단계별 소요 시간/업스트림 호출 수 (/metrics, 응답의 Server-Timing 헤더)
+    METRICS_ENABLED = True
+    METRICS_LOG_REQUESTS = os.environ.get('METRICS_LOG_REQUESTS') == '1'  # 요청마다 JSON 한 줄 로그
     
+    # AniList GraphQL 클라이언트 (공유 커넥션 풀, HTTP/2)
+    ANILIST_API_URL = os.environ.get('ANILIST_API_URL') or 'https://graphql.anilist.co'
+    ANILIST_TIMEOUT = 10.0
+    ANILIST_CONNECT_TIMEOUT = 5.0
+    ANILIST_MAX_CONNECTIONS = 20
+    ANILIST_RATE_LIMIT = int(os.environ.get('ANILIST_RATE_LIMIT', 90))  # 분당 요청 수 (AniList 공식 한도)
+    ANILIST_BURST = 10
+    ANILIST_MAX_WAIT = 10.0  # 한도 대기가 이보다 길면 바로 503
+    # AniList 응답 캐시: 작업별 (신선 유지 초, 만료 후 stale 허용 초)
+    ANILIST_CACHE_TTLS = {
+        'search': (600, 3600),
+        'popular': (600, 3600),
+        'recommendations': (1800, 7200),
+        'detail': (21600, 86400),
+    }
+
     # Gemini API 키
-    GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
\ No newline at end of file
+    GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
+    GEMINI_BASE_URL = os.environ.get('GEMINI_BASE_URL')  # 비우면 기본 엔드포인트 (bench/의 가짜 서버를 쓸 때 지정)
+    # 공유 Gemini 클라이언트: 동시 요청 수 / 커넥션 풀 크기
+    GEMINI_MAX_CONCURRENCY = 8
+    GEMINI_MAX_CONNECTIONS = 20
+    GEMINI_RATE_LIMIT = int(os.environ.get('GEMINI_RATE_LIMIT', 60))  # 분당 요청 수 (API 키 등급에 맞게 조정)
+    GEMINI_BURST = 10
+    GEMINI_MAX_WAIT = 4.0  # 한도 토큰 대기 상한 (초) - 가장 짧은 작업 마감 시간(search_query 5초)보다 짧게
+    # 작업 종류별 Gemini 모델 후보 (앞쪽 우선, 최근 에러율/p95가 기준을 넘으면 다음 후보)
+    GEMINI_MODEL_ROUTES = {
+        'fast': ['gemini-2.5-flash', 'gemini-2.5-flash-lite'],
+        'batch': ['gemini-2.5-flash', 'gemini-2.5-flash-lite'],
+        'description': ['gemini-2.5-flash', 'gemini-2.5-flash-lite'],
+        'verified': ['gemini-2.5-flash'],  # candidate_count 지원 모델만
+        'judge': ['gemini-2.5-flash'],
+        'search_query': ['gemini-3-pro-preview', 'gemini-2.5-flash'],
+    }
+    # 작업별 마감 시간 (초) - 넘기면 원문으로 응답 (한도 대기 시간 포함)
+    GEMINI_TASK_DEADLINES = {
+        'fast': 6.0, 'batch': 12.0, 'description': 15.0, 'verified': 10.0, 'judge': 8.0, 'search_query': 5.0,
+    }
+    GEMINI_DEFAULT_DEADLINE = 20.0
+    MODEL_ROUTER_WINDOW = 200           # 모델별 최근 호출 몇 개로 지연/에러율을 계산할지
+    MODEL_ROUTER_MIN_SAMPLES = 20       # 이보다 표본이 적으면 설정 순서/기본 지연 사용
+    MODEL_ROUTER_MAX_ERROR_RATE = 0.3
+    # 주 모델이 p95를 넘기면 더 빠른 후보로 백업 요청 (먼저 온 응답 사용)
+    GEMINI_HEDGE_ENABLED = True
+    GEMINI_HEDGE_PERCENTILE = 95
+    GEMINI_HEDGE_MIN_DELAY = 0.3
+    GEMINI_HEDGE_DEFAULT_DELAY = 2.0    # 표본이 모이기 전 백업 요청까지 대기 (초)
+    GEMINI_HEDGE_BUDGET = 0.1           # 최근 호출 중 백업 요청 비율 상한 (분당 한도 보호)
+
+    # 업스트림 공통: 재시도 횟수(지터 포함 지수 백오프), 연속 실패 시 서킷 차단
+    UPSTREAM_RETRY_ATTEMPTS = 3
+    UPSTREAM_BREAKER_THRESHOLD = 5
+    UPSTREAM_BREAKER_RESET = 30.0  # 초
+
+
+class MultiWorkerConfig(Config):
+    """여러 워커 프로세스로 배포할 때 (APP_CONFIG=multiworker)
+
+    hypercorn -w 4 asgi:app 처럼 프로세스가 여러 개면 SimpleCache는 프로세스마다 따로 생기므로
+    인기 목록/AniList 응답/검색어 캐시를 파일 캐시로 공유한다.
+    (번역 메모리 캐시는 프로세스별이지만 뒤의 Translation 테이블을 공유)
+    """
+    CACHE_TYPE = 'FileSystemCache'
+    CACHE_DIR = os.environ.get('CACHE_DIR') or os.path.join(BASE_DIR, 'instance', 'cache')
+    CACHE_THRESHOLD = 20000
+    # 프로세스당 커넥션 풀 (WAL이라 읽기는 동시에, 쓰기는 busy_timeout 동안 순서대로)
+    SQLALCHEMY_ENGINE_OPTIONS = {'pool_size': 5, 'max_overflow': 10, 'pool_timeout': 10}
+
+
+CONFIGS = {
+    'default': Config,
+    'multiworker': MultiWorkerConfig,
+}
+
+
+def get_config():
+    """APP_CONFIG 환경 변수로 설정 프로필 선택 (기본: default)"""
+    return CONFIGS[os.environ.get('APP_CONFIG', 'default')]
@@ -1,7 +1,40 @@
 # extensions.py
+import asyncio
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
 from flask_caching import Cache
+from sqlalchemy import event
 
 # 앱과 연결되지 않은 상태로 객체만 먼저 생성
 db = SQLAlchemy()
-cache = Cache()
\ No newline at end of file
+cache = Cache()
+
+
+def init_sqlite_pragmas(app):
+    """새 SQLite 커넥션마다 SQLITE_PRAGMAS 적용 (db.init_app 다음, 첫 쿼리 전에 호출)"""
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
+
+async def run_db(func, *args, **kwargs):
+    """동기 DB 작업을 스레드에서 실행 (SQLite 잠금 대기가 공유 이벤트 루프를 막지 않도록)
+
+    스레드마다 새 앱 컨텍스트(= 새 세션)에서 실행하므로 ORM 객체 대신 값만 돌려받아야 함
+    """
+    app = current_app._get_current_object()
+
+    def call():
+        with app.app_context():
+            return func(*args, **kwargs)
+
+    return await asyncio.to_thread(call)
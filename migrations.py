@@ -0,0 +1,135 @@
+# migrations.py
+# SQLite 스키마 버전 관리 (PRAGMA user_version 사용)
+
+from sqlalchemy import inspect, text
+from extensions import db
+from models import Translation, TitleVerification, ReviewStats, Media, MediaGenre, CatalogSyncState, \
+    DEFAULT_TRANSLATION_MODEL, RATING_BUCKETS
+
+# 예전 Translation 테이블에는 종류 구분이 없음
+# 짧은 한 줄짜리는 제목인지 짧은 줄거리인지 알 수 없으므로 두 종류로 모두 복사
+LEGACY_TITLE_MAX_LENGTH = 150
+COPY_CHUNK_SIZE = 500
+
+
+def _guess_legacy_types(original, translated):
+    if len(original) <= LEGACY_TITLE_MAX_LENGTH and len(translated) <= LEGACY_TITLE_MAX_LENGTH \
+            and '\n' not in original and '\n' not in translated:
+        return ('title', 'general')
+    return ('general',)
+
+
+def _migrate_translation_hash_key(conn):
+    """v1: original_text(Text, unique) 키 → (해시, 종류, 모델) 키 + 압축 저장으로 재구성"""
+    inspector = inspect(conn)
+    tables = inspector.get_table_names()
+    if 'translation_legacy' in tables:
+        # run_migrations는 한 트랜잭션(BEGIN IMMEDIATE)이라 실패하면 DDL까지 롤백되지만,
+        # 트랜잭션 밖에서 실행됐다가 중단된 경우에 대비해 새 테이블을 지우고 남은 원본에서 다시 복사
+        Translation.__table__.drop(conn, checkfirst=True)
+    else:
+        if 'translation' not in tables:
+            return
+        columns = {c['name'] for c in inspector.get_columns('translation')}
+        if 'text_hash' in columns:
+            return
+        conn.execute(text('ALTER TABLE translation RENAME TO translation_legacy'))
+        # 테이블 이름을 바꿔도 인덱스 이름은 그대로라서 새 테이블과 충돌하지 않게 제거
+        for index in inspect(conn).get_indexes('translation_legacy'):
+            if index['name']:
+                conn.execute(text(f'DROP INDEX IF EXISTS "{index["name"]}"'))
+    Translation.__table__.create(conn)
+
+    result = conn.execute(text(
+        'SELECT original_text, translated_text, updated_at FROM translation_legacy ORDER BY id'
+    ).columns(original_text=db.Text, translated_text=db.Text, updated_at=db.DateTime))
+    while True:
+        rows = result.fetchmany(COPY_CHUNK_SIZE)
+        if not rows:
+            break
+        conn.execute(Translation.__table__.insert(), [
+            {
+                'text_hash': Translation.hash_text(original),
+                'type': type,
+                'model': DEFAULT_TRANSLATION_MODEL,
+                'original_text': original,
+                'translated_text': translated,
+                'updated_at': updated_at,
+            }
+            for original, translated, updated_at in rows
+            if original and translated
+            for type in _guess_legacy_types(original, translated)
+        ])
+    conn.execute(text('DROP TABLE translation_legacy'))
+
+
+def _add_review_keyset_index(conn):
+    """v2: Review (anime_id, created_at, id) 복합 인덱스 + ReviewStats 집계 테이블 채우기"""
+    if 'review' not in inspect(conn).get_table_names():
+        return
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_review_anime_created ON review (anime_id, created_at, id)'))
+    # 복합 인덱스 앞부분과 겹치는 예전 단일 인덱스 제거
+    conn.execute(text('DROP INDEX IF EXISTS ix_review_anime_id'))
+
+    ReviewStats.__table__.create(conn, checkfirst=True)
+    buckets = ', '.join(
+        f'SUM(CASE WHEN MIN(rating * {RATING_BUCKETS} / 100, {RATING_BUCKETS - 1}) = {i} THEN 1 ELSE 0 END)'
+        for i in range(RATING_BUCKETS)
+    )
+    columns = ', '.join(f'bucket_{i}' for i in range(RATING_BUCKETS))
+    conn.execute(text('DELETE FROM review_stats'))
+    conn.execute(text(
+        f'INSERT INTO review_stats (anime_id, count, rating_sum, {columns}) '
+        f'SELECT anime_id, COUNT(*), SUM(rating), {buckets} FROM review GROUP BY anime_id'
+    ))
+
+
+def _create_catalog_tables(conn):
+    """v3: AniList 카탈로그 사본 테이블 (예전에는 시작할 때마다 create_all로 생성)"""
+    for model in (Media, MediaGenre, CatalogSyncState):
+        model.__table__.create(conn, checkfirst=True)
+
+
+def _create_title_verification_table(conn):
+    """v4: 제목 검증 일치율 테이블 (예전에는 create_all로만 생성)"""
+    TitleVerification.__table__.create(conn, checkfirst=True)
+
+
+# (버전, 설명, 함수) - 순서대로 한 번씩만 실행
+# 테이블을 추가할 때도 여기에 버전을 올려야 함 (앱 시작 시에는 버전만 비교)
+MIGRATIONS = [
+    (1, 'Translation 해시 키 + 압축 저장', _migrate_translation_hash_key),
+    (2, 'Review 커서 인덱스 + 평점 집계', _add_review_keyset_index),
+    (3, '카탈로그 사본 테이블', _create_catalog_tables),
+    (4, '제목 검증 기록 테이블', _create_title_verification_table),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    return conn.execute(text('PRAGMA user_version')).scalar() or 0
+
+
+def pending_migrations():
+    """아직 적용 안 된 (버전, 설명) 목록 (쓰기 잠금 없이 PRAGMA만 읽음)"""
+    with db.engine.connect() as conn:
+        version = get_schema_version(conn)
+    return [(target, description) for target, description, _ in MIGRATIONS if target > version]
+
+
+def run_migrations():
+    """아직 적용 안 된 마이그레이션 실행 후 없는 테이블 생성 (앱 컨텍스트 안에서 호출)"""
+    applied = []
+    with db.engine.begin() as conn:
+        if conn.dialect.name == 'sqlite':
+            # 쓰기 잠금을 먼저 잡아서 여러 워커 프로세스가 동시에 시작해도 한 프로세스만 적용
+            conn.exec_driver_sql('BEGIN IMMEDIATE')
+        version = get_schema_version(conn)
+        for target, description, migrate in MIGRATIONS:
+            if target <= version:
+                continue
+            migrate(conn)
+            conn.execute(text(f'PRAGMA user_version = {int(target)}'))
+            applied.append((target, description))
+        db.metadata.create_all(conn)
+    return applied
@@ -1,13 +1,20 @@
 # models.py
 from datetime import datetime
 from extensions import db  # extensions에서 db 가져옴
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 import html
+import zlib
+import hashlib
 
 class Review(db.Model):
     __tablename__ = 'review'
+    # 최신순 커서 페이지네이션용 (anime_id 단독 조회도 이 인덱스 앞부분으로 처리)
+    __table_args__ = (
+        db.Index('ix_review_anime_created', 'anime_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    anime_id = db.Column(db.Integer, nullable=False, index=True)
+    anime_id = db.Column(db.Integer, nullable=False)
     username = db.Column(db.String(80), nullable=False, default="익명")
     rating = db.Column(db.Integer, nullable=False)
     text = db.Column(db.Text, nullable=True)
@@ -16,16 +23,192 @@ class Review(db.Model):
     def __repr__(self):
         return f'<Review {self.username} - {self.anime_id}>'
     
+# 번역에 사용한 기본 모델 (Translation.model 기본값)
+DEFAULT_TRANSLATION_MODEL = 'gemini-2.5-flash'
+# 이 길이(바이트) 이상인 텍스트만 압축
+COMPRESS_THRESHOLD = 256
+
+class CompressedText(db.TypeDecorator):
+    """긴 텍스트는 zlib으로 압축해서 저장 (파이썬 쪽에서는 그대로 str)"""
+    impl = db.LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        raw = value.encode('utf-8')
+        if len(raw) >= COMPRESS_THRESHOLD:
+            return b'z' + zlib.compress(raw, 6)
+        return b'r' + raw
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        value = bytes(value)
+        if value[:1] == b'z':
+            return zlib.decompress(value[1:]).decode('utf-8')
+        return value[1:].decode('utf-8')
+
 class Translation(db.Model):
     __tablename__ = 'translation'
+    # (해시, 종류, 모델) 유니크 인덱스가 (해시, 종류) 조회에도 그대로 쓰임
+    __table_args__ = (
+        db.UniqueConstraint('text_hash', 'type', 'model', name='uq_translation_key'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    # 원문 텍스트 (검색 속도를 위해 인덱스 설정, 유니크)
-    original_text = db.Column(db.Text, unique=True, nullable=False, index=True)
+    # 원문 해시 (고정 16바이트, 긴 줄거리도 인덱스 크기 일정)
+    text_hash = db.Column(db.LargeBinary(16), nullable=False)
+    # 번역 종류 ('title' / 'general')
+    type = db.Column(db.String(20), nullable=False, default='general')
+    # 번역에 사용한 모델
+    model = db.Column(db.String(50), nullable=False, default=DEFAULT_TRANSLATION_MODEL)
+    # 원문 텍스트 (긴 텍스트는 압축 저장)
+    original_text = db.Column(CompressedText(), nullable=False)
     # 번역된 텍스트
-    translated_text = db.Column(db.Text, nullable=False)
+    translated_text = db.Column(CompressedText(), nullable=False)
     # 언제 저장되었는지 (나중에 오래된 번역 갱신용)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    def __init__(self, **kwargs):
+        if 'text_hash' not in kwargs and kwargs.get('original_text'):
+            kwargs['text_hash'] = self.hash_text(kwargs['original_text'])
+        super().__init__(**kwargs)
+
+    @staticmethod
+    def hash_text(text):
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    @classmethod
+    def newest_first(cls):
+        """같은 원문/종류에 모델별 행이 여러 개면 가장 최근에 저장된 번역을 씀 (모든 조회가 같은 순서)"""
+        return cls.updated_at.desc(), cls.id.desc()
+
+    @classmethod
+    def lookup(cls, text, type):
+        """원문/종류로 저장된 번역 조회 (모델 무관, 가장 최근 번역)"""
+        return cls.query.filter_by(text_hash=cls.hash_text(text), type=type).order_by(*cls.newest_first()).first()
+
+    def __repr__(self):
+        return f'<Translation {self.type} {self.original_text[:20]}...>'
+
+class TitleVerification(db.Model):
+    """제목 정밀 검증 결과 누적 (후보 일치율이 높은 제목은 재검증 생략)"""
+    __tablename__ = 'title_verification'
+
+    # Translation.hash_text(원문 제목)
+    text_hash = db.Column(db.LargeBinary(16), primary_key=True)
+    samples = db.Column(db.Integer, nullable=False, default=0)
+    agreements = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def agreement_rate(self):
+        return self.agreements / self.samples if self.samples else 0.0
+
+    def __repr__(self):
+        return f'<TitleVerification {self.agreements}/{self.samples}>'
+
+# 평점 분포 구간 수 (0-19, 20-39, 40-59, 60-79, 80-100)
+RATING_BUCKETS = 5
+
+def rating_bucket(rating):
+    return min(rating * RATING_BUCKETS // 100, RATING_BUCKETS - 1)
+
+class ReviewStats(db.Model):
+    """애니별 리뷰 집계 (리뷰 작성 시 같은 트랜잭션에서 증분 갱신)"""
+    __tablename__ = 'review_stats'
+
+    anime_id = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    bucket_0 = db.Column(db.Integer, nullable=False, default=0)
+    bucket_1 = db.Column(db.Integer, nullable=False, default=0)
+    bucket_2 = db.Column(db.Integer, nullable=False, default=0)
+    bucket_3 = db.Column(db.Integer, nullable=False, default=0)
+    bucket_4 = db.Column(db.Integer, nullable=False, default=0)
+
+    @property
+    def average(self):
+        return round(self.rating_sum / self.count, 1) if self.count else None
+
+    @property
+    def histogram(self):
+        return [getattr(self, f'bucket_{i}') for i in range(RATING_BUCKETS)]
+
+    def to_dict(self):
+        return {'count': self.count, 'average': self.average, 'histogram': self.histogram}
+
+    @classmethod
+    def empty_dict(cls):
+        return {'count': 0, 'average': None, 'histogram': [0] * RATING_BUCKETS}
+
+    @classmethod
+    def increment(cls, anime_id, rating):
+        """리뷰 1건 반영 (UPSERT, 커밋은 호출한 쪽에서)"""
+        bucket = f'bucket_{rating_bucket(rating)}'
+        stmt = sqlite_insert(cls).values(anime_id=anime_id, count=1, rating_sum=rating, **{bucket: 1})
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['anime_id'],
+            set_={
+                'count': cls.count + 1,
+                'rating_sum': cls.rating_sum + rating,
+                bucket: getattr(cls, bucket) + 1,
+            },
+        )
+        db.session.execute(stmt)
+
     def __repr__(self):
-        return f'<Translation {self.original_text[:20]}...>'
\ No newline at end of file
+        return f'<ReviewStats {self.anime_id} {self.count}>'
+
+class Media(db.Model):
+    """AniList 카탈로그 로컬 사본 (JP, 성인물 제외, 평점 60 초과 작품만 / flask sync-catalog로 동기화)"""
+    __tablename__ = 'media'
+    # 정렬 기준별 인덱스 (장르 조건은 media_genre 쪽 인덱스로 먼저 좁힘)
+    __table_args__ = (
+        db.Index('ix_media_popularity', 'popularity'),
+        db.Index('ix_media_average_score', 'average_score'),
+        db.Index('ix_media_trending', 'trending'),
+        db.Index('ix_media_favourites', 'favourites'),
+        db.Index('ix_media_start_date', 'start_date'),
+    )
+
+    # AniList Media id
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title_romaji = db.Column(db.String(300))
+    title_english = db.Column(db.String(300))
+    # 장르 이름 목록 (응답용 JSON 문자열, 필터는 MediaGenre)
+    genres = db.Column(db.Text, nullable=False, default='[]')
+    episodes = db.Column(db.Integer)
+    average_score = db.Column(db.Integer)
+    popularity = db.Column(db.Integer, nullable=False, default=0)
+    trending = db.Column(db.Integer, nullable=False, default=0)
+    favourites = db.Column(db.Integer, nullable=False, default=0)
+    # 방영 시작일 (YYYYMMDD 정수, 모르면 0)
+    start_date = db.Column(db.Integer, nullable=False, default=0)
+    cover_image = db.Column(db.String(500))
+    # AniList updatedAt (유닉스 시간, 증분 동기화 기준)
+    updated_at = db.Column(db.Integer, nullable=False, default=0)
+    synced_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Media {self.id} {self.title_romaji}>'
+
+class MediaGenre(db.Model):
+    """작품-장르 연결 ((장르, 작품) 순서라 장르별 조회가 인덱스로 처리됨)"""
+    __tablename__ = 'media_genre'
+
+    genre = db.Column(db.String(50), primary_key=True)
+    media_id = db.Column(db.Integer, db.ForeignKey('media.id'), primary_key=True)
+
+class CatalogSyncState(db.Model):
+    """카탈로그 동기화 진행 상태 (한 줄, 워커 여러 개 중 하나만 동기화하도록 잠금 용도로도 사용)"""
+    __tablename__ = 'catalog_sync_state'
+
+    id = db.Column(db.Integer, primary_key=True)
+    last_full_sync = db.Column(db.DateTime)
+    last_incremental_sync = db.Column(db.DateTime)
+    # 지금까지 받은 작품 중 가장 최근 AniList updatedAt
+    max_updated_at = db.Column(db.Integer, nullable=False, default=0)
+    # 동기화 중인 프로세스가 잡은 잠금 만료 시각
+    locked_until = db.Column(db.DateTime)
@@ -1,21 +1,35 @@
 # routes/anime_routes.py
-from flask import Blueprint, request, render_template
-import httpx
+from flask import Blueprint, Response, g, request, session, current_app, stream_with_context
+import os
 import asyncio
+import json
 import html
-import random 
-from extensions import db, cache
-from models import Review
-from utils import create_response, get_english_title, translate_genres_to_korean
-from services.gemini_service import translate_title_to_korean_official, translate_general_text, translate_search_query
+import base64
+from datetime import datetime
+from sqlalchemy import tuple_
+from extensions import db, cache, run_db
+from models import Review, ReviewStats
+from utils import create_response, get_english_title, translate_genres_to_korean, iterate_async, split_description, join_description
+from services.gemini_service import translate_title_to_korean_official, translate_titles_to_korean_official, translate_general_text, translate_search_query, has_stored_translations
+from services.anilist_client import anilist_client, AniListError
+from services.anilist_queries import ANIME_DETAIL_QUERY
+from services.recommendation_pool import recommendation_pool
+from services.catalog_mirror import catalog_mirror
+from services.detail_prefetch import detail_prefetcher
+from services.metrics import metrics
+from services.http_cache import http_cache
 
 # Blueprint 생성
 anime_bp = Blueprint('anime', __name__)
-ANILIST_API_URL = 'https://graphql.anilist.co'
+
+def _fully_translated(response):
+    # 백그라운드 번역 대기 중인 제목이 섞인 응답은 뷰 캐시에 저장하지 않음
+    return not g.get('partial_translation')
 
 @anime_bp.route('/')
 def home():
-    return render_template('index.html')
+    # 템플릿 변수가 없으므로 렌더링하지 않고 미리 압축해 둔 파일로 응답
+    return http_cache.static_file(os.path.join(current_app.root_path, current_app.template_folder, 'index.html'))
 
 # routes/anime_routes.py
 
@@ -80,19 +94,14 @@ async def search_anime():
     if search_query:
         variables['search'] = final_query
     
-    headers = {
-        'Content-Type': 'application/json',
-        'Accept': 'application/json',
-        'User-Agent': 'My-Personal-Anime-App (github.com/dakgs123)',
-    }
-    
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(ANILIST_API_URL, headers=headers, json={'query': query, 'variables': variables})
-            response.raise_for_status()
-            data = response.json()
-        
-        anime_list = data.get('data', {}).get('Page', {}).get('media', [])
+        anime_list = None
+        if not search_query:
+            # 장르 둘러보기는 로컬 카탈로그 사본에서 조회 (동기화 전이거나 지원 안 하는 정렬이면 None)
+            anime_list = await run_db(catalog_mirror.browse, genre, sort_option, include_movies=include_movies)
+        if anime_list is None:
+            data = await anilist_client.query(query, variables, cache_as='search')
+            anime_list = data.get('Page', {}).get('media', [])
     
         # 검색어가 있을 때만 정확도 필터링 수행
         final_list = anime_list
@@ -104,13 +113,9 @@ async def search_anime():
             ]
             final_list = exact_match_list if exact_match_list else anime_list
     
-        translation_tasks = []
-        for anime in final_list:
-            english_title = get_english_title(anime)
-            # 검색 리스트이므로 검증 끄기 (속도 최적화)
-            translation_tasks.append(translate_title_to_korean_official(english_title, use_verification=False))
-        
-        korean_titles = await asyncio.gather(*translation_tasks)
+        # 검색 리스트이므로 검증 끄기 (속도 최적화)
+        english_titles = [get_english_title(anime) for anime in final_list]
+        korean_titles = await translate_titles_to_korean_official(english_titles, use_verification=False, background=True)
 
         simplified_list = []
         for i, anime in enumerate(final_list):
@@ -125,9 +130,9 @@ async def search_anime():
             
         return create_response(data=simplified_list)
             
-    except httpx.RequestError as e:
+    except AniListError as e:
         print(f"AniList API 요청 에러: {e}")
-        return create_response(success=False, error='애니메이션 정보를 가져오는 데 실패했습니다.', status=502)
+        return create_response(success=False, error='애니메이션 정보를 가져오는 데 실패했습니다.', status=e.status)
     except Exception as e:
         print(f"서버 내부 에러: {e}")
         return create_response(success=False, error=f'서버 내부 오류: {str(e)}', status=500)
@@ -137,16 +142,21 @@ async def search_anime():
 def add_review():
     try:
         data = request.get_json()
-        # ... (유효성 검사) ...
+        rating = data.get('rating')
+        if not isinstance(rating, int) or isinstance(rating, bool) or not 0 <= rating <= 100:
+            return create_response(success=False, error='평점은 0에서 100 사이의 정수여야 합니다.', status=400)
         
         new_review = Review(
             anime_id=data['animeId'],
-            rating=data['rating'],
+            rating=rating,
             text=html.escape(data.get('text', '')),
-            username=html.escape(data.get('username', '익명'))
+            username=html.escape(data.get('username') or '익명')
         )
-        db.session.add(new_review)
-        db.session.commit()
+        with metrics.span('db'):
+            db.session.add(new_review)
+            # 집계는 리뷰와 같은 트랜잭션에서 갱신 (조회 시 전체 리뷰를 다시 세지 않음)
+            ReviewStats.increment(new_review.anime_id, rating)
+            db.session.commit()
         return create_response(data={'message': '성공'}, status=201)
     except Exception as e:
         db.session.rollback()
@@ -154,7 +164,7 @@ def add_review():
     
 
 @anime_bp.route('/api/popular_anime', methods=['GET'])
-@cache.cached(timeout=600) # 10분간 캐싱
+@cache.cached(timeout=600, response_filter=_fully_translated) # 10분간 캐싱
 async def get_popular_anime():
     query = """
     query {
@@ -168,22 +178,12 @@ async def get_popular_anime():
         }
     }
     """
-    headers = { 'Content-Type': 'application/json', 'Accept': 'application/json', 'User-Agent': 'My-Personal-Anime-App (github.com/dakgs123)', }
-
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(ANILIST_API_URL, headers=headers, json={'query': query})
-            response.raise_for_status()
-            data = response.json()
-            
-        anime_list = data.get('data', {}).get('Page', {}).get('media', [])
+        data = await anilist_client.query(query, cache_as='popular')
+        anime_list = data.get('Page', {}).get('media', [])
     
-        translation_tasks = []
-        for anime in anime_list:
-            english_title = get_english_title(anime) # utils 헬퍼 사용
-            translation_tasks.append(translate_title_to_korean_official(english_title, use_verification=False))
-
-        korean_titles = await asyncio.gather(*translation_tasks)
+        english_titles = [get_english_title(anime) for anime in anime_list] # utils 헬퍼 사용
+        korean_titles = await translate_titles_to_korean_official(english_titles, use_verification=False, background=True)
 
         simplified_list = []
         for i, anime in enumerate(anime_list):
@@ -198,89 +198,160 @@ async def get_popular_anime():
             
         return create_response(data=simplified_list)
             
+    except AniListError as e:
+        print(f"인기 애니 AniList 에러: {e}")
+        return create_response(success=False, error='인기 리스트 로딩 실패', status=e.status)
     except Exception as e:
         print(f"인기 애니 에러: {e}")
         return create_response(success=False, error='인기 리스트 로딩 실패', status=500)
 
 
+def _simplify_detail(anime_detail, title, description):
+    """AniList Media 응답 → 상세 페이지 응답 형태"""
+    staff_list = []
+    # [★수정] 번역된 역할(korean_roles) 대신, 원본(edge['role'])을 그대로 사용
+    for edge in anime_detail.get('staff', {}).get('edges', []):
+        staff_list.append({
+            'name': edge['node']['name']['full'],
+            'role': edge['role'] # <-- 원본(영어) 역할 사용
+        })
+
+    return {
+        'id': anime_detail.get('id'),
+        'title': title,
+        'genres': translate_genres_to_korean(anime_detail.get('genres')), # utils
+        'episodes': anime_detail.get('episodes'),
+        'description': description,
+        'coverImage': anime_detail.get('coverImage', {}).get('extraLarge'),
+        'startDate': anime_detail.get('startDate'),
+        'endDate': anime_detail.get('endDate'),
+        'characters': [edge['node']['name']['full'] for edge in anime_detail.get('characters', {}).get('edges', [])],
+        'staff': staff_list, 
+        'studios': [node['name'] for node in anime_detail.get('studios', {}).get('nodes', [])]
+    }
+
+def _detail_error_response(e):
+    if isinstance(e, AniListError):
+        print(f"상세 정보 AniList 에러: {e}")
+        if e.status == 404:
+            return create_response(success=False, error='애니메이션을 찾을 수 없습니다.', status=404)
+        return create_response(success=False, error='상세 정보를 불러오지 못했습니다.', status=e.status)
+    # [★수정] 아까 추가했던 에러 로그를 여기서도 확인
+    print(f"상세 정보 로딩 에러 (API 키 문제일 수 있음): {e}") 
+    return create_response(success=False, error='상세 정보를 불러오지 못했습니다.', status=500)
+
 @anime_bp.route('/api/anime_detail/<int:anime_id>', methods=['GET'])
 async def get_anime_detail(anime_id):
-    query = """
-    query ($id: Int) {
-        Media (id: $id) {
-            id title { romaji english native } genres episodes description(asHtml: false) coverImage { extraLarge }
-            startDate { year month day } endDate { year month day }
-            characters { edges { node { name { full } } } }
-            staff { edges { node { name { full } } role } }
-            studios(isMain: true) { nodes { name } }
-        }
-    }
-    """
-    variables = { 'id': anime_id }
-    headers = { 'Content-Type': 'application/json', 'Accept': 'application/json', 'User-Agent': 'My-Personal-Anime-App (github.com/dakgs123)', }
-    
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(ANILIST_API_URL, headers=headers, json={'query': query, 'variables': variables})
-            response.raise_for_status()
-            data = response.json()
-        
-        anime_detail = data.get('data', {}).get('Media', {})
+        data = await anilist_client.query(ANIME_DETAIL_QUERY, { 'id': anime_id }, cache_as='detail')
+        anime_detail = data.get('Media', {})
         if not anime_detail:
              return create_response(success=False, error='애니메이션을 찾을 수 없습니다.', status=404)
 
-        english_title_candidate = get_english_title(anime_detail) # utils 헬퍼
-        original_description = anime_detail.get('description')
-        original_staff_edges = anime_detail.get('staff', {}).get('edges', []) # [★] 모든 스태프 원본 가져오기
-
         # [★수정] 제목과 줄거리 번역만 요청 (API 호출 2회)
-        tasks_to_run = [
-            translate_title_to_korean_official(english_title_candidate),
-            translate_general_text(original_description)
-        ]
-        
-        all_translated_results = await asyncio.gather(*tasks_to_run)
-
-        # [★수정] 결과도 2개만 받음
-        korean_title = all_translated_results[0]
-        korean_description = all_translated_results[1]
-        # [★삭제] korean_roles = all_translated_results[2:] 삭제
-
-        staff_list = []
-        # [★수정] 번역된 역할(korean_roles) 대신, 원본(edge['role'])을 그대로 사용
-        for edge in original_staff_edges:
-            staff_list.append({
-                'name': edge['node']['name']['full'],
-                'role': edge['role'] # <-- 원본(영어) 역할 사용
-            })
+        korean_title, korean_description = await asyncio.gather(
+            translate_title_to_korean_official(get_english_title(anime_detail)), # utils 헬퍼
+            translate_general_text(anime_detail.get('description'))
+        )
 
-        simplified_detail = {
-            'id': anime_detail.get('id'),
-            'title': korean_title,
-            'genres': translate_genres_to_korean(anime_detail.get('genres')), # utils
-            'episodes': anime_detail.get('episodes'),
-            'description': korean_description,
-            'coverImage': anime_detail.get('coverImage', {}).get('extraLarge'),
-            'startDate': anime_detail.get('startDate'),
-            'endDate': anime_detail.get('endDate'),
-            'characters': [edge['node']['name']['full'] for edge in anime_detail.get('characters', {}).get('edges', [])],
-            'staff': staff_list, 
-            'studios': [node['name'] for node in anime_detail.get('studios', {}).get('nodes', [])]
-        }
-        
-        return create_response(data=simplified_detail)
+        return create_response(data=_simplify_detail(anime_detail, korean_title, korean_description))
             
     except Exception as e:
-        # [★수정] 아까 추가했던 에러 로그를 여기서도 확인
-        print(f"상세 정보 로딩 에러 (API 키 문제일 수 있음): {e}") 
-        return create_response(success=False, error='상세 정보를 불러오지 못했습니다.', status=500)
-
+        return _detail_error_response(e)
+
+# 목록에 보이는 카드들의 상세 정보 미리 받기 (응답은 바로, 실제 조회는 백그라운드)
+@anime_bp.route('/api/anime_detail/prefetch', methods=['POST'])
+def prefetch_anime_details():
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids')
+    if not isinstance(ids, list):
+        return create_response(success=False, error='ids 목록이 필요합니다.', status=400)
+    ids = [i for i in ids if isinstance(i, int) and not isinstance(i, bool) and i > 0]
+    scheduled = detail_prefetcher.schedule(ids)
+    return create_response(data={'scheduled': scheduled}, status=202)
+
+# 상세 정보 스트리밍 (NDJSON)
+# 1줄: 번역 전 상세 정보(detail) → 이후 제목(title)/줄거리(description) 번역이 끝나는 순서대로 → done
+@anime_bp.route('/api/anime_detail/<int:anime_id>/stream', methods=['GET'])
+async def stream_anime_detail(anime_id):
+    try:
+        data = await anilist_client.query(ANIME_DETAIL_QUERY, { 'id': anime_id }, cache_as='detail')
+        anime_detail = data.get('Media', {})
+        if not anime_detail:
+             return create_response(success=False, error='애니메이션을 찾을 수 없습니다.', status=404)
+    except Exception as e:
+        return _detail_error_response(e)
+
+    english_title = get_english_title(anime_detail)
+    original_description = anime_detail.get('description')
+    # 헤더를 먼저 보내므로 번역이 이미 다 저장된 경우에만 상세 캐시 정책 (도중에 실패하면 원문이 남음)
+    if not await has_stored_translations(english_title, original_description):
+        g.partial_translation = True
+
+    async def generate():
+        # 번역 전에도 <br> 태그 대신 문단으로 정리한 원문을 보여줌
+        plain_description = join_description(*split_description(original_description)) if original_description else None
+        yield _ndjson({'type': 'detail', 'data': _simplify_detail(anime_detail, english_title, plain_description)})
+
+        tasks = {
+            asyncio.ensure_future(translate_title_to_korean_official(english_title)): 'title',
+            asyncio.ensure_future(translate_general_text(original_description)): 'description',
+        }
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        yield _ndjson({'type': tasks[task], 'data': task.result()})
+                    except Exception as e:
+                        print(f"상세 정보 스트리밍 번역 에러: {e}")
+            yield _ndjson({'type': 'done'})
+        finally:
+            # 클라이언트가 중간에 끊으면 남은 번역 작업 취소 (ASGI 모드에선 서버 루프에 남으므로)
+            for task in pending:
+                task.cancel()
+
+    return Response(
+        stream_with_context(iterate_async(generate())),
+        mimetype='application/x-ndjson',
+        headers={'X-Accel-Buffering': 'no'}, # 프록시 버퍼링 끄기
+    )
+
+def _ndjson(payload):
+    return json.dumps(payload, ensure_ascii=False) + '\n'
+
+REVIEW_PAGE_SIZE = 20
+REVIEW_MAX_PAGE_SIZE = 100
+
+def _encode_review_cursor(review):
+    raw = f"{review.created_at.isoformat()}|{review.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def _decode_review_cursor(cursor):
+    created_at, review_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+    return datetime.fromisoformat(created_at), int(review_id)
+
+# 리뷰 목록 (최신순, 커서 페이지네이션)
+# ?cursor=<이전 응답의 next_cursor>&limit=20 / 첫 페이지에는 평점 집계(stats)도 포함
 @anime_bp.route('/api/reviews/<int:anime_id>', methods=['GET'])
 def get_reviews(anime_id):
     try:
-        # 최신순으로 정렬
-        reviews = Review.query.filter_by(anime_id=anime_id).order_by(Review.created_at.desc()).all()
-        
+        limit = min(max(request.args.get('limit', REVIEW_PAGE_SIZE, type=int), 1), REVIEW_MAX_PAGE_SIZE)
+        cursor = request.args.get('cursor')
+
+        # (anime_id, created_at, id) 인덱스를 역순으로 타므로 정렬/OFFSET 없이 다음 페이지 조회
+        query = Review.query.filter(Review.anime_id == anime_id)
+        if cursor:
+            try:
+                query = query.filter(tuple_(Review.created_at, Review.id) < _decode_review_cursor(cursor))
+            except ValueError:
+                return create_response(success=False, error='잘못된 커서입니다.', status=400)
+        with metrics.span('db'):
+            reviews = query.order_by(Review.created_at.desc(), Review.id.desc()).limit(limit + 1).all()
+
+        has_more = len(reviews) > limit
+        reviews = reviews[:limit]
         review_list = [
             {
                 'id': r.id,
@@ -290,7 +361,15 @@ def get_reviews(anime_id):
                 'created_at': r.created_at.strftime('%Y-%m-%d %H:%M')
             } for r in reviews
         ]
-        return create_response(data=review_list)
+        page = {
+            'reviews': review_list,
+            'next_cursor': _encode_review_cursor(reviews[-1]) if has_more else None,
+        }
+        if not cursor:
+            with metrics.span('db'):
+                stats = db.session.get(ReviewStats, anime_id)
+            page['stats'] = stats.to_dict() if stats else ReviewStats.empty_dict()
+        return create_response(data=page)
         
     except Exception as e:
         return create_response(success=False, error=f'리뷰 로딩 실패: {str(e)}', status=500)
@@ -300,82 +379,22 @@ def get_reviews(anime_id):
 # routes/anime_routes.py
 
 @anime_bp.route('/api/recommendations', methods=['GET'])
-@cache.cached(timeout=5)
 async def get_recommendations():
     genre = request.args.get('genre')
     sort_option = request.args.get('sort', 'POPULARITY_DESC') # [★추가] 정렬 옵션 받기
 
     try:
-        # [★수정] 장르나 정렬 기준이 변경되면 유효 데이터 범위를 고려해 페이지 랜덤 범위 축소
-        # (예: 평점순 정렬 시 200페이지로 가면 평점 낮은 게 나올 수 있으므로 앞쪽에서 랜덤 추출)
-        if genre or sort_option != 'POPULARITY_DESC':
-            random_page = random.randint(1, 50) 
-        else:
-            random_page = random.randint(1, 200) # 기본 인기순일 때는 넓게 탐색
-        
-        # 필터 조건 조립
-        filters = 'episodes_greater: 1,'
-        if genre:
-            filters += f' genre: "{genre}",'
-
-        # [★수정] 쿼리에 sort 변수 적용
-        query = """
-        query ($page: Int) {
-            Page (page: $page, perPage: 5) {
-                media ( type: ANIME, countryOfOrigin: "JP", 
-                    genre_not_in: ["Ecchi", "Hentai"], 
-                    %s 
-                    sort: [%s] 
-                ) {
-                    id title { romaji english } genres episodes coverImage { extraLarge }
-                    averageScore
-                }
-            }
-        }
-        """ % (filters, sort_option) # 여기에 필터와 정렬 옵션 삽입
-
-        variables = { 'page': random_page }
-        headers = {
-            'Content-Type': 'application/json',
-            'Accept': 'application/json',
-            'User-Agent': 'My-Personal-Anime-App (github.com/dakgs123)',
-        }
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(ANILIST_API_URL, headers=headers, json={'query': query, 'variables': variables})
-            response.raise_for_status()
-            data = response.json()
-            
-        anime_list = data.get('data', {}).get('Page', {}).get('media', [])
-        
-        # [안전장치] 빈 페이지일 경우 1페이지 재요청
-        if not anime_list:
-            variables['page'] = 1
-            async with httpx.AsyncClient() as client:
-                response = await client.post(ANILIST_API_URL, headers=headers, json={'query': query, 'variables': variables})
-                data = response.json()
-            anime_list = data.get('data', {}).get('Page', {}).get('media', [])
-
-        # 번역 로직 (빠른 속도 위해 검증 끔)
-        korean_titles = []
-        for anime in anime_list:
-            english_title = get_english_title(anime)
-            translated_title = await translate_title_to_korean_official(english_title, use_verification=False)
-            korean_titles.append(translated_title)
+        # 미리 받아 번역해 둔 후보 풀에서 뽑기 (풀이 빌 때만 AniList 대기)
+        # 세션별로 최근에 보여준 작품은 제외 (응답이 사용자마다 달라서 뷰 캐시는 사용 안 함)
+        seen = list(session.get('rec_seen', []))
+        simplified_list = await recommendation_pool.sample(genre, sort_option, seen)
+        session['rec_seen'] = seen
 
-        simplified_list = []
-        for i, anime in enumerate(anime_list):
-            simplified_list.append({
-                'id': anime.get('id'),
-                'title': korean_titles[i],
-                'genres': translate_genres_to_korean(anime.get('genres', [])),
-                'episodes': anime.get('episodes'),
-                'coverImage': anime.get('coverImage', {}).get('extraLarge'),
-                'averageScore': anime.get('averageScore')
-            })
-            
         return create_response(data=simplified_list)
             
+    except AniListError as e:
+        print(f"추천 애니 AniList 에러: {e}")
+        return create_response(success=False, error='추천 리스트 로딩 실패', status=e.status)
     except Exception as e:
         print(f"추천 애니 에러: {e}")
         return create_response(success=False, error='추천 리스트 로딩 실패', status=500)
\ No newline at end of file
@@ -0,0 +1,26 @@
+# routes/metrics_routes.py
+from flask import Blueprint, Response
+from services.metrics import metrics
+from services.translation_cache import translation_cache
+from services.translation_worker import translation_worker
+from services.upstream_governor import anilist_governor, gemini_governor
+from services.recommendation_pool import recommendation_pool
+from services.model_router import model_router
+
+# Blueprint 생성
+metrics_bp = Blueprint('metrics', __name__)
+
+# 조회 시점에 읽는 상태 값
+metrics.gauge('translation_worker_pending', '백그라운드 번역 대기 중인 항목 수', translation_worker.pending)
+metrics.gauge('translation_cache_entries', '번역 메모리 캐시 항목 수', lambda: translation_cache.stats()['size'])
+metrics.gauge('recommendation_pool_items', '추천 풀별 후보 수', recommendation_pool.size)
+metrics.gauge('model_router_p95_seconds', '작업/모델별 최근 Gemini 응답 시간 p95 (헤징 기준)', model_router.latency_p95)
+metrics.gauge('upstream_circuit_open', '업스트림 서킷이 열려 있으면 1', lambda: {
+    (('upstream', governor.name),): 0 if governor.healthy else 1
+    for governor in (anilist_governor, gemini_governor)
+})
+
+# Prometheus 스크레이프용 (워커가 여러 개면 워커별 값)
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
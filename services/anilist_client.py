@@ -0,0 +1,219 @@
+# services/anilist_client.py
+
+import json
+import time
+import hashlib
+import threading
+import httpx
+from flask import current_app
+from extensions import cache
+from services.background_loop import background_loop
+from services.singleflight import SingleFlight
+from services.upstream_governor import anilist_governor, UpstreamUnavailable
+from services.metrics import metrics
+
+ANILIST_API_URL = 'https://graphql.anilist.co'
+HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json',
+    'User-Agent': 'My-Personal-Anime-App (github.com/dakgs123)',
+}
+
+# 작업별 응답 캐시 (신선 유지 시간, 만료 후 stale 허용 시간) 초 단위
+DEFAULT_CACHE_TTLS = {
+    'search': (600, 3600),
+    'popular': (600, 3600),
+    'recommendations': (1800, 7200),
+    'detail': (21600, 86400),
+}
+
+
+class AniListError(Exception):
+    """AniList 호출 실패 (라우트에서 그대로 HTTP 상태코드로 사용)
+
+    transient=True인 에러(시간 초과, 429, 5xx)만 재시도 대상이다.
+    """
+
+    def __init__(self, message, status=502, transient=False):
+        super().__init__(message)
+        self.status = status
+        self.transient = transient
+
+
+def _is_transient(e):
+    return isinstance(e, AniListError) and e.transient
+
+
+class AniListClient:
+    """커넥션 풀/HTTP2 keep-alive를 공유하는 AniList GraphQL 클라이언트"""
+
+    def __init__(self):
+        self._client = None
+        self._flight = SingleFlight()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = set()
+        self.cache_ttls = dict(DEFAULT_CACHE_TTLS)
+        self.api_url = ANILIST_API_URL
+        self.timeout = 10.0
+        self.connect_timeout = 5.0
+        self.max_connections = 20
+
+    def init_app(self, app):
+        self.api_url = app.config.get('ANILIST_API_URL', ANILIST_API_URL)
+        self.timeout = app.config.get('ANILIST_TIMEOUT', 10.0)
+        self.connect_timeout = app.config.get('ANILIST_CONNECT_TIMEOUT', 5.0)
+        self.max_connections = app.config.get('ANILIST_MAX_CONNECTIONS', 20)
+        self.cache_ttls = {**DEFAULT_CACHE_TTLS, **app.config.get('ANILIST_CACHE_TTLS', {})}
+        background_loop.on_shutdown(self.aclose)
+
+    def _get_client(self):
+        # 공유 루프 안에서만 호출됨
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                headers=HEADERS,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def _post(self, query, variables):
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            data = await self._send(query, variables)
+            outcome = 'ok'
+            return data
+        except AniListError as e:
+            outcome = str(e.status)
+            raise
+        finally:
+            metrics.inc('anilist_requests_total', outcome=outcome)
+            metrics.observe('anilist_request_seconds', time.perf_counter() - started)
+
+    async def _send(self, query, variables):
+        client = self._get_client()
+        try:
+            response = await client.post(self.api_url, json={'query': query, 'variables': variables or {}})
+        except httpx.TimeoutException as e:
+            raise AniListError(f'AniList 응답 시간 초과: {e}', status=504, transient=True) from e
+        except httpx.RequestError as e:
+            raise AniListError(f'AniList 요청 에러: {e}', status=502, transient=True) from e
+
+        # AniList는 없는 Media(id)를 404로 응답함
+        # (별칭으로 여러 개를 묶은 쿼리는 없는 것만 null이고 나머지 데이터는 함께 옴)
+        if response.status_code == 404:
+            try:
+                data = response.json().get('data') or {}
+            except ValueError:
+                data = {}
+            if len(data) > 1 and any(data.values()):
+                return data
+            raise AniListError('AniList에서 찾을 수 없습니다.', status=404)
+        if response.status_code == 429:
+            # 분당 한도 초과: Retry-After 동안 토큰 버킷을 비워 다른 요청도 기다리게 함
+            try:
+                retry_after = float(response.headers.get('Retry-After', 60))
+            except ValueError:
+                retry_after = 60.0
+            anilist_governor.bucket.drain(retry_after)
+            raise AniListError('AniList 요청 한도 초과', status=503, transient=True)
+        if response.status_code >= 500:
+            raise AniListError(f'AniList 응답 에러: HTTP {response.status_code}', status=502, transient=True)
+        if response.status_code >= 400:
+            raise AniListError(f'AniList 응답 에러: HTTP {response.status_code}', status=502)
+
+        payload = response.json()
+        if payload.get('errors') and not payload.get('data'):
+            message = payload['errors'][0].get('message', 'unknown')
+            raise AniListError(f'AniList GraphQL 에러: {message}', status=502)
+        return payload.get('data') or {}
+
+    async def _governed_post(self, query, variables):
+        # 분당 한도/재시도/서킷 브레이커 적용 (서킷이 열려 있으면 바로 503)
+        try:
+            return await anilist_governor.call(lambda: self._post(query, variables), _is_transient)
+        except UpstreamUnavailable as e:
+            raise AniListError(f'AniList 일시적으로 사용 불가: {e}', status=503) from e
+
+    async def _fetch(self, query, variables):
+        # 같은 (query, variables)로 동시에 들어온 요청은 1번만 전송
+        key = (query, json.dumps(variables or {}, sort_keys=True))
+        return await self._flight.do(key, lambda: background_loop.run(self._governed_post(query, variables)))
+
+    async def query(self, query, variables=None, cache_as=None):
+        """GraphQL 쿼리 실행 후 응답의 data 부분만 반환
+
+        cache_as(작업 이름)를 주면 응답을 캐시하고, 신선 기간이 지난 항목은
+        stale 상태로 바로 돌려준 뒤 백그라운드에서 갱신한다.
+        """
+        with metrics.span('anilist'):
+            if cache_as is None:
+                return await self._fetch(query, variables)
+
+            ttl, stale_ttl = self.cache_ttls.get(cache_as, DEFAULT_CACHE_TTLS['search'])
+            key = self._cache_key(query, variables)
+            entry = cache.get(key)
+            if entry is not None:
+                stale = time.time() >= entry['fresh_until']
+                metrics.inc('anilist_cache_total', operation=cache_as, result='stale' if stale else 'hit')
+                if stale:
+                    self._schedule_refresh(key, query, variables, ttl, stale_ttl)
+                return entry['data']
+
+            metrics.inc('anilist_cache_total', operation=cache_as, result='miss')
+            data = await self._fetch(query, variables)
+            self._store(key, data, ttl, stale_ttl)
+            return data
+
+    def is_cached(self, query, variables=None):
+        """응답 캐시에 항목이 있는지 (stale 포함)"""
+        return cache.get(self._cache_key(query, variables)) is not None
+
+    def prime(self, query, variables, data, cache_as):
+        """다른 쿼리(배치 등)로 받은 응답을 query/variables의 캐시 항목으로 저장"""
+        ttl, stale_ttl = self.cache_ttls.get(cache_as, DEFAULT_CACHE_TTLS['search'])
+        self._store(self._cache_key(query, variables), data, ttl, stale_ttl)
+
+    @staticmethod
+    def _cache_key(query, variables):
+        # 공백만 다른 쿼리는 같은 키가 되도록 정규화
+        normalized = ' '.join(query.split())
+        raw = normalized + '|' + json.dumps(variables or {}, sort_keys=True)
+        return 'anilist:' + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _store(key, data, ttl, stale_ttl):
+        entry = {'data': data, 'fresh_until': time.time() + ttl}
+        cache.set(key, entry, timeout=ttl + stale_ttl)
+
+    def _schedule_refresh(self, key, query, variables, ttl, stale_ttl):
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        app = current_app._get_current_object()
+        background_loop.submit(self._refresh(app, key, query, variables, ttl, stale_ttl))
+
+    async def _refresh(self, app, key, query, variables, ttl, stale_ttl):
+        try:
+            data = await self._fetch(query, variables)
+            with app.app_context():
+                self._store(key, data, ttl, stale_ttl)
+        except Exception as e:
+            # 갱신 실패 시 기존 stale 응답을 계속 사용
+            print(f"AniList 캐시 갱신 에러: {e}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+
+    async def aclose(self):
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+
+anilist_client = AniListClient()
@@ -0,0 +1,69 @@
+# services/anilist_queries.py
+# 추천/인기/워밍업/상세 프리페치가 같은 조건으로 AniList를 조회하도록 쿼리 조립을 한곳에 모음
+
+RECOMMENDATION_PER_PAGE = 5
+
+MEDIA_LIST_FIELDS = """
+    id title { romaji english } genres episodes coverImage { extraLarge }
+    averageScore
+"""
+
+# 상세 페이지 필드 (단건 조회와 프리페치 배치 조회가 같은 모양의 응답을 받도록 공유)
+ANIME_DETAIL_FIELDS = """
+        id title { romaji english native } genres episodes description(asHtml: false) coverImage { extraLarge }
+        startDate { year month day } endDate { year month day }
+        characters { edges { node { name { full } } } }
+        staff { edges { node { name { full } } role } }
+        studios(isMain: true) { nodes { name } }
+"""
+
+ANIME_DETAIL_QUERY = """
+query ($id: Int) {
+    Media (id: $id) {%s    }
+}
+""" % ANIME_DETAIL_FIELDS
+
+
+def build_media_batch_query(ids, fields=ANIME_DETAIL_FIELDS):
+    """Media(id) 여러 개를 별칭(m<id>)으로 묶은 쿼리 1개 (응답: data['m<id>'])"""
+    parts = ['    m%d: Media (id: %d) {%s    }' % (media_id, media_id, fields) for media_id in ids]
+    return 'query {\n%s\n}' % '\n'.join(parts)
+
+
+def recommendation_page_range(genre, sort_option):
+    """추천 API가 랜덤으로 고르는 최대 페이지 번호"""
+    # 장르나 정렬 기준이 변경되면 유효 데이터 범위를 고려해 페이지 랜덤 범위 축소
+    # (예: 평점순 정렬 시 200페이지로 가면 평점 낮은 게 나올 수 있으므로 앞쪽에서 랜덤 추출)
+    if genre or sort_option != 'POPULARITY_DESC':
+        return 50
+    return 200 # 기본 인기순일 때는 넓게 탐색
+
+
+def build_media_page_query(sort_option, genre=None, per_page=RECOMMENDATION_PER_PAGE,
+                           season=None, season_year=None, with_description=False):
+    """JP/성인물 제외 조건의 Page 쿼리 ($page 변수 사용)"""
+    # 필터 조건 조립
+    filters = 'episodes_greater: 1,'
+    if genre:
+        filters += f' genre: "{genre}",'
+    if season and season_year:
+        filters += f' season: {season}, seasonYear: {season_year},'
+
+    fields = MEDIA_LIST_FIELDS
+    if with_description:
+        fields += ' description(asHtml: false)'
+
+    return """
+    query ($page: Int) {
+        Page (page: $page, perPage: %d) {
+            pageInfo { hasNextPage }
+            media ( type: ANIME, countryOfOrigin: "JP",
+                genre_not_in: ["Ecchi", "Hentai"],
+                %s
+                sort: [%s]
+            ) {
+                %s
+            }
+        }
+    }
+    """ % (per_page, filters, sort_option, fields) # 여기에 필터와 정렬 옵션 삽입
@@ -0,0 +1,102 @@
+# services/background_loop.py
+
+import asyncio
+import threading
+
+
+class BackgroundLoop:
+    """공유 클라이언트(httpx/genai)가 사용하는 프로세스 단위 이벤트 루프
+
+    Flask는 async 뷰마다 새 이벤트 루프를 만들었다가 닫기 때문에,
+    루프에 묶이는 커넥션 풀은 이 전용 루프(데몬 스레드)에서만 사용한다.
+    ASGI 서버(asgi.py)로 실행할 때는 attach()로 서버 루프를 그대로 공유 루프로 쓴다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._attached = False
+        self._shutdown_hooks = []
+
+    @property
+    def attached(self):
+        return self._attached
+
+    def attach(self, loop):
+        """외부(ASGI 서버) 이벤트 루프를 공유 루프로 사용 (스레드를 따로 띄우지 않음)"""
+        with self._lock:
+            if self._loop is not None and not self._attached and not self._loop.is_closed():
+                raise RuntimeError('백그라운드 루프가 이미 실행 중입니다.')
+            self._loop, self._thread, self._attached = loop, None, True
+
+    @property
+    def loop(self):
+        with self._lock:
+            if self._attached:
+                return self._loop
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name='background-loop', daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    async def run(self, coro):
+        """공유 루프에서 코루틴을 실행하고 호출한 루프에서 결과를 기다림"""
+        loop = self.loop
+        try:
+            if asyncio.get_running_loop() is loop:
+                return await coro
+        except RuntimeError:
+            pass
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def submit(self, coro):
+        """결과를 기다리지 않고 공유 루프에 작업 예약 (concurrent Future 반환)"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def on_shutdown(self, hook):
+        """종료 시 공유 루프에서 실행할 async 정리 함수 등록"""
+        if hook not in self._shutdown_hooks:
+            self._shutdown_hooks.append(hook)
+
+    async def _run_shutdown_hooks(self):
+        for hook in reversed(self._shutdown_hooks):
+            try:
+                await hook()
+            except Exception as e:
+                print(f"백그라운드 루프 종료 훅 에러: {e}")
+
+    async def ashutdown(self):
+        """attach()한 루프 안에서 정리 훅 실행 후 분리 (ASGI lifespan 종료 시)"""
+        with self._lock:
+            if not self._attached:
+                return
+            self._loop, self._attached = None, False
+        await self._run_shutdown_hooks()
+
+    def shutdown(self, timeout=5):
+        """정리 훅 실행 후 루프/스레드 종료 (여러 번 호출해도 안전)"""
+        with self._lock:
+            loop, thread, attached = self._loop, self._thread, self._attached
+            self._loop, self._thread, self._attached = None, None, False
+        if loop is None or loop.is_closed():
+            return
+        if attached:
+            # 서버 루프는 서버가 닫음 (lifespan을 못 거치고 끝난 경우 훅은 생략)
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._run_shutdown_hooks(), loop).result(timeout)
+        except Exception as e:
+            print(f"백그라운드 루프 종료 에러: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout)
+        if not loop.is_running():
+            loop.close()
+
+
+background_loop = BackgroundLoop()
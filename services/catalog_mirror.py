@@ -0,0 +1,302 @@
+# services/catalog_mirror.py
+# AniList 카탈로그 로컬 사본: 장르 둘러보기/정렬/추천은 SQLite에서 바로 조회하고
+# AniList에는 주기적인 동기화 요청만 보냄 (자유 검색어는 계속 AniList)
+# 동기화는 웹 워커가 아니라 flask sync-catalog (--watch면 별도 프로세스로 계속 실행)에서만 함
+
+import json
+import time
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import or_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from extensions import db, run_db
+from models import Media, MediaGenre, CatalogSyncState
+from services.anilist_client import anilist_client
+from services.metrics import metrics
+
+SYNC_PER_PAGE = 50
+# 로컬 사본에 담는 범위 (검색 API와 같은 조건)
+MIN_AVERAGE_SCORE = 60
+SLICE_FILTERS = 'type: ANIME, countryOfOrigin: "JP", genre_not_in: ["Ecchi", "Hentai"]'
+SYNC_FIELDS = """
+    id title { romaji english } genres episodes coverImage { extraLarge }
+    averageScore popularity trending favourites startDate { year month day } updatedAt
+"""
+# 정렬 옵션 → 로컬 컬럼 (여기 없는 정렬은 AniList로 조회)
+SORT_COLUMNS = {
+    'POPULARITY_DESC': Media.popularity,
+    'SCORE_DESC': Media.average_score,
+    'TRENDING_DESC': Media.trending,
+    'FAVOURITES_DESC': Media.favourites,
+    'START_DATE_DESC': Media.start_date,
+}
+
+
+def _sync_query(sort_option, with_score_filter=True):
+    score = f', averageScore_greater: {MIN_AVERAGE_SCORE}' if with_score_filter else ''
+    return """
+    query ($page: Int) {
+        Page (page: $page, perPage: %d) {
+            pageInfo { hasNextPage }
+            media ( %s%s, sort: [%s] ) {
+                %s
+            }
+        }
+    }
+    """ % (SYNC_PER_PAGE, SLICE_FILTERS, score, sort_option, SYNC_FIELDS)
+
+
+def _start_date(value):
+    value = value or {}
+    if not value.get('year'):
+        return 0
+    return value['year'] * 10000 + (value.get('month') or 0) * 100 + (value.get('day') or 0)
+
+
+def _in_slice(media):
+    return (media.get('averageScore') or 0) > MIN_AVERAGE_SCORE
+
+
+class CatalogMirror:
+    """AniList 카탈로그 일부를 media 테이블에 동기화하고 조회"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = None
+        self._ready_checked = 0.0
+        self.enabled = True
+        self.sync_interval = 3600
+        self.full_sync_interval = 24 * 3600
+        self.page_delay = 2.0
+        self.max_pages = 200
+        self.incremental_max_pages = 20
+        self.trending_pages = 4
+        self.lock_timeout = 1800
+
+    def init_app(self, app):
+        self.enabled = app.config.get('CATALOG_MIRROR_ENABLED', True)
+        self.sync_interval = app.config.get('CATALOG_SYNC_INTERVAL', 3600)
+        self.full_sync_interval = app.config.get('CATALOG_FULL_SYNC_INTERVAL', 24 * 3600)
+        self.page_delay = app.config.get('CATALOG_SYNC_PAGE_DELAY', 2.0)
+        self.max_pages = app.config.get('CATALOG_SYNC_MAX_PAGES', 200)
+        self.incremental_max_pages = app.config.get('CATALOG_INCREMENTAL_MAX_PAGES', 20)
+        self.trending_pages = app.config.get('CATALOG_TRENDING_PAGES', 4)
+
+    # ---------------------------------------------------------
+    # 조회
+    # ---------------------------------------------------------
+    def ready(self):
+        """동기화된 작품이 있는지 (1분 동안 결과 재사용)"""
+        with self._lock:
+            if self._ready is not None and time.monotonic() - self._ready_checked < 60:
+                return self._ready
+        ready = db.session.query(Media.id).limit(1).first() is not None
+        with self._lock:
+            self._ready, self._ready_checked = ready, time.monotonic()
+        return ready
+
+    def browse(self, genre=None, sort_option='POPULARITY_DESC', include_movies=False, page=1, per_page=10):
+        """장르/정렬 조건 목록을 AniList Page.media와 같은 모양으로 반환
+
+        로컬 사본을 쓸 수 없으면(동기화 전, 지원하지 않는 정렬) None → 호출한 쪽에서 AniList 조회
+        """
+        if not self.enabled:
+            return None
+        column = SORT_COLUMNS.get(sort_option)
+        if column is None or not self.ready():
+            return None
+
+        with metrics.span('db'):
+            query = Media.query.filter(Media.average_score > MIN_AVERAGE_SCORE)
+            if genre:
+                query = query.join(MediaGenre, MediaGenre.media_id == Media.id).filter(MediaGenre.genre == genre)
+            if not include_movies:
+                query = query.filter(Media.episodes > 1)
+            rows = query.order_by(column.desc(), Media.id.desc()) \
+                .offset((page - 1) * per_page).limit(per_page).all()
+        metrics.inc('catalog_queries_total', source='local')
+        return [self._to_anilist(m) for m in rows]
+
+    @staticmethod
+    def _to_anilist(media):
+        return {
+            'id': media.id,
+            'title': {'romaji': media.title_romaji, 'english': media.title_english},
+            'genres': json.loads(media.genres or '[]'),
+            'episodes': media.episodes,
+            'coverImage': {'extraLarge': media.cover_image},
+            'averageScore': media.average_score,
+        }
+
+    # ---------------------------------------------------------
+    # 동기화
+    # ---------------------------------------------------------
+    def _claim(self, only_if_due, full):
+        """동기화 잠금 획득 (다른 워커가 하고 있거나 아직 주기가 안 됐으면 None)"""
+        now = datetime.utcnow()
+        db.session.execute(sqlite_insert(CatalogSyncState).values(id=1).on_conflict_do_nothing())
+        claimed = db.session.execute(
+            update(CatalogSyncState)
+            .where(CatalogSyncState.id == 1)
+            .where(or_(CatalogSyncState.locked_until.is_(None), CatalogSyncState.locked_until < now))
+            .values(locked_until=now + timedelta(seconds=self.lock_timeout))
+        ).rowcount
+        db.session.commit()
+        if not claimed:
+            return None
+
+        # 잠금을 잡은 뒤에 읽어야 방금 끝난 다른 워커의 동기화 결과가 보임
+        state = db.session.get(CatalogSyncState, 1)
+        full = full or state.last_full_sync is None
+        if only_if_due:
+            full = full or now - state.last_full_sync >= timedelta(seconds=self.full_sync_interval)
+            incremental_due = state.last_incremental_sync is None or \
+                now - state.last_incremental_sync >= timedelta(seconds=self.sync_interval)
+            if not (full or incremental_due):
+                self._release()
+                return None
+        return {'full': full, 'since': state.max_updated_at}
+
+    def _release(self, **values):
+        db.session.execute(update(CatalogSyncState).where(CatalogSyncState.id == 1).values(locked_until=None, **values))
+        db.session.commit()
+
+    async def sync(self, full=False, only_if_due=False, progress=None):
+        """전체(full) 또는 증분 동기화 후 트렌딩 값 갱신 (앱 컨텍스트 안에서 호출)
+
+        반환: {'upserted', 'deleted', 'pages', 'trending', 'full'} 또는 잠금/주기 때문에 건너뛰면 None
+        """
+        # DB 작업은 모두 스레드에서 (공유 루프에서 돌 때 SQLite 잠금 대기로 요청이 막히지 않도록)
+        claim = await run_db(self._claim, only_if_due, full)
+        if claim is None:
+            return None
+        progress = progress or (lambda message: None)
+        started = datetime.utcnow()
+        totals = {'upserted': 0, 'deleted': 0, 'pages': 0, 'trending': 0, 'full': claim['full']}
+        try:
+            if claim['full']:
+                max_updated_at = await self._full_sync(started, totals, progress)
+            else:
+                max_updated_at = await self._incremental_sync(claim['since'], totals, progress)
+            totals['trending'] = await self._refresh_trending(progress)
+        except Exception:
+            await run_db(self._release)
+            raise
+
+        values = {'last_incremental_sync': started, 'max_updated_at': max(max_updated_at, claim['since'])}
+        if claim['full']:
+            values['last_full_sync'] = started
+        await run_db(self._release, **values)
+        with self._lock:
+            self._ready = None
+        metrics.inc('catalog_sync_total', kind='full' if claim['full'] else 'incremental')
+        return totals
+
+    async def _pages(self, query, max_pages):
+        """(작품 목록, 다음 페이지 있음) - 마지막 값이 True면 max_pages에서 멈춘 것"""
+        for page in range(1, max_pages + 1):
+            data = await anilist_client.query(query, {'page': page})
+            page_data = data.get('Page', {})
+            has_next = bool(page_data.get('pageInfo', {}).get('hasNextPage'))
+            yield page_data.get('media', []), has_next
+            if not has_next:
+                return
+            await asyncio.sleep(self.page_delay)
+
+    async def _full_sync(self, started, totals, progress):
+        # ID 순서로 전체 범위를 받고, 이번에 안 보인 작품(범위에서 빠진 작품)은 삭제
+        max_updated_at = 0
+        has_next = False
+        async for media, has_next in self._pages(_sync_query('ID'), self.max_pages):
+            totals['pages'] += 1
+            totals['upserted'] += await run_db(self._upsert, media)
+            max_updated_at = max([max_updated_at] + [m.get('updatedAt') or 0 for m in media])
+            progress(f"전체 동기화 {totals['pages']}페이지 ({totals['upserted']}개)")
+        if has_next:
+            # 페이지 한도에서 멈췄으면 뒤쪽 작품은 못 본 것이므로 삭제하지 않음
+            progress(f"전체 동기화가 {self.max_pages}페이지 한도에서 멈춰 삭제를 건너뜀")
+        else:
+            totals['deleted'] = await run_db(self._delete_stale, started)
+        return max_updated_at
+
+    def _delete_stale(self, started):
+        stale = db.session.query(Media.id).filter(Media.synced_at < started)
+        db.session.query(MediaGenre).filter(MediaGenre.media_id.in_(stale.scalar_subquery())).delete(synchronize_session=False)
+        deleted = Media.query.filter(Media.synced_at < started).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+    async def _incremental_sync(self, since, totals, progress):
+        # 최근 수정순으로 받다가 지난번 동기화 시점 이전 항목이 나오면 중단
+        # (평점 조건 없이 받아서 60 이하로 떨어진 작품은 삭제)
+        max_updated_at = since
+        async for media, _ in self._pages(_sync_query('UPDATED_AT_DESC', with_score_filter=False), self.incremental_max_pages):
+            totals['pages'] += 1
+            changed = [m for m in media if (m.get('updatedAt') or 0) > since]
+            totals['upserted'] += await run_db(self._upsert, [m for m in changed if _in_slice(m)])
+            totals['deleted'] += await run_db(self._delete, [m['id'] for m in changed if not _in_slice(m)])
+            max_updated_at = max([max_updated_at] + [m.get('updatedAt') or 0 for m in changed])
+            progress(f"증분 동기화 {totals['pages']}페이지 (변경 {len(changed)}개)")
+            if len(changed) < len(media):
+                break
+        return max_updated_at
+
+    async def _refresh_trending(self, progress):
+        # 트렌딩 값은 updatedAt 없이 계속 바뀌므로 상위 몇 페이지만 새로 받고 나머지는 0으로
+        trending = {}
+        async for media, _ in self._pages(_sync_query('TRENDING_DESC'), self.trending_pages):
+            await run_db(self._upsert, media)
+            trending.update((m['id'], m.get('trending') or 0) for m in media)
+        await run_db(self._reset_trending, list(trending))
+        progress(f"트렌딩 갱신 {len(trending)}개")
+        return len(trending)
+
+    def _reset_trending(self, trending_ids):
+        db.session.execute(update(Media).where(Media.id.notin_(trending_ids)).values(trending=0))
+        db.session.commit()
+
+    def _upsert(self, media):
+        media = [m for m in media if m.get('id')]
+        if not media:
+            return 0
+        now = datetime.utcnow()
+        rows = [{
+            'id': m['id'],
+            'title_romaji': (m.get('title') or {}).get('romaji'),
+            'title_english': (m.get('title') or {}).get('english'),
+            'genres': json.dumps(m.get('genres') or [], ensure_ascii=False),
+            'episodes': m.get('episodes'),
+            'average_score': m.get('averageScore'),
+            'popularity': m.get('popularity') or 0,
+            'trending': m.get('trending') or 0,
+            'favourites': m.get('favourites') or 0,
+            'start_date': _start_date(m.get('startDate')),
+            'cover_image': (m.get('coverImage') or {}).get('extraLarge'),
+            'updated_at': m.get('updatedAt') or 0,
+            'synced_at': now,
+        } for m in media]
+        stmt = sqlite_insert(Media).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['id'],
+            set_={key: stmt.excluded[key] for key in rows[0] if key != 'id'},
+        )
+        ids = [row['id'] for row in rows]
+        db.session.execute(stmt)
+        db.session.query(MediaGenre).filter(MediaGenre.media_id.in_(ids)).delete(synchronize_session=False)
+        genres = [{'genre': genre, 'media_id': m['id']} for m in media for genre in dict.fromkeys(m.get('genres') or [])]
+        if genres:
+            db.session.execute(MediaGenre.__table__.insert(), genres)
+        db.session.commit()
+        return len(rows)
+
+    def _delete(self, ids):
+        if not ids:
+            return 0
+        db.session.query(MediaGenre).filter(MediaGenre.media_id.in_(ids)).delete(synchronize_session=False)
+        deleted = db.session.query(Media).filter(Media.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+
+catalog_mirror = CatalogMirror()
@@ -0,0 +1,99 @@
+# services/detail_prefetch.py
+# 목록에 보이는 카드들의 상세 정보를 미리 받아 두기
+# AniList는 별칭 쿼리 1번으로 여러 작품을 받고, 상세 응답 캐시를 채운 뒤
+# 제목/줄거리 번역은 예산 안에서 백그라운드 워커에 맡긴다.
+
+import threading
+from flask import current_app
+from services.anilist_client import anilist_client
+from services.anilist_queries import ANIME_DETAIL_QUERY, build_media_batch_query
+from services.background_loop import background_loop
+from services.gemini_client import gemini_client
+from services.gemini_service import description_chunks
+from services.translation_cache import translation_cache
+from services.translation_worker import translation_worker
+from services.metrics import metrics
+from utils import get_english_title
+
+
+class DetailPrefetcher:
+    """상세 페이지 프리페치 (프로세스 단위, 같은 작품이 이미 진행 중이면 건너뜀)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self.max_ids = 12
+        self.description_budget = 6
+        self.max_pending = 40
+
+    def init_app(self, app):
+        self.max_ids = app.config.get('PREFETCH_MAX_IDS', 12)
+        self.description_budget = app.config.get('PREFETCH_DESCRIPTION_BUDGET', 6)
+        self.max_pending = app.config.get('PREFETCH_MAX_PENDING_TRANSLATIONS', 40)
+
+    def schedule(self, ids):
+        """캐시에 없는 작품만 골라 백그라운드 프리페치 예약 후 예약한 id 목록 반환"""
+        wanted = []
+        for media_id in dict.fromkeys(ids):
+            if len(wanted) >= self.max_ids:
+                break
+            if anilist_client.is_cached(ANIME_DETAIL_QUERY, {'id': media_id}):
+                continue
+            with self._lock:
+                if media_id in self._in_flight:
+                    continue
+                self._in_flight.add(media_id)
+            wanted.append(media_id)
+
+        if len(ids) > len(wanted):
+            metrics.inc('detail_prefetch_total', len(ids) - len(wanted), result='skipped')
+        if wanted:
+            metrics.inc('detail_prefetch_total', len(wanted), result='scheduled')
+            background_loop.submit(self._prefetch(current_app._get_current_object(), wanted))
+        return wanted
+
+    async def _prefetch(self, app, ids):
+        try:
+            with app.app_context():
+                data = await anilist_client.query(build_media_batch_query(ids))
+                found = []
+                for media_id in ids:
+                    media = data.get(f'm{media_id}')
+                    if media:
+                        # 상세 API가 그대로 읽는 캐시 항목으로 저장
+                        anilist_client.prime(ANIME_DETAIL_QUERY, {'id': media_id}, {'Media': media}, 'detail')
+                        found.append(media)
+                await self._warm_translations(found)
+        except Exception as e:
+            print(f"상세 프리페치 에러 {ids}: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.difference_update(ids)
+
+    async def _warm_translations(self, media_list):
+        # Gemini를 쓸 수 없거나 워커가 밀려 있으면 AniList 캐시만 채움 (사용자 요청 번역이 우선)
+        if not media_list or not translation_worker.enabled or not gemini_client.available:
+            return
+        if translation_worker.pending() >= self.max_pending:
+            metrics.inc('detail_prefetch_total', len(media_list), result='translation_skipped')
+            return
+
+        titles = [get_english_title(m) for m in media_list]
+        known_titles = await translation_cache.aget_many(titles, 'title')
+        for title in titles:
+            if title not in known_titles:
+                translation_worker.enqueue(title, 'title')
+
+        # 줄거리는 상세 API와 같은 단위(문단 조각)로 번역해야 캐시가 맞음
+        descriptions = [m['description'] for m in media_list if m.get('description')][:self.description_budget]
+        chunks = [chunk for description in descriptions for chunk in description_chunks(description)]
+        known = await translation_cache.aget_many(descriptions + chunks, 'general')
+        for description in descriptions:
+            if description in known:
+                continue
+            for chunk in description_chunks(description):
+                if chunk not in known:
+                    translation_worker.enqueue(chunk, 'general')
+
+
+detail_prefetcher = DetailPrefetcher()
@@ -0,0 +1,120 @@
+# services/gemini_client.py
+
+import os
+import time
+import asyncio
+import httpx
+from services.background_loop import background_loop
+from services.upstream_governor import gemini_governor
+from services.metrics import metrics
+
+# 재시도할 만한 Gemini 응답 코드 (한도 초과, 서버 에러)
+TRANSIENT_CODES = {429, 500, 502, 503, 504}
+
+
+def _import_sdk():
+    from google import genai
+    from google.genai import types
+    return genai, types
+
+
+def _is_transient(e):
+    if isinstance(e, httpx.TransportError):
+        return True
+    return getattr(e, 'code', None) in TRANSIENT_CODES
+
+
+class GeminiClient:
+    """프로세스 단위로 1번만 만드는 공유 Gemini 클라이언트
+
+    - HTTP/2 keep-alive 커넥션 풀 재사용
+    - 동시에 나가는 요청 수를 세마포어로 제한
+    - 분당 한도/재시도/서킷 브레이커는 gemini_governor가 담당
+    - 앱 종료 시 background_loop 종료 훅에서 정리
+    """
+
+    def __init__(self):
+        self._client = None
+        self._semaphore = None
+        self.api_key = None
+        self.base_url = None
+        self.max_concurrency = 8
+        self.max_connections = 20
+
+    def init_app(self, app):
+        self.api_key = app.config.get('GEMINI_API_KEY') or os.environ.get('GEMINI_API_KEY')
+        self.base_url = app.config.get('GEMINI_BASE_URL')
+        self.max_concurrency = app.config.get('GEMINI_MAX_CONCURRENCY', 8)
+        self.max_connections = app.config.get('GEMINI_MAX_CONNECTIONS', 20)
+        background_loop.on_shutdown(self.aclose)
+
+    @property
+    def available(self):
+        # 서킷이 열려 있는 동안에는 번역을 시도하지 않고 원문을 그대로 사용
+        return bool(self.api_key or os.environ.get('GEMINI_API_KEY')) and gemini_governor.healthy
+
+    async def _get_client(self):
+        # 공유 루프 안에서만 호출됨
+        if self._client is None:
+            # SDK import가 1초 이상 걸려서 워커 시작 때가 아니라 첫 번역 때 스레드에서 불러옴
+            # (ASGI 모드에서는 공유 루프가 서버 루프라서 여기서 막으면 모든 요청이 멈춤)
+            genai, types = await asyncio.to_thread(_import_sdk)
+            if self._client is not None:
+                return self._client
+            http_options = types.HttpOptions(
+                base_url=self.base_url,  # None이면 기본 엔드포인트 (벤치마크는 로컬 가짜 서버)
+                api_version='v1beta',  # v1beta 사용 (Gemini 3 Pro용)
+                async_client_args={
+                    'http2': True,
+                    'limits': httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                    ),
+                },
+            )
+            self._client = genai.Client(
+                api_key=self.api_key or os.environ.get('GEMINI_API_KEY'),
+                http_options=http_options,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def _generate_once(self, model, contents, config):
+        client = await self._get_client()
+        async with self._semaphore:
+            return await client.aio.models.generate_content(model=model, contents=contents, config=config)
+
+    async def _generate(self, model, contents, config, deadline):
+        # 서킷이 열려 있거나 마감 전에 한도 토큰이 안 생기면 UpstreamUnavailable → 호출한 쪽은 원문/캐시로 응답
+        return await gemini_governor.call(lambda: self._generate_once(model, contents, config), _is_transient, deadline)
+
+    async def generate_content(self, model, contents, config=None, branch='fast', deadline=None):
+        """어느 이벤트 루프에서든 호출 가능 (실제 요청은 공유 루프에서 실행)
+
+        branch: 메트릭용 호출 분기 이름 (fast, verified, judge, batch, description, search_query)
+        deadline: 마감 시각 (time.monotonic 기준, 한도 대기를 이보다 길게 하지 않음)
+        """
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            response = await background_loop.run(self._generate(model, contents, config, deadline))
+            outcome = 'ok'
+            return response
+        finally:
+            metrics.inc('gemini_calls_total', model=model, branch=branch, outcome=outcome)
+            metrics.observe('gemini_call_seconds', time.perf_counter() - started, model=model, branch=branch)
+
+    async def aclose(self):
+        client, self._client = self._client, None
+        if client is None:
+            return
+        try:
+            aclose = getattr(client.aio, 'aclose', None)
+            if aclose:
+                await aclose()
+            client.close()
+        except Exception as e:
+            print(f"Gemini 클라이언트 종료 에러: {e}")
+
+
+gemini_client = GeminiClient()
@@ -1,157 +1,423 @@
 # services/gemini_service.py
 
-import os
+import re
+import json
+import hashlib
 import asyncio
-from google import genai
-from google.genai import types
-from extensions import db
-from models import Translation
+from datetime import datetime
+from flask import current_app, g, has_request_context
+from extensions import db, cache, run_db
+from models import Translation, DEFAULT_TRANSLATION_MODEL
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
+from services.translation_cache import translation_cache
+from services.gemini_client import gemini_client
+from services.model_router import model_router, DeadlineExceeded
+from services.upstream_governor import gemini_governor
+from services.singleflight import SingleFlight
+from services.title_index import korean_title_index
+from services.translation_worker import translation_worker
+from services.verification_stats import verification_stats
+from services.metrics import metrics
+from utils import split_description, join_description
 
-# 안전한 클라이언트 생성
-def _create_client_safely():
-    try:
-        api_key = os.environ.get("GEMINI_API_KEY")
-        if api_key:
-            # v1beta 사용 (Gemini 3 Pro용)
-            return genai.Client(http_options=types.HttpOptions(api_version='v1beta'))
-        return None
-    except Exception as e:
-        print(f"Gemini 클라이언트 생성 실패: {e}")
-        return None
+# 같은 원문에 대한 동시 번역 요청을 1번의 Gemini 호출로 합침
+translation_flight = SingleFlight()
+
+# 배치 제목 번역 응답 스키마 (JSON)
+# 설정은 dict로 넘겨서 google.genai SDK는 첫 Gemini 호출 때 gemini_client에서 import
+TITLE_BATCH_SCHEMA = {
+    'type': 'ARRAY',
+    'items': {
+        'type': 'OBJECT',
+        'properties': {'original': {'type': 'STRING'}, 'korean': {'type': 'STRING'}},
+        'required': ['original', 'korean'],
+    },
+}
 
 # [★수정] use_verification=True (기본값: 검증 켬)
 async def get_verified_translation(text, type='general', use_verification=True):
     if not text: return ""
     
-    # 1. DB에서 검색
-    existing = Translation.query.filter_by(original_text=text).first()
-    if existing:
-        return existing.translated_text
+    with metrics.span('title_translation' if type == 'title' else 'text_translation'):
+        # 1. 메모리 캐시 → DB 순서로 검색
+        cached = await translation_cache.aget(text, type)
+        if cached is not None:
+            # 리스트에서 빠른 번역으로 저장된 제목은 백그라운드에서 정밀 검증 (일치율이 높으면 생략)
+            if type == 'title' and use_verification and translation_worker.enabled \
+                    and await verification_stats.aneeds_verification(text):
+                translation_worker.enqueue(text, 'title_verify')
+            return cached
 
-    client = _create_client_safely()
-    if not client: return text
+        result = await translation_flight.do(
+            _flight_key(text, type, use_verification),
+            lambda: _translate_and_store(text, type, use_verification),
+        )
+        if result == text and has_request_context():
+            # Gemini 실패/서킷 열림으로 원문 그대로면 HTTP 캐시에 오래 남지 않도록 표시
+            g.partial_translation = True
+        return result
 
-    final_result = ""
-    
-    
-    MODEL_NAME = 'gemini-2.5-flash'
+# 동시 요청 합치기 키: 정밀 검증 제목 요청이 빠른 번역 호출에 합류하지 않도록 검증 여부 포함
+# (줄거리는 검증 분기가 없으므로 항상 같은 키)
+def _flight_key(text, type, use_verification):
+    return (text, type, bool(use_verification) and type == 'title')
 
+# 캐시 미스일 때만 호출: Gemini 번역 후 DB/메모리 캐시에 저장
+async def _translate_and_store(text, type, use_verification):
+    if not gemini_client.available: return text
 
     try:
-        # ---------------------------------------------------------
-        # CASE A: 제목 번역
-        # ---------------------------------------------------------
-        if type == 'title':
-            base_prompt = (
-                f"애니메이션 제목 '{text}'을(를) '공식 한국어 제목'으로 바꿔줘.\n"
-                f"규칙 1: 영어/일본어 부제는 과감히 삭제하고 **한국어 핵심 제목**만 남겨.\n"
-                f"규칙 2: 설명 없이 결과 텍스트만 출력해."
-            )
-
-            # [★분기 1] 정밀 검증 모드 (상세 페이지용 - 느리지만 정확함)
-            if use_verification:
-                print(f"--- [정밀 검증] (제목/{MODEL_NAME}) '{text}' ---")
-                config = types.GenerateContentConfig(temperature=0.1) 
-                
-                task1 = client.aio.models.generate_content(model=MODEL_NAME, contents=base_prompt, config=config)
-                task2 = client.aio.models.generate_content(model=MODEL_NAME, contents=base_prompt, config=config)
-                
-                response1, response2 = await asyncio.gather(task1, task2)
-                
-                result1 = response1.text.strip().replace('"', '')
-                result2 = response2.text.strip().replace('"', '')
-
-                if result1 == result2:
-                    # print(f"--- [일치] 검증 통과! ---")
-                    final_result = result1
-                else:
-                    # print(f"--- [불일치] 3번째 심판 요청 ---")
-                    judge_content = (
-                        f"당신은 제목 심판입니다. 다음 두 후보 중 '깔끔한 한국어 제목' 규칙에 맞는 것을 고르세요.\n"
-                        f"후보1: {result1}\n후보2: {result2}\n"
-                        f"둘 다 별로면 새로 번역해서 **최종 제목 딱 하나만** 출력하세요. 설명 금지."
-                    )
-                    response3 = await client.aio.models.generate_content(
-                        model=MODEL_NAME, 
-                        contents=judge_content,
-                        config=types.GenerateContentConfig(temperature=0.0) 
-                    )
-                    final_result = response3.text.strip().replace('"', '')
-                    if '\n' in final_result: final_result = final_result.split('\n')[-1]
-                    # print(f"--- [최종 결정 완료] ---")
-            
-            # [★분기 2] 고속 모드 (검색 리스트용 - 1번만 번역)
-            else:
-                # print(f"--- [빠른 번역] (제목) '{text}' ---")
-                config = types.GenerateContentConfig(temperature=0.1)
-                response = await client.aio.models.generate_content(model=MODEL_NAME, contents=base_prompt, config=config)
-                final_result = response.text.strip().replace('"', '')
-
-        # ---------------------------------------------------------
-        # CASE B: 줄거리/일반 (항상 1번만 번역)
-        # ---------------------------------------------------------
+        final_result, agreed, model = await _generate_translation(text, type, use_verification)
+    except Exception as e:
+        print(f"번역 에러: {e}")
+        return text
+
+    # DB 쓰기는 스레드에서 (SQLite 잠금 대기가 이벤트 루프를 막지 않도록)
+    if agreed is not None:
+        await run_db(verification_stats.record, text, agreed)
+    if final_result:
+        if translation_worker.enabled:
+            return _store_translation(text, final_result, type, model)  # 메모리 반영 + 워커 큐만
+        return await run_db(_store_translation, text, final_result, type, model)
+    return final_result
+
+# Gemini 번역만 수행 (저장 X, 실패 시 예외)
+# 반환: (번역 결과, 검증 후보 일치 여부 - 검증 안 했으면 None, 응답한 모델)
+async def _generate_translation(text, type, use_verification):
+    final_result = ""
+    agreed = None
+    model = DEFAULT_TRANSLATION_MODEL
+    # ---------------------------------------------------------
+    # CASE A: 제목 번역
+    # ---------------------------------------------------------
+    if type == 'title':
+        base_prompt = (
+            f"애니메이션 제목 '{text}'을(를) '공식 한국어 제목'으로 바꿔줘.\n"
+            f"규칙 1: 영어/일본어 부제는 과감히 삭제하고 **한국어 핵심 제목**만 남겨.\n"
+            f"규칙 2: 설명 없이 결과 텍스트만 출력해."
+        )
+
+        # [★분기 1] 정밀 검증 모드 (상세 페이지용 - 느리지만 정확함)
+        if use_verification:
+            print(f"--- [정밀 검증] (제목) '{text}' ---")
+            final_result, agreed, model = await _generate_verified_title(base_prompt)
+        
+        # [★분기 2] 고속 모드 (검색 리스트용 - 1번만 번역)
         else:
-            prompt = (
-                f"다음 애니메이션 줄거리를 한국어로 자연스럽게 번역해줘.\n"
-                f"원문: {text}\n"
-                f"규칙 1: 직역투보다는 한국 사람이 읽기 편한 문장으로 다듬어줘.\n"
-                f"규칙 2: **등장인물 이름은 문맥을 파악하여 억지 번역하지 말고 원문 발음대로(음차) 자연스럽게 적어줘.**\n"
-                f"규칙 3: 설명 없이 **번역된 줄거리 텍스트만** 출력해."
-            )
-            # print(f"--- [단일 번역] (줄거리) '{text[:10]}...' ---")
-            config = types.GenerateContentConfig(temperature=0.1)
-            response = await client.aio.models.generate_content(model=MODEL_NAME, contents=prompt, config=config)
+            # print(f"--- [빠른 번역] (제목) '{text}' ---")
+            config = {'temperature': 0.1}
+            response, model = await model_router.generate('fast', base_prompt, config)
             final_result = response.text.strip().replace('"', '')
 
-        # DB 저장 (공통)
-        if final_result:
-            try:
-                new_trans = Translation(original_text=text, translated_text=final_result)
-                db.session.add(new_trans)
-                db.session.commit()
-                # print("--- [DB 저장 완료] ---")
-            except IntegrityError:
-                db.session.rollback()
-                existing_late = Translation.query.filter_by(original_text=text).first()
-                if existing_late: return existing_late.translated_text
-            except Exception:
-                pass 
+    # ---------------------------------------------------------
+    # CASE B: 줄거리/일반 (항상 1번만 번역)
+    # ---------------------------------------------------------
+    else:
+        prompt = (
+            f"다음 애니메이션 줄거리를 한국어로 자연스럽게 번역해줘.\n"
+            f"원문: {text}\n"
+            f"규칙 1: 직역투보다는 한국 사람이 읽기 편한 문장으로 다듬어줘.\n"
+            f"규칙 2: **등장인물 이름은 문맥을 파악하여 억지 번역하지 말고 원문 발음대로(음차) 자연스럽게 적어줘.**\n"
+            f"규칙 3: 설명 없이 **번역된 줄거리 텍스트만** 출력해."
+        )
+        # print(f"--- [단일 번역] (줄거리) '{text[:10]}...' ---")
+        config = {'temperature': 0.1}
+        response, model = await model_router.generate('description', prompt, config)
+        final_result = response.text.strip().replace('"', '')
 
-        return final_result
+    return final_result, agreed, model
+
+# 정밀 검증: 한 번의 요청으로 후보 2개를 받아 로컬에서 비교하고, 다를 때만 심판 요청
+# 반환: (최종 제목, 후보 일치 여부, 최종 제목을 낸 모델)
+async def _generate_verified_title(base_prompt):
+    config = {'temperature': 0.1, 'candidate_count': 2}
+    response, model = await model_router.generate('verified', base_prompt, config)
+    candidates = [c for c in (_candidate_text(c) for c in (response.candidates or [])) if c]
+
+    # candidate_count를 지원하지 않는 모델이면 후보를 1개 더 요청
+    while len(candidates) < 2:
+        extra, _ = await model_router.generate('verified', base_prompt, {'temperature': 0.1})
+        candidates.append(extra.text.strip().replace('"', ''))
+
+    result1, result2 = candidates[:2]
+    if _normalize_title(result1) == _normalize_title(result2):
+        # print(f"--- [일치] 검증 통과! ---")
+        return result1, True, model
+
+    # print(f"--- [불일치] 심판 요청 ---")
+    judge_content = (
+        f"당신은 제목 심판입니다. 다음 두 후보 중 '깔끔한 한국어 제목' 규칙에 맞는 것을 고르세요.\n"
+        f"후보1: {result1}\n후보2: {result2}\n"
+        f"둘 다 별로면 새로 번역해서 **최종 제목 딱 하나만** 출력하세요. 설명 금지."
+    )
+    response, model = await model_router.generate('judge', judge_content, {'temperature': 0.0})
+    final_result = response.text.strip().replace('"', '')
+    if '\n' in final_result: final_result = final_result.split('\n')[-1]
+    return final_result, False, model
+
+def _candidate_text(candidate):
+    content = getattr(candidate, 'content', None)
+    if not content or not content.parts:
+        return ''
+    return ''.join(part.text or '' for part in content.parts).strip().replace('"', '')
+
+def _normalize_title(title):
+    # 공백/따옴표/문장부호 차이는 같은 제목으로 취급
+    return re.sub(r'[\s\W_]+', '', title).lower()
 
+# 백그라운드 워커용: 저장된 제목의 재검증 결과 반영 (결과가 달라졌으면 번역 갱신)
+def _apply_title_verification(text, translated, agreed, model=DEFAULT_TRANSLATION_MODEL):
+    verification_stats.record(text, agreed)
+    if not translated or translated == translation_cache.get(text, 'title'):
+        return
+    try:
+        text_hash = Translation.hash_text(text)
+        # 다른 모델로 저장된 예전 번역은 지움 (남아 있으면 조회 때 교정 결과와 함께 두 줄이 됨)
+        Translation.query.filter(
+            Translation.text_hash == text_hash, Translation.type == 'title', Translation.model != model
+        ).delete(synchronize_session=False)
+        stmt = sqlite_insert(Translation).values(
+            text_hash=text_hash, type='title', model=model,
+            original_text=text, translated_text=translated,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['text_hash', 'type', 'model'],
+            # updated_at은 다른 행과 같은 형식(마이크로초 포함)으로 - 조회 순서가 updated_at 기준
+            set_={'translated_text': stmt.excluded.translated_text, 'updated_at': datetime.utcnow()},
+        )
+        db.session.execute(stmt)
+        db.session.commit()
+        # Core UPDATE는 mapper 이벤트가 없으므로 캐시/색인 직접 반영
+        translation_cache.set(text, translated, 'title')
+        korean_title_index.add(text, translated)
     except Exception as e:
-        print(f"번역 에러: {e}")
-        return text
+        db.session.rollback()
+        print(f"검증 결과 저장 에러: {e}")
 
-    # [★핵심 수정] Event loop is closed 에러 방지
-    finally:
-        if client:
-            try:
-                # 클라이언트를 명시적으로 닫아서 리소스 정리
-                client.close()
-            except:
-                pass
+# DB 저장 (공통)
+# 백그라운드 워커가 켜져 있으면 메모리에만 바로 반영하고 DB 쓰기는 워커가 모아서 처리
+def _store_translation(text, final_result, type, model=DEFAULT_TRANSLATION_MODEL):
+    if translation_worker.enabled:
+        translation_cache.set(text, final_result, type)
+        if type == 'title':
+            korean_title_index.add(text, final_result)
+        translation_worker.enqueue_write(text, final_result, type, model)
+        return final_result
+
+    try:
+        new_trans = Translation(original_text=text, translated_text=final_result, type=type, model=model)
+        db.session.add(new_trans)
+        db.session.commit()
+        translation_cache.set(text, final_result, type)
+        if type == 'title':
+            korean_title_index.add(text, final_result)
+        # print("--- [DB 저장 완료] ---")
+    except IntegrityError:
+        db.session.rollback()
+        existing_late = translation_cache.get(text, type)
+        if existing_late is not None: return existing_late
+    except Exception:
+        pass 
+
+    return final_result
 
 # [★수정] 래퍼 함수에도 옵션 전달
 async def translate_title_to_korean_official(english_title, use_verification=True):
     return await get_verified_translation(english_title, type='title', use_verification=use_verification)
 
+# 리스트용: 여러 제목을 입력 순서대로 번역
+# (캐시 조회는 IN 쿼리 1회, 미스는 Gemini 1회 + DB 일괄 저장)
+# background=True면 미스는 워커 큐에 넣고 원문 제목을 바로 돌려줌 (Gemini 대기 X)
+async def translate_titles_to_korean_official(english_titles, use_verification=False, background=False):
+    with metrics.span('title_translation'):
+        return await _translate_titles(english_titles, use_verification, background)
+
+async def _translate_titles(english_titles, use_verification, background):
+    cached = await translation_cache.aget_many(english_titles, 'title')
+    missing = [t for t in dict.fromkeys(english_titles) if t and t not in cached]
+
+    if background and translation_worker.enabled and gemini_client.available:
+        for t in missing:
+            translation_worker.enqueue(t, 'title')
+        if missing:
+            g.partial_translation = True
+        return [cached.get(t, t) if t else "" for t in english_titles]
+
+    # Gemini 서킷이 열려 있으면 기다리지 않고 아는 번역 + 원문으로 응답 (뷰 캐시에는 저장 X)
+    if missing and not gemini_governor.healthy:
+        g.partial_translation = True
+        return [cached.get(t, t) if t else "" for t in english_titles]
+
+    if len(missing) > 1 and not use_verification:
+        translated = await translation_flight.do(
+            ('title_batch', tuple(missing)),
+            lambda: _translate_titles_batch(missing),
+        )
+        if translated is None:
+            g.partial_translation = True
+            return [cached.get(t, t) if t else "" for t in english_titles]
+        cached.update(translated)
+        missing = [t for t in missing if t not in translated]
+
+    # 배치에서 빠진 제목(또는 검증 모드)은 개별 번역으로 처리
+    results = await asyncio.gather(*[
+        translation_flight.do(_flight_key(t, 'title', use_verification),
+                              lambda t=t: _translate_and_store(t, 'title', use_verification))
+        for t in missing
+    ])
+    cached.update(zip(missing, results))
+    return [cached.get(t, t) if t else "" for t in english_titles]
+
+# 캐시 미스 제목들을 JSON 구조화 프롬프트 1회로 번역 후 일괄 저장 (실패/마감 시간 초과면 None)
+async def _translate_titles_batch(titles):
+    if not gemini_client.available: return None
+
+    try:
+        translated, model = await _generate_titles_batch(titles)
+    except Exception as e:
+        # 배치가 실패하면 제목마다 Gemini를 다시 부르지 않고 워커에 맡김 (원문으로 응답)
+        label = "배치 번역 마감 초과" if isinstance(e, DeadlineExceeded) else "배치 번역 에러"
+        print(f"{label}: {e}")
+        for t in titles:
+            translation_worker.enqueue(t, 'title')
+        return None
+
+    return await run_db(_bulk_store_translations, translated, 'title', model)
+
+# 배치 제목 번역만 수행 (저장 X, 실패 시 예외) → ({원문: 번역}, 응답한 모델)
+async def _generate_titles_batch(titles):
+    title_lines = "\n".join(f"- {t}" for t in titles)
+    prompt = (
+        f"다음 애니메이션 제목들을 각각 '공식 한국어 제목'으로 바꿔줘.\n"
+        f"{title_lines}\n"
+        f"규칙 1: 영어/일본어 부제는 과감히 삭제하고 **한국어 핵심 제목**만 남겨.\n"
+        f"규칙 2: original에는 입력 제목을 그대로, korean에는 번역 결과만 넣어."
+    )
+    config = {
+        'temperature': 0.1,
+        'response_mime_type': 'application/json',
+        'response_schema': TITLE_BATCH_SCHEMA,
+    }
+    response, model = await model_router.generate('batch', prompt, config)
+
+    wanted = set(titles)
+    translated = {}
+    for item in json.loads(response.text):
+        original = item.get('original')
+        korean = (item.get('korean') or '').strip().replace('"', '')
+        if original in wanted and korean:
+            translated[original] = korean
+    return translated, model
+
+# 번역 결과 일괄 INSERT (이미 있는 원문은 무시) 후 DB에 남은 값으로 메모리 캐시 반영
+# 반환: {원문: DB에 저장된 번역} (저장 실패 시 입력 그대로)
+def _bulk_store_translations(translated, type='title', model=DEFAULT_TRANSLATION_MODEL):
+    if not translated: return {}
+    try:
+        stmt = sqlite_insert(Translation).values([
+            {
+                'text_hash': Translation.hash_text(original),
+                'type': type,
+                'model': model,
+                'original_text': original,
+                'translated_text': korean,
+            }
+            for original, korean in translated.items()
+        ]).on_conflict_do_nothing(index_elements=['text_hash', 'type', 'model'])
+        db.session.execute(stmt)
+        db.session.commit()
+        # 충돌로 무시된 원문은 먼저 저장된 번역이 정답 → 조회와 같은 순서로 다시 읽어서 DB와 같은 값만 캐시
+        by_hash = {Translation.hash_text(original): original for original in translated}
+        rows = Translation.query.filter(
+            Translation.text_hash.in_(list(by_hash)), Translation.type == type
+        ).order_by(*Translation.newest_first()).all()
+        stored = {}
+        for row in rows:
+            original = by_hash.get(row.text_hash)
+            if original is not None and original not in stored:
+                stored[original] = row.translated_text
+        for original, korean in stored.items():
+            translation_cache.set(original, korean, type)
+            if type == 'title':
+                korean_title_index.add(original, korean)
+        return stored
+    except Exception as e:
+        db.session.rollback()
+        print(f"번역 일괄 저장 에러: {e}")
+        return translated
+
+# 줄거리: HTML 정리 → 문단(긴 문단은 문장 묶음) 단위로 나눠 캐시에 없는 조각만 동시에 번역
+# 조각마다 따로 캐시하므로 AniList에서 문단 하나가 바뀌면 그 문단만 다시 번역
 async def translate_general_text(text):
-    return await get_verified_translation(text, type='general', use_verification=False) 
+    if not text: return ""
+    with metrics.span('text_translation'):
+        return await _translate_description(text)
+
+async def _translate_description(text):
+    paragraphs, sources = split_description(text, current_app.config.get('DESCRIPTION_CHUNK_MAX_CHARS', 800))
+    chunks = [chunk for paragraph in paragraphs for chunk in paragraph]
+
+    # 예전처럼 통째로 저장된 번역이 있으면 그대로 사용 (원문 + 조각 조회는 IN 쿼리 1회)
+    cached = await translation_cache.aget_many([text] + chunks, 'general')
+    if text in cached:
+        return cached[text]
 
+    missing = [c for c in dict.fromkeys(chunks) if c not in cached]
+    results = await asyncio.gather(*[
+        translation_flight.do(_flight_key(c, 'general', False), lambda c=c: _translate_and_store(c, 'general', False))
+        for c in missing
+    ])
+    for chunk, result in zip(missing, results):
+        cached[chunk] = result or chunk
+        if cached[chunk] == chunk and has_request_context():
+            g.partial_translation = True  # Gemini 실패로 원문이 섞임
+    return join_description([[cached[c] for c in paragraph] for paragraph in paragraphs], sources)
+
+async def has_stored_translations(title, description):
+    """제목/줄거리 번역이 모두 저장돼 있는지 (Gemini 없이 바로 한국어로 응답할 수 있는지)"""
+    if title and await translation_cache.aget(title, 'title') is None:
+        return False
+    if not description:
+        return True
+    chunks = description_chunks(description)
+    stored = await translation_cache.aget_many([description] + chunks, 'general')
+    return description in stored or all(c in stored for c in chunks)
+
+def description_chunks(text):
+    """줄거리의 번역 단위 조각 목록 (프리페치/워커에서 조각별로 미리 번역할 때)"""
+    paragraphs, _ = split_description(text, current_app.config.get('DESCRIPTION_CHUNK_MAX_CHARS', 800))
+    return [chunk for paragraph in paragraphs for chunk in paragraph]
+
+# 검색어 → AniList 검색용 제목
+# 1) 이미 아는 한국어 제목이면 로컬 역색인, 2) 이전 변환 결과 캐시, 3) 그래도 없을 때만 모델 호출
 async def translate_search_query(query):
-    # 검색어 번역은 클라이언트 별도 생성/종료
-    client = _create_client_safely()
-    if not client: return query
+    with metrics.span('query_translation'):
+        return await _resolve_search_query(query)
+
+async def _resolve_search_query(query):
+    # 첫 조회 때는 저장된 제목 전체를 DB에서 읽어 색인을 만들므로 스레드에서
+    local_title = await run_db(korean_title_index.lookup, query)
+    if local_title:
+        metrics.inc('cache_lookups_total', cache='title_index', result='hit')
+        return local_title
+
+    cache_key = 'search_query:' + hashlib.sha1(' '.join(query.lower().split()).encode('utf-8')).hexdigest()
+    cached = cache.get(cache_key)
+    metrics.inc('cache_lookups_total', cache='search_query', result='hit' if cached else 'miss')
+    if cached:
+        return cached
+
+    if not gemini_client.available: return query
+    result = await translation_flight.do((query, 'search_query'), lambda: _translate_search_query(query))
+    if result and result != query:
+        cache.set(cache_key, result, timeout=current_app.config.get('SEARCH_QUERY_CACHE_TTL', 604800))
+    return result
+
+async def _translate_search_query(query):
     try:
-        MODEL_NAME = 'gemini-3-pro-preview'
         prompt = f"AniList 검색용 영문/로마자 제목으로 변환해(설명X): {query}"
-        response = await client.aio.models.generate_content(model=MODEL_NAME, contents=prompt)
+        response, _ = await model_router.generate('search_query', prompt)
         return response.text.strip().replace('"', '')
     except:
         return query
-    finally:
-        if client:
-            try: client.close()
-            except: pass
\ No newline at end of file
@@ -0,0 +1,137 @@
+# services/http_cache.py
+# HTTP 캐시 계층: API 응답 ETag/304, 엔드포인트별 Cache-Control, gzip(brotli) 압축
+# 메인 페이지(index.html)는 템플릿 변수가 없어서 렌더링 없이 미리 압축해 둔 바이트로 응답
+
+import os
+import gzip
+import hashlib
+import threading
+import brotli
+from flask import Response, g, request
+from services.metrics import metrics
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/html', 'text/plain', 'text/css',
+                          'application/javascript', 'text/javascript'}
+
+
+def _accepts(encoding):
+    return request.accept_encodings[encoding] > 0
+
+
+def _compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level + 5, 11))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class _StaticAsset:
+    """파일 내용 + 미리 압축한 버전 (파일이 바뀌면 다시 읽음)"""
+
+    def __init__(self, path, mimetype):
+        self.path = path
+        self.mimetype = mimetype
+        self.mtime = None
+        self.etag = None
+        self.bodies = {}  # 인코딩 ('identity', 'gzip', 'br') -> 바이트
+
+    def load(self, level):
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self.mtime:
+            return
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        self.bodies = {'identity': data, 'gzip': _compress(data, 'gzip', 9), 'br': _compress(data, 'br', level)}
+        self.etag = hashlib.sha1(data).hexdigest()
+        self.mtime = mtime
+
+
+class HttpCache:
+    """after_request에서 응답에 캐시 헤더/ETag를 붙이고 압축 (스트리밍 응답은 캐시 헤더만)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._assets = {}
+        self.enabled = True
+        self.policies = {}
+        self.partial_policy = 'no-cache'
+        self.min_size = 1024
+        self.level = 6
+
+    def init_app(self, app):
+        self.enabled = app.config.get('HTTP_CACHE_ENABLED', True)
+        self.policies = app.config.get('HTTP_CACHE_CONTROL', {})
+        self.partial_policy = app.config.get('HTTP_CACHE_PARTIAL_POLICY', 'no-cache')
+        self.min_size = app.config.get('HTTP_COMPRESS_MIN_SIZE', 1024)
+        self.level = app.config.get('HTTP_COMPRESS_LEVEL', 6)
+        # metrics보다 나중에 등록 → 먼저 실행되어 압축 시간/304도 요청 시간에 포함됨
+        app.after_request(self._finish_request)
+
+    def static_file(self, path, mimetype='text/html'):
+        """미리 압축해 둔 파일 응답 (If-None-Match/Accept-Encoding은 여기와 _finish_request에서 처리)"""
+        with self._lock:
+            asset = self._assets.get(path)
+            if asset is None:
+                asset = self._assets[path] = _StaticAsset(path, mimetype)
+            asset.load(self.level)
+            bodies, etag = asset.bodies, asset.etag
+
+        encoding = 'identity'
+        if _accepts('br'):
+            encoding = 'br'
+        elif _accepts('gzip'):
+            encoding = 'gzip'
+        response = Response(bodies[encoding], mimetype=mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+            metrics.inc('http_cache_total', result=f'static_{encoding}')
+        response.vary.add('Accept-Encoding')
+        response.set_etag(etag, weak=True)
+        return response
+
+    def _finish_request(self, response):
+        if not self.enabled or response.direct_passthrough:
+            return response
+
+        cacheable = request.method in ('GET', 'HEAD') and response.status_code == 200
+        if 'Cache-Control' not in response.headers:
+            policy = self.policies.get(request.endpoint)
+            if response.status_code >= 400:
+                response.headers['Cache-Control'] = 'no-store'
+            elif policy and cacheable:
+                # 번역이 원문으로 대체된 응답은 오래 캐시하지 않음 (나중에 한국어로 바뀜)
+                response.headers['Cache-Control'] = self.partial_policy if g.get('partial_translation') else policy
+        if response.is_streamed:
+            # 본문을 미리 읽을 수 없으므로 ETag/압축은 생략 (NDJSON 스트림은 조각마다 바로 전송)
+            return response
+
+        if cacheable and 'no-store' not in response.headers.get('Cache-Control', ''):
+            # 압축 전 본문 기준 약한 ETag (gzip/br/원문 모두 같은 값)
+            response.add_etag(weak=True)
+            response.make_conditional(request)
+            if response.status_code == 304:
+                metrics.inc('http_cache_total', result='not_modified')
+                return response
+
+        self._compress(response)
+        return response
+
+    def _compress(self, response):
+        if response.status_code < 200 or response.status_code in (204, 304) \
+                or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return
+        if _accepts('br'):
+            encoding = 'br'
+        elif _accepts('gzip'):
+            encoding = 'gzip'
+        else:
+            return
+        response.set_data(_compress(data, encoding, self.level))
+        response.headers['Content-Encoding'] = encoding
+        metrics.inc('http_cache_total', result=encoding)
+
+
+http_cache = HttpCache()
@@ -0,0 +1,166 @@
+# services/metrics.py
+# 요청 단계별 소요 시간 + 업스트림/캐시 카운터 (Prometheus 텍스트 형식으로 /metrics에 노출)
+
+import json
+import time
+import threading
+from contextlib import contextmanager
+from flask import g, request, has_request_context
+
+# 지연 시간 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 이름 -> (종류, 설명)
+METRIC_DEFINITIONS = {
+    'app_request_seconds': ('histogram', 'HTTP 요청 처리 시간'),
+    'app_stage_seconds': ('histogram', '요청 안의 단계별 소요 시간 (query_translation, anilist, title_translation, db 등)'),
+    'anilist_requests_total': ('counter', 'AniList로 실제 전송한 요청 수'),
+    'anilist_request_seconds': ('histogram', 'AniList 요청 시간'),
+    'anilist_cache_total': ('counter', 'AniList 응답 캐시 조회 결과 (hit, stale, miss)'),
+    'gemini_calls_total': ('counter', 'Gemini 호출 수 (모델, 분기별)'),
+    'gemini_call_seconds': ('histogram', 'Gemini 호출 시간'),
+    'translation_lookups_total': ('counter', '번역 조회 결과 (memory/db 계층별 hit, miss)'),
+    'cache_lookups_total': ('counter', 'Flask 캐시 조회 결과 (용도별 hit, miss)'),
+    'recommendation_pool_total': ('counter', '추천 풀 조회/보충 (hit, cold, refill)'),
+    'catalog_queries_total': ('counter', '로컬 카탈로그 사본으로 처리한 목록 조회 수'),
+    'detail_prefetch_total': ('counter', '상세 프리페치 작품 수 (scheduled, skipped, translation_skipped)'),
+    'catalog_sync_total': ('counter', '카탈로그 동기화 완료 수 (full, incremental)'),
+    'model_router_total': ('counter', 'Gemini 라우팅 결과 (primary, hedge_won, hedge_lost, fallback, deadline, error)'),
+    'http_cache_total': ('counter', 'HTTP 캐시 계층 처리 결과 (not_modified, gzip, br, static_gzip, static_br)'),
+}
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+class Metrics:
+    """프로세스 단위 메트릭 저장소 (워커가 여러 개면 워커별로 따로 집계됨)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}    # 이름 -> {라벨 튜플: 값}
+        self._histograms = {}  # 이름 -> {라벨 튜플: [구간별 개수..., 합계, 개수]}
+        self._gauges = {}      # 이름 -> (설명, 현재 값을 돌려주는 함수)
+        self.log_requests = False
+
+    def init_app(self, app):
+        self.log_requests = app.config.get('METRICS_LOG_REQUESTS', False)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    def inc(self, name, value=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def gauge(self, name, help_text, func):
+        """조회 시점에 func()로 값을 읽는 게이지 등록 (func는 숫자 또는 {라벨 튜플: 값} 반환)"""
+        self._gauges[name] = (help_text, func)
+
+    def observe(self, name, seconds, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            values = series.get(key)
+            if values is None:
+                values = series[key] = [0] * (len(LATENCY_BUCKETS) + 2)
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    values[i] += 1
+            values[-2] += seconds
+            values[-1] += 1
+
+    @contextmanager
+    def span(self, stage):
+        """with metrics.span('anilist'): ... - 단계 시간 기록 (요청 중이면 Server-Timing에도 포함)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe('app_stage_seconds', elapsed, stage=stage)
+            if has_request_context():
+                spans = g.get('metrics_spans')
+                if spans is not None:
+                    spans.append((stage, elapsed))
+
+    def _start_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_spans = []
+
+    def _finish_request(self, response):
+        started = g.get('metrics_started')
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = request.endpoint or 'unknown'
+        self.observe('app_request_seconds', elapsed, endpoint=endpoint, status=response.status_code)
+
+        # 같은 단계가 여러 번(병렬 번역 등) 있으면 합계로 표시
+        totals = {}
+        for stage, seconds in g.get('metrics_spans') or []:
+            totals[stage] = totals.get(stage, 0.0) + seconds
+        timing = [f'total;dur={elapsed * 1000:.1f}'] + [f'{stage};dur={seconds * 1000:.1f}' for stage, seconds in totals.items()]
+        response.headers['Server-Timing'] = ', '.join(timing)
+
+        if self.log_requests:
+            print(json.dumps({
+                'event': 'request',
+                'method': request.method,
+                'path': request.path,
+                'endpoint': endpoint,
+                'status': response.status_code,
+                'duration_ms': round(elapsed * 1000, 1),
+                'stages_ms': {stage: round(seconds * 1000, 1) for stage, seconds in totals.items()},
+            }, ensure_ascii=False))
+        return response
+
+    def render(self):
+        """Prometheus 텍스트 형식 (text/plain; version=0.0.4)"""
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {k: list(v) for k, v in series.items()} for name, series in self._histograms.items()}
+
+        lines = []
+        for name, (kind, help_text) in METRIC_DEFINITIONS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind == 'counter':
+                for labels, value in sorted(counters.get(name, {}).items()):
+                    lines.append(f'{name}{_format_labels(labels)} {value}')
+                continue
+            for labels, values in sorted(histograms.get(name, {}).items()):
+                for bound, count in zip(LATENCY_BUCKETS, values):
+                    lines.append(f'{name}_bucket{_format_labels(labels + (("le", bound),))} {count}')
+                lines.append(f'{name}_bucket{_format_labels(labels + (("le", "+Inf"),))} {values[-1]}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {values[-2]:.6f}')
+                lines.append(f'{name}_count{_format_labels(labels)} {values[-1]}')
+
+        for name, (help_text, func) in self._gauges.items():
+            try:
+                value = func()
+            except Exception as e:
+                print(f"메트릭 게이지 에러 ({name}): {e}")
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            series = value if isinstance(value, dict) else {(): value}
+            for labels, current in sorted(series.items()):
+                lines.append(f'{name}{_format_labels(labels)} {current}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,222 @@
+# services/model_router.py
+# 작업 종류(제목/줄거리/배치/검색어 ...)별 Gemini 모델 선택 + 느린 호출 헤징 + 요청 마감 시간
+#
+# - 후보 모델 중 최근 에러율/지연(p95)이 기준 안인 첫 모델을 주 모델로 사용
+# - 주 모델 응답이 그 모델의 p95를 넘기면 더 빠른 후보 모델로 백업 요청을 보내고 먼저 온 응답 사용
+# - 작업마다 마감 시간이 있어서 넘기면 DeadlineExceeded → 호출한 쪽은 원문으로 응답
+#   (마감 전에 분당 한도 토큰이 안 생기면 기다리지 않고 UpstreamUnavailable로 바로 실패)
+
+import time
+import asyncio
+import threading
+from collections import deque
+from services.gemini_client import gemini_client
+from services.upstream_governor import gemini_governor, UpstreamUnavailable
+from services.metrics import metrics
+
+DEFAULT_MODEL = 'gemini-2.5-flash'
+
+
+class DeadlineExceeded(Exception):
+    """작업 마감 시간 안에 어떤 모델도 응답하지 않음"""
+
+    def __init__(self, task, deadline):
+        super().__init__(f'{task}: {deadline:.1f}초 안에 응답 없음')
+        self.task = task
+
+
+class _ModelStats:
+    """(작업, 모델)별 최근 window개 호출의 지연/성공 여부"""
+
+    def __init__(self, window):
+        self.latencies = deque(maxlen=window)  # 성공한 호출 (헤징으로 취소된 호출은 취소 시점까지 시간)
+        self.outcomes = deque(maxlen=window)   # True: 성공, False: 에러
+
+    def percentile(self, p):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+
+class ModelRouter:
+    """프로세스 단위 Gemini 모델 라우터 (통계는 워커별로 따로 쌓임)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.routes = {}
+        self.deadlines = {}
+        self.default_deadline = 20.0
+        self.window = 200
+        self.min_samples = 20
+        self.max_error_rate = 0.3
+        self.hedge_enabled = True
+        self.hedge_percentile = 95
+        self.hedge_min_delay = 0.3
+        self.hedge_default_delay = 2.0
+        self.hedge_budget = 0.1
+        self._recent_hedges = deque(maxlen=200)
+
+    def init_app(self, app):
+        self.routes = app.config.get('GEMINI_MODEL_ROUTES', {})
+        self.deadlines = app.config.get('GEMINI_TASK_DEADLINES', {})
+        self.default_deadline = app.config.get('GEMINI_DEFAULT_DEADLINE', 20.0)
+        self.window = app.config.get('MODEL_ROUTER_WINDOW', 200)
+        self.min_samples = app.config.get('MODEL_ROUTER_MIN_SAMPLES', 20)
+        self.max_error_rate = app.config.get('MODEL_ROUTER_MAX_ERROR_RATE', 0.3)
+        self.hedge_enabled = app.config.get('GEMINI_HEDGE_ENABLED', True)
+        self.hedge_percentile = app.config.get('GEMINI_HEDGE_PERCENTILE', 95)
+        self.hedge_min_delay = app.config.get('GEMINI_HEDGE_MIN_DELAY', 0.3)
+        self.hedge_default_delay = app.config.get('GEMINI_HEDGE_DEFAULT_DELAY', 2.0)
+        self.hedge_budget = app.config.get('GEMINI_HEDGE_BUDGET', 0.1)
+        with self._lock:
+            self._stats = {}
+            self._recent_hedges = deque(maxlen=self.window)
+
+    def _get_stats(self, task, model):
+        with self._lock:
+            stats = self._stats.get((task, model))
+            if stats is None:
+                stats = self._stats[(task, model)] = _ModelStats(self.window)
+            return stats
+
+    def _record(self, task, model, seconds, ok):
+        # ok=None: 헤징/마감으로 취소됨 (최소 이만큼 걸린다는 뜻이므로 지연에만 반영)
+        stats = self._get_stats(task, model)
+        with self._lock:
+            if ok is not None:
+                stats.outcomes.append(ok)
+            if ok is not False:
+                stats.latencies.append(seconds)
+
+    def latency_p95(self):
+        """/metrics 게이지용 {라벨 튜플: p95 초}"""
+        with self._lock:
+            items = list(self._stats.items())
+        return {(('model', model), ('task', task)): stats.percentile(95)
+                for (task, model), stats in items if stats.latencies}
+
+    def candidates(self, task):
+        return list(self.routes.get(task) or [DEFAULT_MODEL])
+
+    def choose(self, task):
+        """(주 모델, 백업 모델 또는 None)"""
+        candidates = self.candidates(task)
+        deadline = self.deadlines.get(task, self.default_deadline)
+
+        def healthy(model):
+            stats = self._get_stats(task, model)
+            if len(stats.outcomes) < self.min_samples:
+                return True  # 표본이 적으면 설정 순서대로
+            p95 = stats.percentile(95)
+            return stats.error_rate() <= self.max_error_rate and (p95 is None or p95 < deadline)
+
+        def speed(model):
+            # 표본이 없는 모델은 중간값을 모르므로 뒤로
+            p50 = self._get_stats(task, model).percentile(50)
+            return p50 if p50 is not None else float('inf')
+
+        primary = next((m for m in candidates if healthy(m)), None)
+        if primary is None:
+            # 모두 기준 밖이면 에러율이 가장 낮고 빠른 모델
+            primary = min(candidates, key=lambda m: (self._get_stats(task, m).error_rate(), speed(m)))
+        others = [m for m in candidates if m != primary and healthy(m)]
+        if others:
+            backup = min(others, key=speed)
+        else:
+            backup = primary if self.hedge_enabled else None  # 후보가 하나면 같은 모델로 백업 요청
+        return primary, backup
+
+    def hedge_delay(self, task, model):
+        stats = self._get_stats(task, model)
+        if len(stats.latencies) < self.min_samples:
+            return self.hedge_default_delay
+        return max(self.hedge_min_delay, stats.percentile(self.hedge_percentile))
+
+    async def generate(self, task, contents, config=None):
+        """task에 맞는 모델로 generate_content → (응답, 실제로 응답한 모델) (마감 시간 초과 시 DeadlineExceeded)"""
+        deadline = self.deadlines.get(task, self.default_deadline)
+        expires = time.monotonic() + deadline
+        primary, backup = self.choose(task)
+        try:
+            return await asyncio.wait_for(self._hedged(task, primary, backup, contents, config, expires), deadline)
+        except asyncio.TimeoutError:
+            metrics.inc('model_router_total', task=task, outcome='deadline')
+            raise DeadlineExceeded(task, deadline) from None
+
+    async def _attempt(self, task, model, contents, config, expires):
+        started = time.perf_counter()
+        try:
+            response = await gemini_client.generate_content(model=model, contents=contents, config=config,
+                                                            branch=task, deadline=expires)
+        except asyncio.CancelledError:
+            self._record(task, model, time.perf_counter() - started, None)
+            raise
+        except UpstreamUnavailable:
+            raise  # 한도/서킷으로 호출 전에 포기 → 모델 에러율에 넣지 않음
+        except Exception:
+            self._record(task, model, time.perf_counter() - started, False)
+            raise
+        self._record(task, model, time.perf_counter() - started, True)
+        return response
+
+    def _allow_hedge(self):
+        # 헤징 요청도 Gemini 분당 한도를 쓰므로 최근 호출 중 budget 비율까지만 (한도 대기로 느려질 때 악순환 방지)
+        # 지금 토큰이 없으면 백업 요청은 한도 대기만 하므로 보내지 않음
+        with self._lock:
+            allowed = gemini_governor.has_token \
+                and sum(self._recent_hedges) < self.hedge_budget * len(self._recent_hedges) + 1
+            self._recent_hedges.append(allowed)
+        return allowed
+
+    async def _hedged(self, task, primary, backup, contents, config, expires):
+        futures = [asyncio.ensure_future(self._attempt(task, primary, contents, config, expires))]
+        try:
+            if not self.hedge_enabled or backup is None:
+                metrics.inc('model_router_total', task=task, outcome='primary')
+                return await futures[0], primary
+
+            # 주 모델이 p95 안에 끝나면 백업 없이 반환, 에러면 바로 백업 요청
+            done, _ = await asyncio.wait(futures, timeout=self.hedge_delay(task, primary))
+            if done and not futures[0].exception():
+                with self._lock:
+                    self._recent_hedges.append(False)
+                metrics.inc('model_router_total', task=task, outcome='primary')
+                return futures[0].result(), primary
+            error = futures[0].exception() if done else None
+            if isinstance(error, UpstreamUnavailable):
+                # 한도/서킷은 모델과 무관하므로 백업 모델도 같은 이유로 실패
+                metrics.inc('model_router_total', task=task, outcome='unavailable')
+                raise error
+            if error is None and not self._allow_hedge():
+                metrics.inc('model_router_total', task=task, outcome='primary')
+                return await futures[0], primary
+
+            futures.append(asyncio.ensure_future(self._attempt(task, backup, contents, config, expires)))
+            pending = {futures[1]} if done else set(futures)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if error is not None:
+                            outcome = 'fallback'  # 주 모델 에러 후 백업으로 응답
+                        else:
+                            outcome = 'hedge_won' if future is futures[1] else 'hedge_lost'
+                        metrics.inc('model_router_total', task=task, outcome=outcome)
+                        return future.result(), (backup if future is futures[1] else primary)
+                    error = future.exception()
+            metrics.inc('model_router_total', task=task, outcome='error')
+            raise error
+        finally:
+            # 먼저 끝난 응답을 썼거나 마감 시간이 지났으면 나머지 요청은 취소
+            for future in futures:
+                if not future.done():
+                    future.cancel()
+
+model_router = ModelRouter()
@@ -0,0 +1,190 @@
+# services/recommendation_pool.py
+# 추천 후보 풀: (장르, 정렬)마다 AniList 페이지를 미리 받아 제목까지 번역해 두고
+# 추천 요청은 메모리에서 뽑기만 함 (세션별로 이미 본 작품은 제외)
+
+import time
+import math
+import random
+import threading
+from flask import current_app
+from extensions import run_db
+from services.anilist_client import anilist_client
+from services.anilist_queries import build_media_page_query, recommendation_page_range, RECOMMENDATION_PER_PAGE
+from services.background_loop import background_loop
+from services.catalog_mirror import catalog_mirror
+from services.gemini_service import translate_titles_to_korean_official
+from services.singleflight import SingleFlight
+from services.translation_cache import translation_cache
+from services.metrics import metrics
+from utils import get_english_title, translate_genres_to_korean
+
+POOL_PAGE_SIZE = 50  # 보충 1회에 받는 작품 수 (AniList perPage 최대값)
+
+
+class _Pool:
+    def __init__(self, genre, sort_option):
+        # 추천 API의 랜덤 페이지 범위(perPage 5)를 perPage 50 기준으로 환산
+        self.max_page = math.ceil(recommendation_page_range(genre, sort_option) * RECOMMENDATION_PER_PAGE / POOL_PAGE_SIZE)
+        self.items = []           # 응답 형태 그대로 (id, title, genres, ...)
+        self.english = {}         # id -> 번역 전 제목 (번역이 늦은 항목만)
+        self.pages = set()        # 이미 받은 페이지
+        self.created_at = time.monotonic()
+
+
+class RecommendationPool:
+    """프로세스 단위 추천 후보 풀"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools = {}
+        self._flight = SingleFlight()
+        self.max_items = 300
+        self.low_water = 20
+        self.ttl = 3600
+        self.seen_limit = 200
+
+    def init_app(self, app):
+        self.max_items = app.config.get('RECOMMENDATION_POOL_MAX_ITEMS', 300)
+        self.low_water = app.config.get('RECOMMENDATION_POOL_LOW_WATER', 20)
+        self.ttl = app.config.get('RECOMMENDATION_POOL_TTL', 3600)
+        self.seen_limit = app.config.get('RECOMMENDATION_SEEN_LIMIT', 200)
+
+    def size(self):
+        with self._lock:
+            return {(('genre', genre or '-'), ('sort', sort_option)): len(pool.items)
+                    for (genre, sort_option), pool in self._pools.items()}
+
+    def clear(self):
+        with self._lock:
+            self._pools.clear()
+
+    async def sample(self, genre, sort_option, seen, count=RECOMMENDATION_PER_PAGE):
+        """풀에서 seen에 없는 작품 count개를 뽑음 (풀이 비어 있을 때만 AniList를 기다림)
+
+        seen은 세션에 저장된 최근 추천 id 목록이며, 뽑힌 id가 추가된다.
+        """
+        key = (genre, sort_option)
+        with self._lock:
+            pool = self._pools.get(key)
+        if pool is None or not pool.items:
+            metrics.inc('recommendation_pool_total', result='cold')
+            app = current_app._get_current_object()
+            await self._flight.do(key, lambda: background_loop.run(self._refill(app, key)))
+            with self._lock:
+                pool = self._pools.get(key)
+            if pool is None or not pool.items:
+                return []
+        else:
+            metrics.inc('recommendation_pool_total', result='hit')
+
+        seen_set = set(seen)
+        with self._lock:
+            candidates = [item for item in pool.items if item['id'] not in seen_set]
+            if len(candidates) < count:
+                # 풀을 다 봤으면 이 풀의 기록만 지우고 다시 한 바퀴
+                pool_ids = {item['id'] for item in pool.items}
+                seen[:] = [i for i in seen if i not in pool_ids]
+                candidates = list(pool.items)
+            picked = random.sample(candidates, min(count, len(candidates)))
+            needs_refill = (len(candidates) - len(picked) < self.low_water and len(pool.items) < self.max_items
+                            and len(pool.pages) < pool.max_page)
+            expired = time.monotonic() - pool.created_at >= self.ttl
+            late_titles = {item['id']: pool.english[item['id']] for item in picked if item['id'] in pool.english}
+
+        if needs_refill or expired:
+            self._schedule_refill(key, replace=expired)
+        if late_titles:
+            picked = await self._apply_late_titles(pool, picked, late_titles)
+
+        seen.extend(item['id'] for item in picked)
+        del seen[:-self.seen_limit]
+        return picked
+
+    async def _apply_late_titles(self, pool, picked, late_titles):
+        # 보충할 때 번역이 늦었던 제목은 그 사이 워커가 저장했을 수 있으므로 캐시에서 다시 확인
+        found = await translation_cache.aget_many(list(late_titles.values()), 'title')
+        if not found:
+            return picked
+        updated = []
+        with self._lock:
+            for item in picked:
+                korean = found.get(late_titles.get(item['id']))
+                if korean:
+                    item = {**item, 'title': korean}
+                    pool.english.pop(item['id'], None)
+                    pool.items = [item if i['id'] == item['id'] else i for i in pool.items]
+                updated.append(item)
+        return updated
+
+    def _schedule_refill(self, key, replace=False):
+        app = current_app._get_current_object()
+
+        async def refill():
+            try:
+                await self._flight.do(key, lambda: self._refill(app, key, replace))
+            except Exception as e:
+                # 보충 실패 시 기존 풀로 계속 응답
+                print(f"추천 풀 보충 에러 {key}: {e}")
+
+        background_loop.submit(refill())
+
+    async def _refill(self, app, key, replace=False):
+        """AniList 페이지 1개(50개)를 받아 제목 번역 후 풀에 추가 (replace면 풀을 새로 만듦)"""
+        genre, sort_option = key
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None or replace:
+                pool = _Pool(genre, sort_option)
+            fetched = set(pool.pages)
+            max_page = pool.max_page
+
+        query = build_media_page_query(sort_option, genre, per_page=POOL_PAGE_SIZE)
+        with app.app_context():
+            media = []
+            page = None
+            # 마지막 페이지를 넘으면 빈 목록이므로 범위를 줄여 가며 다시 시도
+            for _ in range(3):
+                remaining = [p for p in range(1, max_page + 1) if p not in fetched]
+                if not remaining:
+                    break
+                page = random.choice(remaining)
+                # 로컬 카탈로그 사본이 있으면 AniList 대신 사용
+                media = await run_db(catalog_mirror.browse, genre, sort_option, page=page, per_page=POOL_PAGE_SIZE)
+                if media is None:
+                    data = await anilist_client.query(query, {'page': page}, cache_as='recommendations')
+                    media = data.get('Page', {}).get('media', [])
+                if media:
+                    break
+                max_page = page - 1
+            metrics.inc('recommendation_pool_total', result='refill')
+
+            english_titles = [get_english_title(m) for m in media]
+            korean_titles = await translate_titles_to_korean_official(english_titles, use_verification=False)
+
+        items = []
+        late = {}
+        for anime, english, korean in zip(media, english_titles, korean_titles):
+            items.append({
+                'id': anime.get('id'),
+                'title': korean,
+                'genres': translate_genres_to_korean(anime.get('genres', [])),
+                'episodes': anime.get('episodes'),
+                'coverImage': anime.get('coverImage', {}).get('extraLarge'),
+                'averageScore': anime.get('averageScore')
+            })
+            if korean == english:
+                late[anime.get('id')] = english
+
+        with self._lock:
+            pool.max_page = max(1, min(pool.max_page, max_page))
+            if page is not None:
+                pool.pages.add(page)
+            known = {item['id'] for item in pool.items}
+            pool.items.extend(item for item in items if item['id'] not in known)
+            pool.english.update(late)
+            if pool.items and self._pools.get(key) is not pool:
+                self._pools[key] = pool
+        return len(items)
+
+
+recommendation_pool = RecommendationPool()
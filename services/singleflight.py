@@ -0,0 +1,81 @@
+# services/singleflight.py
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+# 리더가 취소되어 결과가 없을 때 대기자에게 재시도를 알리는 표식
+_RETRY = object()
+
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 호출을 1번의 실행으로 합침
+
+    Flask 요청마다 이벤트 루프/스레드가 다르므로 결과 공유는
+    concurrent.futures.Future로 하고, 각 대기자는 자기 루프에서 기다린다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    async def do(self, key, func):
+        """key로 진행 중인 호출이 있으면 그 결과를, 없으면 func()를 실행"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            result = await _wait_shared(future)
+            if result is _RETRY:
+                return await self.do(key, func)
+            return result
+
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                if self._calls.get(key) is future:
+                    del self._calls[key]
+
+
+def _wait_shared(future):
+    # asyncio.wrap_future는 대기자가 취소되면 공유 Future까지 취소하므로
+    # 대기자마다 별도의 루프 Future로 결과만 복사한다.
+    loop = asyncio.get_running_loop()
+    waiter = loop.create_future()
+
+    def _copy(done):
+        if waiter.done():
+            return
+        if done.cancelled():
+            waiter.set_result(_RETRY)
+        elif done.exception() is not None:
+            waiter.set_exception(done.exception())
+        else:
+            waiter.set_result(done.result())
+
+    def _on_done(done):
+        try:
+            loop.call_soon_threadsafe(_copy, done)
+        except RuntimeError:
+            pass  # 대기하던 요청의 루프가 이미 닫힘
+
+    future.add_done_callback(_on_done)
+    return waiter
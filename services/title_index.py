@@ -0,0 +1,131 @@
+# services/title_index.py
+
+import re
+import time
+import threading
+from datetime import timedelta
+from models import Translation
+
+HANGUL_RE = re.compile('[가-힣]')
+# 갱신 때 마지막으로 읽은 시각보다 이만큼 앞부터 다시 읽음
+# (updated_at을 정한 뒤 늦게 커밋된 행도 놓치지 않도록)
+REFRESH_OVERLAP = timedelta(seconds=10)
+
+
+def _normalize(text):
+    # 대소문자/공백/문장부호 차이는 무시
+    return re.sub(r'[\W_]+', '', (text or '').lower())
+
+
+def _trigrams(text):
+    if len(text) < 3:
+        return {text} if text else set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def is_korean(text):
+    return bool(HANGUL_RE.search(text or ''))
+
+
+class KoreanTitleIndex:
+    """한국어 제목 → 원문(영어/로마자) 제목 역색인 (메모리 trigram)"""
+
+    def __init__(self, min_score=0.6):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._originals = {}   # 정규화된 한국어 제목 -> 원문 제목
+        self._grams = {}       # trigram -> 정규화된 한국어 제목 집합
+        self._watermark = None  # 지금까지 읽은 제목 행 중 가장 늦은 updated_at
+        self._refreshed = 0.0
+        self.min_score = min_score
+        self.refresh_interval = 60
+
+    def init_app(self, app):
+        self.refresh_interval = app.config.get('TITLE_INDEX_REFRESH_INTERVAL', 60)
+        self.clear()
+
+    def _add_locked(self, original, korean):
+        key = _normalize(korean)
+        if not key or key in self._originals:
+            return
+        self._originals[key] = original
+        for gram in _trigrams(key):
+            self._grams.setdefault(gram, set()).add(key)
+
+    def _ensure_loaded(self):
+        # 처음에는 제목 전체, 이후에는 refresh_interval마다 마지막으로 읽은 시점 이후에 저장된 제목만 읽음
+        # (색인은 프로세스별이므로 다른 워커가 번역한 제목은 다음 갱신 때 반영됨)
+        with self._lock:
+            if self._loaded and time.monotonic() - self._refreshed < self.refresh_interval:
+                return
+            watermark = self._watermark if self._loaded else None
+            self._refreshed = time.monotonic()
+        query = Translation.query.with_entities(
+            Translation.original_text, Translation.translated_text, Translation.updated_at
+        ).filter(Translation.type == 'title')
+        if watermark is not None:
+            # 겹쳐서 다시 읽은 제목은 _add_locked에서 무시
+            query = query.filter(Translation.updated_at >= watermark - REFRESH_OVERLAP)
+        rows = query.all()
+        with self._lock:
+            for original, korean, updated_at in rows:
+                self._add_locked(original, korean)
+                if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+                    self._watermark = updated_at
+            self._loaded = True
+
+    def add(self, original, korean):
+        """새로 번역된 제목을 색인에 반영 (아직 로드 전이면 다음 로드 때 DB에서 읽음)"""
+        if not original or not korean:
+            return
+        with self._lock:
+            if self._loaded:
+                self._add_locked(original, korean)
+
+    def lookup(self, query):
+        """한국어 검색어와 맞는 원문 제목 (없으면 None)"""
+        if not is_korean(query):
+            return None
+        self._ensure_loaded()
+        key = _normalize(query)
+        if not key:
+            return None
+
+        with self._lock:
+            # 1. 완전 일치
+            if key in self._originals:
+                return self._originals[key]
+
+            # 2. 검색어를 포함하는 가장 짧은 제목 (부분 입력)
+            if len(key) < 3:
+                candidates = set(self._originals)
+            else:
+                candidates = set()
+                for gram in _trigrams(key):
+                    candidates |= self._grams.get(gram, set())
+            containing = [c for c in candidates if key in c]
+            if containing:
+                return self._originals[min(containing, key=len)]
+
+            # 3. trigram 유사도 (Dice 계수)
+            query_grams = _trigrams(key)
+            best, best_score = None, 0.0
+            for candidate in candidates:
+                grams = _trigrams(candidate)
+                score = 2 * len(query_grams & grams) / (len(query_grams) + len(grams))
+                if score > best_score:
+                    best, best_score = candidate, score
+            if best is not None and best_score >= self.min_score:
+                return self._originals[best]
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._originals.clear()
+            self._grams.clear()
+            self._loaded = False
+            self._watermark = None
+            self._refreshed = 0.0
+
+
+korean_title_index = KoreanTitleIndex()
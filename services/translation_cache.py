@@ -0,0 +1,149 @@
+# services/translation_cache.py
+
+import threading
+from cachetools import TTLCache
+from sqlalchemy import event, inspect
+from extensions import run_db
+from models import Translation
+from services.metrics import metrics
+
+
+class TranslationCache:
+    """Translation 테이블 앞단의 프로세스 내 LRU/TTL 캐시 ((종류, 원문) 단위)"""
+
+    def __init__(self, maxsize=5000, ttl=3600):
+        self._lock = threading.Lock()
+        self._store = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        # 설정값으로 캐시 크기/TTL 재구성
+        maxsize = app.config.get('TRANSLATION_CACHE_SIZE', 5000)
+        ttl = app.config.get('TRANSLATION_CACHE_TTL', 3600)
+        with self._lock:
+            self._store = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def _get_memory(self, key):
+        with self._lock:
+            value = self._store.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        metrics.inc('translation_lookups_total', tier='memory', result='miss' if value is None else 'hit')
+        return value
+
+    def get(self, text, type='general'):
+        """메모리 → DB 순서로 번역 조회 (없으면 None)"""
+        if not text: return None
+
+        value = self._get_memory((type, text))
+        if value is not None:
+            return value
+        with metrics.span('db'):
+            return self._get_db(text, type)
+
+    async def aget(self, text, type='general'):
+        """get()과 같지만 DB 조회는 스레드에서 (이벤트 루프 위의 async 경로용)"""
+        if not text: return None
+
+        value = self._get_memory((type, text))
+        if value is not None:
+            return value
+        with metrics.span('db'):
+            return await run_db(self._get_db, text, type)
+
+    def _get_db(self, text, type):
+        row = Translation.lookup(text, type)
+        metrics.inc('translation_lookups_total', tier='db', result='miss' if row is None else 'hit')
+        if row is None:
+            return None
+        self.set(text, row.translated_text, type)
+        return row.translated_text
+
+    def get_many(self, texts, type='title'):
+        """여러 원문을 한 번에 조회 (메모리 미스만 해시 IN 쿼리 1회)"""
+        found, missing = self._get_many_memory(texts, type)
+        if missing:
+            with metrics.span('db'):
+                found.update(self._get_many_db(missing, type))
+        return found
+
+    async def aget_many(self, texts, type='title'):
+        """get_many()와 같지만 DB 조회는 스레드에서 (이벤트 루프 위의 async 경로용)"""
+        found, missing = self._get_many_memory(texts, type)
+        if missing:
+            with metrics.span('db'):
+                found.update(await run_db(self._get_many_db, missing, type))
+        return found
+
+    def _get_many_memory(self, texts, type):
+        # (메모리에서 찾은 {원문: 번역}, 못 찾은 {해시: 원문})
+        found = {}
+        missing = {}
+        for text in dict.fromkeys(t for t in texts if t):
+            value = self._get_memory((type, text))
+            if value is None:
+                missing[Translation.hash_text(text)] = text
+            else:
+                found[text] = value
+        return found, missing
+
+    def _get_many_db(self, missing, type):
+        rows = Translation.query.filter(
+            Translation.text_hash.in_(list(missing)), Translation.type == type
+        ).order_by(*Translation.newest_first()).all()
+        found = {}
+        for row in rows:
+            text = missing.get(row.text_hash)
+            if text is not None and text not in found:
+                found[text] = row.translated_text
+                self.set(text, row.translated_text, type)
+        # 모델별 중복 행은 가장 최근 것만 사용하고, 행 수가 아니라 찾은 원문 수로 집계
+        metrics.inc('translation_lookups_total', len(found), tier='db', result='hit')
+        metrics.inc('translation_lookups_total', len(missing) - len(found), tier='db', result='miss')
+        return found
+
+    def set(self, text, translated_text, type='general'):
+        if not text or translated_text is None: return
+        with self._lock:
+            self._store[(type, text)] = translated_text
+
+    def invalidate(self, text, type='general'):
+        with self._lock:
+            self._store.pop((type, text), None)
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._store),
+                'maxsize': self._store.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total) if total else 0.0,
+            }
+
+
+translation_cache = TranslationCache()
+
+
+# Translation 행이 쓰이거나 수정/삭제되면 메모리 캐시 무효화
+@event.listens_for(Translation, 'after_insert')
+@event.listens_for(Translation, 'after_update')
+@event.listens_for(Translation, 'after_delete')
+def _invalidate_on_write(mapper, connection, target):
+    translation_cache.invalidate(target.original_text, target.type)
+    # 원문/종류 자체가 바뀐 경우 이전 키도 제거
+    attrs = inspect(target).attrs
+    for old_text in attrs.original_text.history.deleted:
+        translation_cache.invalidate(old_text, target.type)
+    for old_type in attrs.type.history.deleted:
+        translation_cache.invalidate(target.original_text, old_type)
@@ -0,0 +1,174 @@
+# services/translation_worker.py
+
+import time
+import asyncio
+import threading
+from models import DEFAULT_TRANSLATION_MODEL
+from services.background_loop import background_loop
+
+
+class TranslationWorker:
+    """요청 경로에서 놓친 번역을 모아서 백그라운드로 처리 (write-behind)
+
+    - enqueue(): 번역이 필요한 원문을 큐에 넣음 (요청은 원문을 바로 반환)
+    - enqueue_write(): 이미 번역된 결과의 DB 저장만 맡김
+    워커는 공유 루프에서 큐를 모아 Gemini 호출 속도를 제한하고,
+    결과는 한 번의 트랜잭션으로 Translation 테이블에 저장한다.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._lock = threading.Lock()
+        self._queue = asyncio.Queue()
+        self._pending = set()
+        self._task = None
+        self._last_call = 0.0
+        self.enabled = False
+        self.batch_size = 20
+        self.flush_interval = 0.5
+        self.rate = 2.0
+
+    def init_app(self, app):
+        self._app = app
+        self.enabled = app.config.get('TRANSLATION_WORKER_ENABLED', True)
+        self.batch_size = app.config.get('TRANSLATION_WORKER_BATCH_SIZE', 20)
+        self.flush_interval = app.config.get('TRANSLATION_WORKER_FLUSH_INTERVAL', 0.5)
+        self.rate = app.config.get('TRANSLATION_WORKER_RATE', 2.0)
+        background_loop.on_shutdown(self.aclose)
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _put(self, item):
+        loop = background_loop.loop
+        with self._lock:
+            if self._task is None or self._task.done():
+                self._task = asyncio.run_coroutine_threadsafe(self._run(), loop)
+        loop.call_soon_threadsafe(self._queue.put_nowait, item)
+
+    def enqueue(self, text, type='title'):
+        """번역 요청 (같은 원문이 이미 대기 중이면 무시)"""
+        if not self.enabled or not text:
+            return
+        with self._lock:
+            if (text, type) in self._pending:
+                return
+            self._pending.add((text, type))
+        self._put(('translate', text, type, None, None))
+
+    def enqueue_write(self, text, translated, type='general', model=None):
+        """번역 결과 DB 저장만 요청 (메모리 캐시는 호출한 쪽에서 이미 반영, model: 응답한 모델)"""
+        if not self.enabled or not text:
+            return
+        self._put(('write', text, type, translated, model))
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            try:
+                await self._process(batch)
+            except Exception as e:
+                print(f"번역 워커 에러: {e}")
+            finally:
+                with self._lock:
+                    for kind, text, type, _, _ in batch:
+                        if kind == 'translate':
+                            self._pending.discard((text, type))
+
+    async def _collect(self):
+        # 첫 항목이 올 때까지 기다린 뒤 flush_interval 동안 batch_size까지 모음
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _throttle(self):
+        # Gemini 호출 간 최소 간격 유지 (초당 rate회)
+        wait = self._last_call + 1.0 / self.rate - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._last_call = time.monotonic()
+
+    async def _process(self, batch):
+        # 순환 import 방지
+        from services.gemini_service import _generate_titles_batch, _generate_translation
+
+        writes = {}  # (종류, 모델) -> {원문: 번역}
+        titles, generals, verifies = [], [], []
+        for kind, text, type, translated, model in batch:
+            if kind == 'write':
+                writes.setdefault((type, model), {})[text] = translated
+            elif type == 'title':
+                titles.append(text)
+            elif type == 'title_verify':
+                verifies.append(text)
+            else:
+                generals.append((text, type))
+
+        if titles:
+            await self._throttle()
+            try:
+                translated, model = await _generate_titles_batch(titles)
+                writes.setdefault(('title', model), {}).update(translated)
+            except Exception as e:
+                print(f"번역 워커 제목 배치 에러: {e}")
+
+        for text, type in generals:
+            await self._throttle()
+            try:
+                result, _, model = await _generate_translation(text, type, False)
+                if result:
+                    writes.setdefault((type, model), {})[text] = result
+            except Exception as e:
+                print(f"번역 워커 번역 에러: {e}")
+
+        for text in verifies:
+            await self._throttle()
+            try:
+                result, agreed, model = await _generate_translation(text, 'title', True)
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._apply_verification, text, result, agreed, model)
+            except Exception as e:
+                print(f"번역 워커 검증 에러: {e}")
+
+        if writes:
+            # DB 쓰기는 공유 루프를 막지 않도록 스레드에서 한 번에 처리
+            await asyncio.get_running_loop().run_in_executor(None, self._flush, writes)
+
+    def _flush(self, writes):
+        from services.gemini_service import _bulk_store_translations
+
+        with self._app.app_context():
+            for (type, model), translated in writes.items():
+                _bulk_store_translations(translated, type, model or DEFAULT_TRANSLATION_MODEL)
+
+    def _apply_verification(self, text, translated, agreed, model):
+        from services.gemini_service import _apply_title_verification
+
+        with self._app.app_context():
+            _apply_title_verification(text, translated, agreed, model)
+
+    async def aclose(self):
+        # 종료 전 남은 DB 쓰기만 저장 (번역 요청은 버림)
+        writes = {}
+        while not self._queue.empty():
+            kind, text, type, translated, model = self._queue.get_nowait()
+            if kind == 'write':
+                writes.setdefault((type, model), {})[text] = translated
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._queue = asyncio.Queue()
+        if writes and self._app is not None:
+            self._flush(writes)
+
+
+translation_worker = TranslationWorker()
@@ -0,0 +1,183 @@
+# services/upstream_governor.py
+# AniList/Gemini 공통 호출 관리: 토큰 버킷(분당 한도) + 재시도(지터) + 서킷 브레이커
+
+import time
+import asyncio
+import threading
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+
+class UpstreamUnavailable(Exception):
+    """서킷이 열려 있거나 한도 대기가 너무 길어서 호출하지 않고 바로 실패"""
+
+    def __init__(self, name, message):
+        super().__init__(f'{name}: {message}')
+        self.name = name
+
+
+class TokenBucket:
+    """분당 rate개 토큰, 최대 burst개까지 쌓임 (어느 스레드/루프에서든 사용 가능)"""
+
+    def __init__(self, rate_per_minute, burst):
+        self._lock = threading.Lock()
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def reserve(self):
+        """토큰 1개를 예약하고 기다려야 하는 시간(초)을 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def available(self):
+        """지금 기다리지 않고 쓸 수 있는 토큰이 있는지 (예약하지 않음)"""
+        with self._lock:
+            return self._tokens + (time.monotonic() - self._updated) * self.rate >= 1
+
+    def cancel(self):
+        # 너무 오래 기다려야 해서 포기한 예약 반납
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1)
+
+    def drain(self, seconds):
+        # 429 응답(Retry-After) 등으로 잠시 호출을 멈춰야 할 때
+        with self._lock:
+            self._tokens = min(self._tokens, -seconds * self.rate)
+            self._updated = time.monotonic()
+
+
+class CircuitBreaker:
+    """연속 실패가 threshold번이면 reset_timeout초 동안 열림 → 이후 1회 시험 호출"""
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, threshold=5, reset_timeout=30.0):
+        self._lock = threading.Lock()
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """지금 호출해도 되는지 (열린 상태면 False, 반열림이면 시험 호출 1개만 True)"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+
+    def abort(self):
+        # 시험 호출이 업스트림에 닿기 전에 포기한 경우 다음 호출이 다시 시험하도록
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.OPEN
+
+    def failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class UpstreamGovernor:
+    """업스트림 하나(AniList 또는 Gemini)로 나가는 모든 호출이 거치는 관문"""
+
+    def __init__(self, name, config_prefix, rate_per_minute=60, burst=10, max_wait=10.0):
+        self.name = name
+        self.config_prefix = config_prefix
+        self.bucket = TokenBucket(rate_per_minute, burst)
+        self.breaker = CircuitBreaker()
+        self.max_wait = max_wait
+        self.attempts = 3
+
+    def init_app(self, app):
+        prefix = self.config_prefix
+        self.bucket = TokenBucket(
+            app.config.get(f'{prefix}_RATE_LIMIT', self.bucket.rate * 60),
+            app.config.get(f'{prefix}_BURST', self.bucket.capacity),
+        )
+        self.breaker = CircuitBreaker(
+            app.config.get('UPSTREAM_BREAKER_THRESHOLD', 5),
+            app.config.get('UPSTREAM_BREAKER_RESET', 30.0),
+        )
+        self.max_wait = app.config.get(f'{prefix}_MAX_WAIT', self.max_wait)
+        self.attempts = app.config.get('UPSTREAM_RETRY_ATTEMPTS', 3)
+
+    @property
+    def healthy(self):
+        return self.breaker.state != CircuitBreaker.OPEN
+
+    @property
+    def has_token(self):
+        return self.bucket.available()
+
+    async def _acquire(self, deadline=None):
+        # deadline: 호출한 쪽의 마감 시각 (time.monotonic 기준) - 그 전에 토큰이 안 생기면 기다리지 않음
+        wait = self.bucket.reserve()
+        limit = self.max_wait if deadline is None else min(self.max_wait, deadline - time.monotonic())
+        if wait > limit:
+            self.bucket.cancel()
+            raise UpstreamUnavailable(self.name, f'요청 한도 대기 {wait:.1f}초 (허용 {max(limit, 0):.1f}초)')
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def call(self, func, is_transient, deadline=None):
+        """func()를 한도/재시도/서킷 브레이커 아래에서 실행
+
+        is_transient(e)가 True인 에러(시간 초과, 429, 5xx)만 재시도하고 실패로 센다.
+        서킷이 열려 있거나 deadline(time.monotonic 기준) 전에 한도 토큰이 안 생기면
+        호출하지 않고 UpstreamUnavailable을 바로 던진다.
+        """
+        if not self.breaker.allow():
+            raise UpstreamUnavailable(self.name, '일시적으로 호출 중단 (서킷 열림)')
+
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(self.attempts),
+            wait=wait_random_exponential(multiplier=0.5, max=8),
+            retry=retry_if_exception(is_transient),
+            reraise=True,
+        )
+        try:
+            async for attempt in retrying:
+                with attempt:
+                    await self._acquire(deadline)
+                    result = await func()
+        except (UpstreamUnavailable, asyncio.CancelledError):
+            self.breaker.abort()
+            raise
+        except Exception as e:
+            if is_transient(e):
+                self.breaker.failure()
+            else:
+                # 404 같은 정상 응답성 에러는 업스트림 상태와 무관
+                self.breaker.success()
+            raise
+        self.breaker.success()
+        return result
+
+
+anilist_governor = UpstreamGovernor('AniList', 'ANILIST', rate_per_minute=90, burst=10)
+gemini_governor = UpstreamGovernor('Gemini', 'GEMINI', rate_per_minute=60, burst=10, max_wait=4.0)
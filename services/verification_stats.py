@@ -0,0 +1,89 @@
+# services/verification_stats.py
+
+import threading
+from datetime import datetime
+from cachetools import TTLCache
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from extensions import db, run_db
+from models import Translation, TitleVerification
+
+
+class VerificationStats:
+    """제목별 검증 후보 일치율 기록 (안정적인 제목은 재검증 생략)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._store = TTLCache(maxsize=5000, ttl=3600)
+        self.stable_rate = 0.8
+        self.max_samples = 3
+
+    def init_app(self, app):
+        self.stable_rate = app.config.get('VERIFY_STABLE_RATE', 0.8)
+        self.max_samples = app.config.get('VERIFY_MAX_SAMPLES', 3)
+        with self._lock:
+            self._store = TTLCache(
+                maxsize=app.config.get('TRANSLATION_CACHE_SIZE', 5000),
+                ttl=app.config.get('TRANSLATION_CACHE_TTL', 3600),
+            )
+
+    def _get_memory(self, text):
+        with self._lock:
+            return self._store.get(text)
+
+    def get(self, text):
+        """(검증 횟수, 일치 횟수)"""
+        value = self._get_memory(text)
+        if value is not None:
+            return value
+
+        row = db.session.get(TitleVerification, Translation.hash_text(text))
+        value = (row.samples, row.agreements) if row else (0, 0)
+        with self._lock:
+            self._store[text] = value
+        return value
+
+    def needs_verification(self, text):
+        """아직 검증 안 했거나, 불일치 이력이 있고 최대 횟수 전이면 True"""
+        return self._needs(*self.get(text))
+
+    async def aneeds_verification(self, text):
+        """needs_verification()과 같지만 메모리에 없을 때만 스레드에서 DB 조회 (이벤트 루프용)"""
+        value = self._get_memory(text)
+        if value is None:
+            value = await run_db(self.get, text)
+        return self._needs(*value)
+
+    def _needs(self, samples, agreements):
+        if samples == 0:
+            return True
+        if samples >= self.max_samples:
+            return False
+        return agreements / samples < self.stable_rate
+
+    def record(self, text, agreed):
+        """검증 1회 결과 누적 (UPSERT)"""
+        stmt = sqlite_insert(TitleVerification).values(
+            text_hash=Translation.hash_text(text),
+            samples=1,
+            agreements=1 if agreed else 0,
+            updated_at=datetime.utcnow(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['text_hash'],
+            set_={
+                'samples': TitleVerification.samples + 1,
+                'agreements': TitleVerification.agreements + (1 if agreed else 0),
+                'updated_at': datetime.utcnow(),
+            },
+        )
+        try:
+            db.session.execute(stmt)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"검증 기록 저장 에러: {e}")
+        with self._lock:
+            self._store.pop(text, None)
+
+
+verification_stats = VerificationStats()
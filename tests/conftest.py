@@ -0,0 +1,36 @@
+# tests/conftest.py
+# 임시 SQLite DB/캐시로 앱을 만드는 공용 픽스처 (instance/reviews.db는 건드리지 않음)
+
+import pytest
+
+from app import create_app
+from config import Config
+
+
+@pytest.fixture
+def test_config(tmp_path, monkeypatch):
+    monkeypatch.delenv('GEMINI_API_KEY', raising=False)
+
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + str(tmp_path / 'reviews.db')
+        AUTO_MIGRATE = True
+        TRANSLATION_WORKER_ENABLED = False  # 번역 저장을 큐 없이 바로 확인
+        GEMINI_API_KEY = None
+
+    return TestConfig
+
+
+@pytest.fixture
+def app(test_config):
+    app = create_app(config_class=test_config)
+    yield app
+
+    from extensions import db
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,188 @@
+# tests/test_asgi.py
+# asgi.py는 Flask의 디스패치 순서를 옮겨 왔으므로 고정한 Flask 버전과 실제 요청 흐름을 확인
+
+import os
+import json
+import asyncio
+import threading
+from importlib.metadata import version
+
+import pytest
+from flask import Response, abort, stream_with_context
+
+from app import create_app
+from asgi import AsyncFlask, AsgiAdapter
+from services.background_loop import background_loop
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _pinned(package):
+    with open(os.path.join(ROOT, 'requirements.txt')) as f:
+        for line in f:
+            name, _, pinned = line.strip().partition('==')
+            if name.lower() == package.lower():
+                return pinned
+    raise AssertionError(f'{package}가 requirements.txt에 없습니다.')
+
+
+def test_flask_version_is_pinned():
+    # 버전이 바뀌면 AsyncFlask.dispatch_request_async/full_dispatch_request_async를 원본과 다시 비교할 것
+    assert version('Flask') == _pinned('Flask')
+
+
+@pytest.fixture
+def asgi_app(test_config):
+    flask_app = create_app(AsyncFlask, config_class=test_config)
+    flask_app.config['PROPAGATE_EXCEPTIONS'] = False  # 배포처럼 뷰 예외를 500 응답으로
+    seen = {}
+
+    @flask_app.route('/test/async')
+    async def async_view():
+        seen['async_loop'] = asyncio.get_running_loop()
+        await asyncio.sleep(0)
+        return {'ok': True}
+
+    @flask_app.route('/test/sync')
+    def sync_view():
+        seen['sync_thread'] = threading.current_thread()
+        return {'ok': True}
+
+    @flask_app.route('/test/stream')
+    def stream_view():
+        def generate():
+            for i in range(3):
+                yield json.dumps({'chunk': i}) + '\n'
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    @flask_app.route('/test/error')
+    async def error_view():
+        raise RuntimeError('boom')
+
+    @flask_app.route('/test/abort')
+    async def abort_view():
+        abort(403)
+
+    # 앞선 테스트가 띄운 전용 루프가 있으면 정리 (lifespan에서 서버 루프를 붙임)
+    background_loop.shutdown()
+    yield AsgiAdapter(flask_app), seen
+    background_loop.shutdown()
+
+    from extensions import db
+    with flask_app.app_context():
+        db.engine.dispose()
+
+
+async def _request(asgi, method, path, body=b'', headers=(), query=b''):
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'root_path': '', 'query_string': query,
+        'http_version': '1.1', 'scheme': 'http', 'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+        'headers': [(k.encode('latin1'), v.encode('latin1')) for k, v in headers],
+    }
+    await asgi(scope, receive, send)
+    assert sent[0]['type'] == 'http.response.start'
+    assert sent[-1] == {'type': 'http.response.body', 'body': b'', 'more_body': False}
+    response_headers = {k.decode('latin1'): v.decode('latin1') for k, v in sent[0]['headers']}
+    return sent[0]['status'], response_headers, [m['body'] for m in sent[1:-1]]
+
+
+def _serve(asgi, scenario):
+    """lifespan 시작 → scenario(루프) → lifespan 종료"""
+    async def main():
+        loop = asyncio.get_running_loop()
+        inbox, outbox = asyncio.Queue(), asyncio.Queue()
+        lifespan = asyncio.ensure_future(asgi({'type': 'lifespan'}, inbox.get, outbox.put))
+        await inbox.put({'type': 'lifespan.startup'})
+        assert (await outbox.get())['type'] == 'lifespan.startup.complete'
+        assert background_loop.attached and background_loop.loop is loop
+        try:
+            return await scenario(loop)
+        finally:
+            await inbox.put({'type': 'lifespan.shutdown'})
+            assert (await outbox.get())['type'] == 'lifespan.shutdown.complete'
+            await lifespan
+            assert not background_loop.attached
+
+    return asyncio.run(main())
+
+
+def test_async_view_runs_on_server_loop(asgi_app):
+    asgi, seen = asgi_app
+
+    async def scenario(loop):
+        status, headers, body = await _request(asgi, 'GET', '/test/async')
+        assert status == 200
+        assert json.loads(b''.join(body)) == {'ok': True}
+        assert seen['async_loop'] is loop
+
+    _serve(asgi, scenario)
+
+
+def test_sync_view_runs_in_thread(asgi_app):
+    asgi, seen = asgi_app
+
+    async def scenario(loop):
+        status, _, _ = await _request(asgi, 'GET', '/test/sync')
+        assert status == 200
+        assert seen['sync_thread'] is not threading.current_thread()
+
+    _serve(asgi, scenario)
+
+
+def test_request_body_and_db_round_trip(asgi_app):
+    asgi, _ = asgi_app
+
+    async def scenario(loop):
+        body = json.dumps({'animeId': 7, 'rating': 90, 'text': '좋아요'}).encode('utf-8')
+        status, _, _ = await _request(asgi, 'POST', '/api/review', body=body, headers=[
+            ('content-type', 'application/json'), ('content-length', str(len(body))),
+        ])
+        assert status == 201
+
+        status, headers, chunks = await _request(asgi, 'GET', '/api/reviews/7', query=b'limit=5')
+        assert status == 200
+        data = json.loads(b''.join(chunks))['data']
+        assert [r['text'] for r in data['reviews']] == ['좋아요']
+
+        # after_request(http_cache)도 ASGI 경로에서 실행됨
+        status, _, chunks = await _request(asgi, 'GET', '/api/reviews/7', query=b'limit=5',
+                                           headers=[('if-none-match', headers['etag'])])
+        assert status == 304
+        assert b''.join(chunks) == b''
+
+    _serve(asgi, scenario)
+
+
+def test_streaming_response_is_sent_in_chunks(asgi_app):
+    asgi, _ = asgi_app
+
+    async def scenario(loop):
+        status, headers, chunks = await _request(asgi, 'GET', '/test/stream')
+        assert status == 200
+        assert headers['content-type'] == 'application/x-ndjson'
+        assert [json.loads(c) for c in chunks] == [{'chunk': 0}, {'chunk': 1}, {'chunk': 2}]
+
+    _serve(asgi, scenario)
+
+
+def test_errors_are_handled_like_wsgi(asgi_app):
+    asgi, _ = asgi_app
+
+    async def scenario(loop):
+        assert (await _request(asgi, 'GET', '/no/such/path'))[0] == 404
+        assert (await _request(asgi, 'POST', '/test/async'))[0] == 405
+        assert (await _request(asgi, 'GET', '/test/abort'))[0] == 403
+        status, headers, _ = await _request(asgi, 'GET', '/test/error')
+        assert status == 500
+        assert headers['cache-control'] == 'no-store'
+
+    _serve(asgi, scenario)
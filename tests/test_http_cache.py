@@ -0,0 +1,95 @@
+# tests/test_http_cache.py
+# ETag/304, 에러 응답 no-store, 큰 응답 압축
+
+import gzip
+
+import brotli
+
+
+def _post_review(client, anime_id, i):
+    response = client.post('/api/review', json={
+        'animeId': anime_id, 'rating': i % 101, 'text': f'리뷰 본문 {i} ' * 10, 'username': f'user{i}',
+    })
+    assert response.status_code == 201
+
+
+def test_reviews_etag_and_not_modified(client):
+    _post_review(client, 1, 1)
+
+    first = client.get('/api/reviews/1')
+    assert first.status_code == 200
+    assert first.headers['ETag'].startswith('W/')
+    assert first.headers['Cache-Control'] == 'no-cache'
+
+    second = client.get('/api/reviews/1', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304
+    assert second.get_data() == b''
+
+
+def test_etag_changes_when_reviews_change(client):
+    _post_review(client, 1, 1)
+    etag = client.get('/api/reviews/1').headers['ETag']
+
+    _post_review(client, 1, 2)
+    response = client.get('/api/reviews/1', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_error_response_is_not_cached(client):
+    response = client.get('/api/reviews/1?cursor=not-a-cursor')
+    assert response.status_code == 400
+    assert response.headers['Cache-Control'] == 'no-store'
+    assert 'ETag' not in response.headers
+
+    response = client.post('/api/review', json={'animeId': 1, 'rating': 101})
+    assert response.status_code == 400
+    assert response.headers['Cache-Control'] == 'no-store'
+
+
+def test_large_response_is_gzipped(client):
+    for i in range(20):
+        _post_review(client, 1, i)
+
+    plain = client.get('/api/reviews/1?limit=20')
+    assert 'Content-Encoding' not in plain.headers
+    assert len(plain.get_data()) >= 1024
+
+    compressed = client.get('/api/reviews/1?limit=20', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert gzip.decompress(compressed.get_data()) == plain.get_data()
+    # 압축 전 본문 기준 ETag라 인코딩과 관계없이 같음
+    assert compressed.headers['ETag'] == plain.headers['ETag']
+
+
+def test_brotli_is_preferred(client):
+    for i in range(20):
+        _post_review(client, 1, i)
+
+    plain = client.get('/api/reviews/1?limit=20')
+    compressed = client.get('/api/reviews/1?limit=20', headers={'Accept-Encoding': 'gzip, br'})
+    assert compressed.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(compressed.get_data()) == plain.get_data()
+
+    index = client.get('/', headers={'Accept-Encoding': 'gzip, br'})
+    assert index.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(index.get_data()) == client.get('/').get_data()
+
+
+def test_small_response_is_not_compressed(client):
+    response = client.get('/api/reviews/1', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_index_is_served_precompressed(client):
+    plain = client.get('/')
+    assert plain.status_code == 200
+
+    compressed = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.get_data()) == plain.get_data()
+
+    cached = client.get('/', headers={'If-None-Match': plain.headers['ETag']})
+    assert cached.status_code == 304
@@ -0,0 +1,142 @@
+# tests/test_model_router.py
+# 마감 시간 초과 → 원문 응답, 주 모델 실패 → 백업 모델, 느린 주 모델 → 헤징
+
+import time
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services.model_router import ModelRouter, DeadlineExceeded
+from services.upstream_governor import TokenBucket, UpstreamUnavailable, gemini_governor
+
+
+def _router(monkeypatch, behaviours, deadline=1.0, hedge_delay=0.05, deadlines=None):
+    """모델별 동작(지연 초 또는 예외)으로 gemini_client.generate_content를 대신하는 라우터"""
+    from services.gemini_client import gemini_client
+
+    calls = []
+    monkeypatch.setattr(gemini_governor, 'bucket', TokenBucket(6000, 10))
+
+    async def generate_content(model, contents, config=None, branch='fast', deadline=None):
+        calls.append(model)
+        if deadlines is not None:
+            deadlines.append(deadline)
+        behaviour = behaviours[model]
+        if isinstance(behaviour, Exception):
+            raise behaviour
+        await asyncio.sleep(behaviour)
+        return SimpleNamespace(text=f'{model} 응답')
+
+    monkeypatch.setattr(gemini_client, 'generate_content', generate_content)
+    router = ModelRouter()
+    router.routes = {'fast': list(behaviours)}
+    router.deadlines = {'fast': deadline}
+    router.hedge_default_delay = hedge_delay
+    return router, calls
+
+
+def test_primary_answers_without_hedge(monkeypatch):
+    router, calls = _router(monkeypatch, {'primary': 0.0, 'backup': 0.0})
+    response, model = asyncio.run(router.generate('fast', 'prompt'))
+    assert (response.text, model) == ('primary 응답', 'primary')
+    assert calls == ['primary']
+
+
+def test_primary_error_falls_back_to_backup(monkeypatch):
+    router, calls = _router(monkeypatch, {'primary': RuntimeError('503'), 'backup': 0.0})
+    response, model = asyncio.run(router.generate('fast', 'prompt'))
+    assert model == 'backup'
+    assert calls == ['primary', 'backup']
+
+
+def test_slow_primary_is_hedged(monkeypatch):
+    router, calls = _router(monkeypatch, {'primary': 0.5, 'backup': 0.0})
+    response, model = asyncio.run(router.generate('fast', 'prompt'))
+    assert model == 'backup'
+    assert calls == ['primary', 'backup']
+
+
+def test_no_hedge_without_rate_limit_token(monkeypatch):
+    router, calls = _router(monkeypatch, {'primary': 0.2, 'backup': 0.0})
+    bucket = TokenBucket(60, 1)
+    bucket.reserve()
+    monkeypatch.setattr(gemini_governor, 'bucket', bucket)
+
+    response, model = asyncio.run(router.generate('fast', 'prompt'))
+    assert model == 'primary'
+    assert calls == ['primary']
+
+
+def test_rate_limit_error_is_not_retried_on_backup(monkeypatch):
+    router, calls = _router(monkeypatch, {'primary': UpstreamUnavailable('Gemini', '한도'), 'backup': 0.0})
+    with pytest.raises(UpstreamUnavailable):
+        asyncio.run(router.generate('fast', 'prompt'))
+    assert calls == ['primary']
+
+
+def test_deadline_is_passed_to_client(monkeypatch):
+    deadlines = []
+    router, _ = _router(monkeypatch, {'primary': 0.0}, deadline=3.0, deadlines=deadlines)
+    started = time.monotonic()
+    asyncio.run(router.generate('fast', 'prompt'))
+    assert started + 3.0 <= deadlines[0] <= time.monotonic() + 3.0
+
+
+def test_deadline_raises(monkeypatch):
+    router, _ = _router(monkeypatch, {'primary': 1.0, 'backup': 1.0}, deadline=0.2)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        with pytest.raises(DeadlineExceeded):
+            await router.generate('fast', 'prompt')
+        return loop.time() - started
+
+    assert asyncio.run(main()) < 0.5
+
+
+def test_deadline_returns_original_text(app, monkeypatch):
+    # 번역이 마감 시간을 넘기면 원문으로 응답하고, HTTP 캐시에 오래 남지 않도록 표시 (DB에도 저장 안 함)
+    from flask import g
+    from services.gemini_client import gemini_client
+    from services.gemini_service import get_verified_translation
+    from services.model_router import model_router
+    from services.translation_cache import translation_cache
+
+    async def slow(model, contents, config=None, branch='fast', deadline=None):
+        await asyncio.sleep(1.0)
+
+    monkeypatch.setattr(gemini_client, 'api_key', 'test-key')
+    monkeypatch.setattr(gemini_client, 'generate_content', slow)
+    monkeypatch.setitem(model_router.deadlines, 'fast', 0.1)
+
+    with app.test_request_context('/'):
+        assert asyncio.run(get_verified_translation('Frieren', 'title', False)) == 'Frieren'
+        assert g.partial_translation is True
+        assert translation_cache.get('Frieren', 'title') is None
+
+
+def test_rate_limited_translations_fail_fast(app, monkeypatch):
+    # 분당 한도를 넘은 번역은 마감 시간까지 토큰을 기다리지 않고 바로 원문으로 응답
+    from services.gemini_client import gemini_client
+    from services.gemini_service import get_verified_translation
+
+    async def generate_once(model, contents, config):
+        return SimpleNamespace(text='한글 ' + contents.split("'")[1])
+
+    monkeypatch.setattr(gemini_client, 'api_key', 'test-key')
+    monkeypatch.setattr(gemini_client, '_generate_once', generate_once)
+    monkeypatch.setattr(gemini_governor, 'bucket', TokenBucket(6, 2))  # 다음 토큰은 10초 뒤 (마감 6초)
+
+    titles = [f'Title {i}' for i in range(5)]
+
+    async def main():
+        return await asyncio.gather(*[get_verified_translation(t, 'title', False) for t in titles])
+
+    started = time.monotonic()
+    with app.app_context():
+        results = asyncio.run(main())
+    assert time.monotonic() - started < 2.0
+    assert all(r in (t, '한글 ' + t) for t, r in zip(titles, results))
+    assert sum(r != t for t, r in zip(titles, results)) == 2  # 버킷에 있던 토큰 2개만큼만 번역
@@ -0,0 +1,17 @@
+# tests/test_multiprocess_writes.py
+# 멀티 워커 프로필로 여러 프로세스가 동시에 쓸 때 잠금 에러/유실이 없는지 (bench/multiprocess_writes.py 실행)
+
+import os
+import sys
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_concurrent_writes_from_processes():
+    env = {k: v for k, v in os.environ.items() if k not in ('DATABASE_URL', 'CACHE_DIR', 'GEMINI_API_KEY')}
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT, 'bench', 'multiprocess_writes.py'), '--processes', '3', '--reviews', '20'],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,134 @@
+# tests/test_singleflight.py
+# 같은 키의 동시 호출 합치기 (같은 루프 / 요청마다 다른 루프)
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from services.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'result'
+
+    async def main():
+        return await asyncio.gather(*[flight.do('key', work) for _ in range(10)])
+
+    assert asyncio.run(main()) == ['result'] * 10
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    calls = []
+
+    async def work(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    async def main():
+        return await asyncio.gather(*[flight.do(k, lambda k=k: work(k)) for k in ('a', 'b', 'a')])
+
+    assert asyncio.run(main()) == ['a', 'b', 'a']
+    assert sorted(calls) == ['a', 'b']
+
+
+def test_error_is_shared_with_waiters():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.02)
+        raise ValueError('boom')
+
+    async def main():
+        return await asyncio.gather(*[flight.do('key', fail) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.in_flight() == 0
+
+
+def test_calls_from_other_event_loops_are_coalesced():
+    # Flask WSGI 모드처럼 요청(스레드)마다 이벤트 루프가 다른 경우
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+    results = []
+
+    async def work():
+        calls.append(1)
+        started.set()
+        await asyncio.sleep(0.1)
+        return 'shared'
+
+    def request():
+        results.append(asyncio.run(flight.do('key', work)))
+
+    leader = threading.Thread(target=request)
+    leader.start()
+    started.wait(1)
+    followers = [threading.Thread(target=request) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader] + followers:
+        thread.join()
+
+    assert results == ['shared'] * 5
+    assert len(calls) == 1
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    """model_router.generate 대신 호출을 기록하고 '한글 <원문>'을 돌려줌"""
+    from services.gemini_client import gemini_client
+    from services.model_router import model_router
+
+    calls = []
+
+    async def generate(task, contents, config=None):
+        calls.append(task)
+        await asyncio.sleep(0.05)
+        text = contents.split("'")[1] if "'" in contents else contents
+        if task == 'verified':
+            candidate = SimpleNamespace(content=SimpleNamespace(parts=[SimpleNamespace(text=f'한글 {text}')]))
+            return SimpleNamespace(text=f'한글 {text}', candidates=[candidate, candidate]), 'test-model'
+        return SimpleNamespace(text=f'한글 {text}', candidates=None), 'test-model'
+
+    monkeypatch.setattr(gemini_client, 'api_key', 'test-key')
+    monkeypatch.setattr(model_router, 'generate', generate)
+    return calls
+
+
+def test_concurrent_title_requests_call_gemini_once(app, fake_gemini):
+    from services.gemini_service import get_verified_translation
+
+    async def main():
+        return await asyncio.gather(*[get_verified_translation('Frieren', 'title', False) for _ in range(5)])
+
+    with app.app_context():
+        assert asyncio.run(main()) == ['한글 Frieren'] * 5
+    assert fake_gemini == ['fast']
+
+
+def test_verified_request_does_not_join_fast_flight(app, fake_gemini):
+    from services.gemini_service import get_verified_translation
+
+    async def main():
+        return await asyncio.gather(
+            get_verified_translation('Frieren', 'title', False),
+            get_verified_translation('Frieren', 'title', True),
+        )
+
+    with app.app_context():
+        asyncio.run(main())
+    assert sorted(fake_gemini) == ['fast', 'verified']
@@ -0,0 +1,73 @@
+# tests/test_translation_store.py
+# 같은 원문이 모델별로 여러 줄 저장돼도 조회는 항상 가장 최근 번역, 검증 교정은 한 줄만 남김
+
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import Translation
+from services.gemini_service import _apply_title_verification, _bulk_store_translations
+from services.translation_cache import translation_cache
+
+
+def _add(text, translated, model, age_minutes, type='title'):
+    db.session.add(Translation(
+        original_text=text, translated_text=translated, type=type, model=model,
+        updated_at=datetime.utcnow() - timedelta(minutes=age_minutes),
+    ))
+    db.session.commit()
+
+
+def _rows(text, type='title'):
+    return Translation.query.filter_by(text_hash=Translation.hash_text(text), type=type).all()
+
+
+def test_lookups_return_newest_row_across_models(app):
+    with app.app_context():
+        translation_cache.clear()
+        _add('Frieren', '예전 번역', 'model-a', age_minutes=10)
+        _add('Frieren', '최신 번역', 'model-b', age_minutes=1)
+        _add('Bocchi', '최신 번역', 'model-a', age_minutes=1)
+        _add('Bocchi', '예전 번역', 'model-b', age_minutes=10)
+
+        assert Translation.lookup('Frieren', 'title').translated_text == '최신 번역'
+        assert Translation.lookup('Bocchi', 'title').translated_text == '최신 번역'
+        assert translation_cache.get_many(['Frieren', 'Bocchi'], 'title') == {'Frieren': '최신 번역', 'Bocchi': '최신 번역'}
+        translation_cache.clear()
+        assert translation_cache.get('Frieren', 'title') == '최신 번역'
+
+
+def test_verification_replaces_rows_of_other_models(app):
+    with app.app_context():
+        translation_cache.clear()
+        _add('Frieren', '틀린 번역', 'model-a', age_minutes=1)
+
+        _apply_title_verification('Frieren', '장송의 프리렌', True, 'model-b')
+
+        assert [(r.model, r.translated_text) for r in _rows('Frieren')] == [('model-b', '장송의 프리렌')]
+        translation_cache.clear()
+        assert translation_cache.get('Frieren', 'title') == '장송의 프리렌'
+
+
+def test_verification_updates_same_model_row(app):
+    with app.app_context():
+        translation_cache.clear()
+        _add('Frieren', '틀린 번역', 'model-a', age_minutes=1)
+
+        _apply_title_verification('Frieren', '장송의 프리렌', False, 'model-a')
+
+        assert [(r.model, r.translated_text) for r in _rows('Frieren')] == [('model-a', '장송의 프리렌')]
+
+
+def test_bulk_store_returns_what_lookups_return(app):
+    with app.app_context():
+        translation_cache.clear()
+        _add('Frieren', '먼저 저장된 번역', 'model-a', age_minutes=0)
+
+        # 같은 모델로 다시 저장하면 먼저 저장된 번역 유지
+        stored = _bulk_store_translations({'Frieren': '나중 번역', 'Bocchi': '봇치'}, 'title', 'model-a')
+        assert stored == {'Frieren': '먼저 저장된 번역', 'Bocchi': '봇치'}
+
+        # 다른 모델로 저장하면 캐시 값이 DB 조회 결과와 같아야 함
+        stored = _bulk_store_translations({'Frieren': '다른 모델 번역'}, 'title', 'model-b')
+        assert stored['Frieren'] == Translation.lookup('Frieren', 'title').translated_text
+        assert translation_cache.get('Frieren', 'title') == stored['Frieren']
@@ -0,0 +1,60 @@
+# tests/test_upstream_governor.py
+# 토큰 버킷 한도 대기: max_wait / 호출한 쪽 마감 시각을 넘기면 기다리지 않고 바로 실패
+
+import time
+import asyncio
+
+import pytest
+
+from services.upstream_governor import UpstreamGovernor, UpstreamUnavailable
+
+
+def _governor(rate_per_minute, burst=1, max_wait=30.0):
+    return UpstreamGovernor('Test', 'TEST', rate_per_minute=rate_per_minute, burst=burst, max_wait=max_wait)
+
+
+async def _ok():
+    return 'ok'
+
+
+def _call(governor, deadline=None):
+    return asyncio.run(governor.call(_ok, lambda e: False, deadline))
+
+
+def test_fails_fast_when_token_comes_after_deadline():
+    governor = _governor(60)
+    assert _call(governor) == 'ok'
+
+    started = time.monotonic()
+    with pytest.raises(UpstreamUnavailable):
+        _call(governor, deadline=started + 0.2)  # 다음 토큰은 1초 뒤
+    assert time.monotonic() - started < 0.1
+    assert governor.healthy  # 한도 대기 포기는 서킷 실패로 세지 않음
+
+
+def test_cancelled_reservation_is_returned():
+    governor = _governor(60)
+    _call(governor)
+    with pytest.raises(UpstreamUnavailable):
+        _call(governor, deadline=time.monotonic())
+    # 포기한 예약을 반납했으므로 다음 토큰은 여전히 약 1초 뒤
+    assert governor.bucket.reserve() <= 1.0
+
+
+def test_waits_for_token_within_deadline():
+    governor = _governor(600)  # 0.1초마다 토큰 1개
+    _call(governor)
+    assert not governor.has_token
+
+    started = time.monotonic()
+    assert _call(governor, deadline=started + 1.0) == 'ok'
+    assert 0.05 < time.monotonic() - started < 0.5
+
+
+def test_max_wait_applies_without_deadline():
+    governor = _governor(60, max_wait=0.5)
+    _call(governor)
+    with pytest.raises(UpstreamUnavailable):
+        _call(governor)
+    with pytest.raises(UpstreamUnavailable):
+        _call(governor, deadline=time.monotonic() + 10)  # 마감이 길어도 max_wait가 상한
@@ -1,5 +1,9 @@
 # utils.py
+import re
+import html
+import asyncio
 from flask import jsonify
+from services.background_loop import background_loop
 
 def create_response(success=True, data=None, error=None, status=200):
     """API 응답 표준화 함수"""
@@ -10,6 +14,40 @@ def create_response(success=True, data=None, error=None, status=200):
     }
     return jsonify(response), status
 
+def iterate_async(async_gen):
+    """async 제너레이터를 동기 제너레이터로 변환 (스트리밍 응답용, 전용 이벤트 루프 사용)"""
+    if background_loop.attached:
+        yield from _iterate_on_loop(async_gen, background_loop.loop)
+        return
+
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(async_gen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        # 클라이언트가 중간에 끊으면 남은 번역 작업 정리
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.wait(pending))
+        loop.run_until_complete(async_gen.aclose())
+        loop.close()
+
+def _iterate_on_loop(async_gen, loop):
+    # ASGI 모드: 응답 스레드에서 한 단계씩 서버 루프에 맡김 (요청 컨텍스트는 그대로 복사됨)
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(async_gen.__anext__(), loop).result()
+            except StopAsyncIteration:
+                break
+    finally:
+        asyncio.run_coroutine_threadsafe(async_gen.aclose(), loop).result()
+
 def get_english_title(media_node):
     """AniList 데이터에서 영어/로마자 제목 추출"""
     if not media_node or 'title' not in media_node:
@@ -24,4 +62,43 @@ def translate_genres_to_korean(genres):
         "Sports": "스포츠", "Thriller": "스릴러", "Horror": "호러", "Supernatural": "초능력",
         "Mystery": "미스테리", "Psychological": "심리", "Mahou Shoujo": "마법소녀", "Mecha": "메카"
     }
-    return [genre_map.get(g, g) for g in genres]
\ No newline at end of file
+    return [genre_map.get(g, g) for g in genres]
+
+# 줄거리 HTML 정리용
+_BR_PATTERN = re.compile(r'<br\s*/?>', re.IGNORECASE)
+_TAG_PATTERN = re.compile(r'<[^>]+>')
+_SOURCE_PATTERN = re.compile(r'\s*[(\[]\s*(?:source|sources)\s*:\s*([^)\]]+?)\s*[)\]]\s*$', re.IGNORECASE)
+_SENTENCE_END = re.compile(r'(?<=[.!?。])\s+')
+
+def split_description(text, max_chars=800):
+    """AniList 줄거리(HTML) → (문단별 번역 조각 목록, 출처 목록)
+
+    <br>/태그/엔티티를 정리한 뒤 한 줄을 한 문단으로 보고,
+    max_chars보다 긴 문단만 문장 단위로 묶어서 나눈다. '(Source: ...)'는 번역하지 않고 따로 뺀다.
+    """
+    if not text: return [], []
+    text = html.unescape(_TAG_PATTERN.sub('', _BR_PATTERN.sub('\n', text)))
+    paragraphs, sources = [], []
+    for line in text.split('\n'):
+        line = ' '.join(line.split())
+        match = _SOURCE_PATTERN.search(line)
+        if match:
+            sources.append(match.group(1))
+            line = line[:match.start()].rstrip()
+        if not line:
+            continue
+        chunks = []
+        for sentence in _SENTENCE_END.split(line) if len(line) > max_chars else [line]:
+            if chunks and len(chunks[-1]) + 1 + len(sentence) <= max_chars:
+                chunks[-1] += ' ' + sentence
+            else:
+                chunks.append(sentence)
+        paragraphs.append(chunks)
+    return paragraphs, sources
+
+def join_description(paragraphs, sources):
+    """split_description 결과(번역본)를 다시 줄거리 텍스트로 (문단은 빈 줄로 구분)"""
+    lines = [' '.join(chunks) for chunks in paragraphs]
+    lines += [f"(출처: {source})" for source in sources]
+    return '\n\n'.join(lines)
+